@@ -0,0 +1,125 @@
+"""
+Scanning and window discovery benchmarks on synthetic trees (in-memory backend).
+
+Measures per-tick latency (one call per target window), child listings (~ nodes visited
+by per-node walks), property reads and bulk requests for:
+    scan_window (the single-pass scan both strategies use, with the default scan budget),
+    has_text_recursive, find_button_with_text, dump_texts, get_window_structure,
+    WindowService.find_window_by_title
+
+The baseline gate compares the call counts only (GATED_METRICS): they are the same on every
+machine, while wall times are only comparable between runs on one machine.
+
+Usage:
+    python benchmarks/bench_scanning.py --quick
+    python benchmarks/bench_scanning.py --output bench.json --baseline benchmarks/baseline_scanning.json
+    python benchmarks/bench_scanning.py --quick --update-baseline
+"""
+import argparse
+import sys
+from typing import Callable, Dict, List, Tuple
+
+import common  # noqa: F401  (puts src/ on sys.path)
+from common import gate, print_table, time_call, write_results
+
+from ag_accept.services.config_service import ConfigSnapshot
+from ag_accept.services.memory_backend import MemoryBackend, PROMPT_ACCEPT, PROMPT_CONTEXT, generate_desktop
+from ag_accept.services.text_query_service import TextQueryService
+from ag_accept.services.window_service import WindowService
+
+QUICK_NODES = [1000, 10000]
+QUICK_WINDOWS = [1, 10]
+FULL_NODES = [1000, 10000, 100000]
+FULL_WINDOWS = [1, 10, 50]
+# Node counts x windows above this are skipped (5M-node desktops take minutes to build)
+MAX_TOTAL_NODES = 1000000
+# Machine-independent metrics checked against the baseline
+GATED_METRICS = ["child_listings", "property_reads", "bulk_calls"]
+
+
+def make_desktop(nodes: int, windows: int, latency: float) -> Tuple[MemoryBackend, WindowService, TextQueryService, list]:
+    backend = MemoryBackend(latency=latency)
+    generate_desktop(backend, windows=windows, nodes_per_window=nodes, prompt_windows=1, other_windows=2)
+    window_service = WindowService(backend=backend)
+    text_service = TextQueryService(backend=backend)
+    targets = [w for w in backend.root.children if w._name.startswith("Antigravity")]
+    return backend, window_service, text_service, targets
+
+
+def tree_cases(window_service: WindowService, text_service: TextQueryService, targets: list) -> Dict[str, Callable[[], object]]:
+    budget = ConfigSnapshot.from_mapping({}).budget
+    return {
+        "scan_window": lambda: [text_service.scan_window(w, [PROMPT_CONTEXT], [PROMPT_ACCEPT], budget=budget) for w in targets],
+        "has_text_recursive": lambda: [text_service.has_text_recursive(w, [PROMPT_CONTEXT]) for w in targets],
+        "find_button_with_text": lambda: [text_service.find_button_with_text(w, [PROMPT_ACCEPT]) for w in targets],
+        "dump_texts": lambda: [text_service.dump_texts(w) for w in targets],
+        "get_window_structure": lambda: [window_service.get_window_structure(w) for w in targets],
+    }
+
+
+def measure(backend: MemoryBackend, fn: Callable[[], object], repeat: int) -> Dict[str, float]:
+    # Counters from one run after a warm-up (they are deterministic), time as the median of 'repeat' runs
+    fn()
+    backend.reset_stats()
+    fn()
+    counts = dict(backend.stats)
+    seconds = time_call(fn, repeat)
+    return {
+        "tick_seconds": seconds,
+        "child_listings": counts["children"],
+        "property_reads": counts["property"],
+        "bulk_calls": counts["bulk"],
+    }
+
+
+def run(node_sizes: List[int], window_counts: List[int], repeat: int = 3, latency: float = 0.0,
+        max_total: int = MAX_TOTAL_NODES, only: List[str] = None) -> Dict[str, Dict[str, float]]:
+    cases: Dict[str, Dict[str, float]] = {}
+    for nodes in node_sizes:
+        for windows in window_counts:
+            if nodes * windows > max_total:
+                continue
+            backend, window_service, text_service, targets = make_desktop(nodes, windows, latency)
+            for name, fn in tree_cases(window_service, text_service, targets).items():
+                if only and name not in only:
+                    continue
+                cases[f"{name}/{nodes}n/{windows}w"] = measure(backend, fn, repeat)
+
+    # Discovery does not walk window trees, so only the window count matters
+    if not only or "find_window_by_title" in only:
+        for windows in window_counts:
+            backend, window_service, _, targets = make_desktop(min(node_sizes), windows, latency)
+            title = targets[-1]._name
+            window_service.find_window_by_title(title)  # first call fills the registry
+            cases[f"find_window_by_title/{windows}w"] = measure(backend, lambda: window_service.find_window_by_title(title), repeat)
+    return cases
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quick", action="store_true", help="1k-10k nodes, 1-10 windows")
+    parser.add_argument("--nodes", type=int, nargs="*", help="nodes per window (overrides the profile)")
+    parser.add_argument("--windows", type=int, nargs="*", help="target window counts (overrides the profile)")
+    parser.add_argument("--only", nargs="*", help="benchmark names to run")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated seconds per element call")
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--baseline", help="baseline JSON to gate against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown (0.25 = 25%%)")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    node_sizes = args.nodes or (QUICK_NODES if args.quick else FULL_NODES)
+    window_counts = args.windows or (QUICK_WINDOWS if args.quick else FULL_WINDOWS)
+    cases = run(node_sizes, window_counts, args.repeat, args.latency, only=args.only)
+    print_table(cases)
+
+    settings = {"nodes": node_sizes, "windows": window_counts, "repeat": args.repeat, "latency": args.latency}
+    results = {"suite": "scanning", "settings": settings, "cases": cases}
+    if args.output:
+        results = write_results(args.output, "scanning", cases, settings)
+    return gate(results, args.baseline, args.threshold, args.update_baseline, GATED_METRICS)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
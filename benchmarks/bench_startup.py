@@ -0,0 +1,181 @@
+"""
+Startup benchmarks: time and peak resident memory of a fresh interpreter that loads
+each entry point, time-to-first-paint of the GUI, and import time per module.
+
+Cases (each in its own subprocess, so nothing is cached between runs):
+    headless          import ag_accept.headless and resolve AutomationService through AppModule
+    gui               the same, plus import ag_accept.ui (GUI toolkit)
+    first_paint       build the GUI as 'ag-accept' does and process the first paint
+                      (needs a display; skipped otherwise)
+    import/<module>   cumulative import time of one module ('python -X importtime')
+
+Usage:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --output startup.json --baseline benchmarks/baseline_startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+import common
+from common import gate, print_table, write_results
+
+# Child process: runs the case body, then prints its elapsed time and peak RSS as JSON
+CHILD_TEMPLATE = r'''
+import json, sys, time
+start = time.perf_counter()
+{body}
+elapsed = time.perf_counter() - start
+
+def peak_rss_mb():
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # kilobytes on Linux, bytes on macOS
+        return peak / (1024.0 * 1024.0) if sys.platform == "darwin" else peak / 1024.0
+    except ImportError:
+        import ctypes
+        from ctypes import wintypes
+
+        class Counters(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                        ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                        ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+        counters = Counters()
+        counters.cb = ctypes.sizeof(Counters)
+        ctypes.windll.psapi.GetProcessMemoryInfo(ctypes.windll.kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb)
+        return counters.PeakWorkingSetSize / (1024.0 * 1024.0)
+
+print(json.dumps({{"startup_seconds": elapsed, "peak_rss_mb": peak_rss_mb()}}))
+'''
+
+HEADLESS_BODY = """
+from injector import Injector
+import ag_accept.headless
+from ag_accept.di_module import AppModule
+from ag_accept.services.automation_service import AutomationService
+Injector([AppModule()]).get(AutomationService)
+"""
+
+GUI_BODY = HEADLESS_BODY + """
+import ag_accept.ui
+"""
+
+FIRST_PAINT_BODY = """
+from ag_accept.main import build_gui
+root, app = build_gui()
+root.update()
+root.destroy()
+"""
+
+CASES = {
+    "headless": HEADLESS_BODY,
+    "gui": GUI_BODY,
+    "first_paint": FIRST_PAINT_BODY,
+}
+
+# Modules on the startup path, plus what the Telemetry tab loads when first opened
+IMPORT_MODULES = [
+    "ag_accept.services.automation_service",
+    "ag_accept.di_module",
+    "ag_accept.headless",
+    "ag_accept.main",
+    "ag_accept.ui",
+    "ag_accept.telemetry_chart",
+    "matplotlib.backends.backend_tkagg",
+]
+
+
+def run_child(body: str) -> Optional[Dict[str, float]]:
+    """
+    One fresh interpreter; None if the case cannot run here (e.g. GUI packages missing).
+    """
+    env = dict(os.environ, PYTHONPATH=common.SRC_DIR)
+    proc = subprocess.run([sys.executable, "-c", CHILD_TEMPLATE.format(body=body)],
+                          capture_output=True, text=True, env=env)
+    if proc.returncode != 0:
+        error = proc.stderr.strip().splitlines()
+        print(f"  skipped: {error[-1] if error else 'exit code ' + str(proc.returncode)}", file=sys.stderr)
+        return None
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def import_seconds(module: str) -> Optional[float]:
+    """
+    Cumulative import time of 'module' in a fresh interpreter; None if it cannot be imported here.
+    """
+    env = dict(os.environ, PYTHONPATH=common.SRC_DIR)
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          capture_output=True, text=True, env=env)
+    if proc.returncode != 0:
+        print(f"  skipped import/{module}: {proc.stderr.strip().splitlines()[-1]}", file=sys.stderr)
+        return None
+    # Lines look like: "import time:       self [us] |  cumulative | imported package"
+    for line in proc.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module:
+            return int(parts[1]) / 1e6
+    return None
+
+
+def run(repeat: int = 5, only: List[str] = None) -> Dict[str, Dict[str, float]]:
+    cases: Dict[str, Dict[str, float]] = {}
+    for name, body in CASES.items():
+        if only and name not in only:
+            continue
+        samples = []
+        for _ in range(max(1, repeat)):
+            sample = run_child(body)
+            if sample is None:
+                break
+            samples.append(sample)
+        if samples:
+            cases[name] = {
+                "startup_seconds": statistics.median(s["startup_seconds"] for s in samples),
+                "peak_rss_mb": statistics.median(s["peak_rss_mb"] for s in samples),
+            }
+
+    for module in IMPORT_MODULES:
+        name = f"import/{module}"
+        if only and name not in only and "import" not in only:
+            continue
+        samples = []
+        for _ in range(max(1, repeat)):
+            seconds = import_seconds(module)
+            if seconds is None:
+                break
+            samples.append(seconds)
+        if samples:
+            cases[name] = {"import_seconds": statistics.median(samples)}
+    return cases
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", nargs="*", help="case names to run ('import' selects every import/ case)")
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per case (median is reported)")
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--baseline", help="baseline JSON to gate against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown (0.25 = 25%%)")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    cases = run(args.repeat, args.only)
+    print_table(cases)
+
+    settings = {"repeat": args.repeat}
+    results = {"suite": "startup", "settings": settings, "cases": cases}
+    if args.output:
+        results = write_results(args.output, "startup", cases, settings)
+    return gate(results, args.baseline, args.threshold, args.update_baseline)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""
+Shared helpers for the benchmark scripts: timing, JSON result files and the regression gate.
+"""
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_DIR = os.path.join(REPO_ROOT, "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+# Timings below this many seconds are noise and never count as regressions
+MIN_SECONDS_DELTA = 0.001
+
+
+def time_call(fn: Callable[[], Any], repeat: int = 3) -> float:
+    """
+    Median wall time of 'fn' over 'repeat' runs.
+    """
+    samples = []
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def write_results(path: str, suite: str, cases: Dict[str, Dict[str, float]], settings: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    results = {
+        "suite": suite,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": settings or {},
+        "cases": cases,
+    }
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    return results
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+@dataclass
+class Regression:
+    case: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline if self.baseline else float("inf")
+
+    def __str__(self) -> str:
+        return f"{self.case} {self.metric}: {self.baseline:.6g} -> {self.current:.6g} ({self.ratio:.2f}x)"
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 0.25,
+            metrics: Optional[List[str]] = None) -> List[Regression]:
+    """
+    Cases that got worse than the baseline by more than 'threshold' (0.25 = 25%).
+    Only cases and metrics present in both runs are compared; lower is better for every metric.
+    """
+    regressions = []
+    base_cases = baseline.get("cases", {})
+    for case, values in current.get("cases", {}).items():
+        base = base_cases.get(case)
+        if base is None:
+            continue
+        for metric, value in values.items():
+            if (metrics and metric not in metrics) or metric not in base:
+                continue
+            limit = base[metric] * (1.0 + threshold)
+            if value <= limit:
+                continue
+            if metric.endswith("seconds") and value - base[metric] < MIN_SECONDS_DELTA:
+                continue
+            regressions.append(Regression(case, metric, base[metric], value))
+    return regressions
+
+
+def print_table(cases: Dict[str, Dict[str, float]]) -> None:
+    metrics = sorted({m for values in cases.values() for m in values})
+    width = max((len(c) for c in cases), default=4)
+    print(f"{'case':<{width}}  " + "  ".join(f"{m:>14}" for m in metrics))
+    for case, values in cases.items():
+        cells = []
+        for m in metrics:
+            v = values.get(m)
+            cells.append(f"{'':>14}" if v is None else (f"{v * 1000:>11.2f} ms" if m.endswith("seconds") else f"{v:>14.0f}"))
+        print(f"{case:<{width}}  " + "  ".join(cells))
+
+
+def gate(results: Dict[str, Any], baseline_path: Optional[str], threshold: float, update_baseline: bool = False,
+         metrics: Optional[List[str]] = None) -> int:
+    """
+    Writes or checks the baseline. Returns the process exit code (1 on regression).
+    With 'metrics', only those are stored in a new baseline and compared.
+    """
+    if not baseline_path:
+        return 0
+    if update_baseline or not os.path.exists(baseline_path):
+        if metrics:
+            cases = {case: {m: v for m, v in values.items() if m in metrics} for case, values in results.get("cases", {}).items()}
+            results = dict(results, cases=cases)
+        with open(baseline_path, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"Baseline written to {baseline_path}")
+        return 0
+
+    regressions = compare(results, load_results(baseline_path), threshold, metrics)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {threshold:.0%} of {baseline_path}:")
+        for r in regressions:
+            print(f"  {r}")
+        return 1
+    print(f"\nNo regressions beyond {threshold:.0%} of {baseline_path}")
+    return 0
@@ -1,93 +1,306 @@
 import time
-import os
-import pythoncom
 
-from typing import Protocol, Any, Callable, List, Optional
+from typing import Protocol, Any, Callable, Dict, List, Optional, Sequence, Tuple
 import threading
+from concurrent.futures import ThreadPoolExecutor
 
 from injector import inject
 # Import new services
 from ag_accept.services.window_service import WindowService
 from ag_accept.services.text_query_service import TextQueryService
-from ag_accept.services.scheduler_service import SchedulerService
+from ag_accept.services.tree_scanner import BUDGET_NODES, BUDGET_TIME, ScanBudget, ScanResult
+from ag_accept.services.text_matcher import TextsOrMatcher
+from ag_accept.services.scheduler_service import SchedulerService, TICK_IDLE, TICK_ACTIVE, TICK_ACCEPTED, combine_outcomes
 from ag_accept.services.debug_service import DebugService
+from ag_accept.services.event_service import WindowEventService
+from ag_accept.services.window_signature import WindowSignatureCache
+from ag_accept.services.button_location_cache import ButtonLocationCache, follow_location
+from ag_accept.services.ui_backend import UiBackend, UiaBackend, window_key
+from ag_accept.services.metrics_service import (
+    MetricsRegistry, StageTimer, COUNTER_TICKS, COUNTER_WINDOWS_SCANNED, COUNTER_NODES_VISITED, COUNTER_ACCEPTS,
+    COUNTER_FAILED_INVOKE, COUNTER_FAILED_CLICK, COUNTER_FAILED_SENDKEYS, COUNTER_DUPLICATES_SUPPRESSED, COUNTER_FOCUS_FREE,
+    STAGE_DISCOVERY, STAGE_CONTEXT, STAGE_BUTTON, STAGE_ACTION, STAGE_FOCUS
+)
+from ag_accept.services.config_service import ConfigSnapshot
+from ag_accept.services.journal_service import Journal, EVENT_TICK, EVENT_DISCOVERY, EVENT_MATCH, EVENT_ACTION
+from ag_accept.services.rule_engine import Rule, RuleGroup, ACTION_KEYS, DEFAULT_KEYS
+from ag_accept.services.action_cache import ActionCache
+from ag_accept.services.action_executor import ActionExecutor, ActionRequest
+from ag_accept.services.states import (
+    STATE_IDLE, STATE_SEARCHING_WINDOW, STATE_WINDOW_FOUND,
+    STATE_CHECKING_CONTEXT, STATE_CONTEXT_MATCHED, STATE_CONTEXT_FAILED,
+    STATE_SEARCHING_BUTTON, STATE_BUTTON_FOUND, STATE_BUTTON_FAILED,
+    STATE_ACTION_SUCCESS, STATE_ACTION_FAILED
+)
 
-# State Constants
-STATE_IDLE = "IDLE"
-STATE_SEARCHING_WINDOW = "SEARCHING_WINDOW"
-STATE_WINDOW_FOUND = "WINDOW_FOUND"
-STATE_CHECKING_CONTEXT = "CHECKING_CONTEXT"
-STATE_CONTEXT_MATCHED = "CONTEXT_MATCHED" 
-STATE_CONTEXT_FAILED = "CONTEXT_FAILED"
-STATE_SEARCHING_BUTTON = "SEARCHING_BUTTON"
-STATE_BUTTON_FOUND = "BUTTON_FOUND"
-STATE_BUTTON_FAILED = "BUTTON_FAILED"
-STATE_ACTION_SUCCESS = "ACTION_SUCCESS"
-STATE_ACTION_FAILED = "ACTION_FAILED"
-
-def process_window(window: Any, text_service: TextQueryService, window_service: WindowService, logger: Callable[[str], None], state_callback: Callable[[str], None], context_texts: List[str], search_texts: List[str]):
+
+def scan_window_stage(window: Any, text_service: TextQueryService, state_callback: Callable[[str], None], context_texts: TextsOrMatcher, search_texts: TextsOrMatcher, signature_cache: Optional[WindowSignatureCache] = None, location_cache: Optional[ButtonLocationCache] = None, budget: Optional[ScanBudget] = None, metrics: Optional[MetricsRegistry] = None, journal: Optional[Journal] = None) -> ScanResult:
     """
-    Shared logic to process a single window:
-    1. Check Context
-    2. Check Button
-    3. Action
+    Detection half of 'process_window': scans once for Context and Button.
+    Skipped if the window is unchanged since the last scan; the button's last known
+    location is probed before searching the whole tree. 'budget' bounds the tree walk.
+    Scans that find the context are recorded in 'journal'.
     """
-    name = window.Name
+    if metrics: metrics.inc(COUNTER_WINDOWS_SCANNED)
     if state_callback: state_callback(STATE_WINDOW_FOUND)
     
-    # Context Check
-    context_found = False
+    # Single pass: context and button are checked together on every node
     if state_callback: state_callback(STATE_CHECKING_CONTEXT)
-    
-    if not context_texts:
-        context_found = True
+    scan = signature_cache.check(window) if signature_cache else None
+    if scan is None:
+        probed = None
+        if location_cache:
+            with StageTimer(metrics, STAGE_BUTTON):
+                probed = location_cache.probe(window, search_texts)
+        if probed:
+            # Button is still where it was last time, so only the context needs confirming
+            with StageTimer(metrics, STAGE_CONTEXT) as timer:
+                scan = text_service.scan_window(window, context_texts, [], budget=budget)
+            scan.button, scan.button_pattern = probed
+        else:
+            with StageTimer(metrics, STAGE_CONTEXT) as timer:
+                scan = text_service.scan_window(window, context_texts, search_texts, budget=budget)
+            if location_cache:
+                location_cache.remember(window, scan.button_location)
+        if metrics: metrics.inc(COUNTER_NODES_VISITED, scan.nodes_visited)
+        if journal and scan.context_matched:
+            journal.record(EVENT_MATCH, window=window.Name, button=scan.button is not None,
+                           nodes=scan.nodes_visited, seconds=timer.seconds, partial=scan.partial)
+        # A partial scan proves nothing about the window, so it must not let the next tick skip it
+        if signature_cache and not scan.partial:
+            signature_cache.update(window, scan)
+    return scan
+
+def scan_rules_stage(window: Any, group: RuleGroup, text_service: TextQueryService, state_callback: Callable[[str], None], signature_cache: Optional[WindowSignatureCache] = None, budget: Optional[ScanBudget] = None, metrics: Optional[MetricsRegistry] = None, journal: Optional[Journal] = None) -> Tuple[ScanResult, Optional[Rule]]:
+    """
+    Multi-rule counterpart of 'scan_window_stage': one walk collects the hits of every rule
+    in 'group', then the highest-priority satisfied rule is chosen. The returned scan carries
+    that rule's button (or none), so 'act_on_scan' handles it like a single-rule scan.
+    """
+    if metrics: metrics.inc(COUNTER_WINDOWS_SCANNED)
+    if state_callback: state_callback(STATE_WINDOW_FOUND)
+    if state_callback: state_callback(STATE_CHECKING_CONTEXT)
+
+    scan = signature_cache.check(window) if signature_cache else None
+    if scan is not None:
+        # Unchanged window whose last scan pressed nothing
+        return scan, None
+
+    with StageTimer(metrics, STAGE_CONTEXT) as timer:
+        scan = text_service.scan_window(window, group.context_matcher, group.button_matcher, budget=budget, until=group.is_done)
+    match = group.select(scan)
+    # A button only counts for a rule whose context is present too
+    scan.context_matched = match is not None or group.context_matched(scan)
+    if match:
+        scan.button, scan.button_pattern, scan.button_location = match.button, match.button_pattern, match.button_location
     else:
-        if text_service.has_text_recursive(window, context_texts):
-            context_found = True
-    
-    if not context_found:
+        scan.button, scan.button_pattern, scan.button_location = None, None, None
+    if metrics: metrics.inc(COUNTER_NODES_VISITED, scan.nodes_visited)
+    if journal and scan.context_matched:
+        journal.record(EVENT_MATCH, window=window.Name, button=scan.button is not None, nodes=scan.nodes_visited,
+                       seconds=timer.seconds, partial=scan.partial, rule=match.rule.name if match else None)
+    if signature_cache and not scan.partial:
+        signature_cache.update(window, scan)
+    return scan, match.rule if match else None
+
+# Action steps, as recorded per action
+STEP_INVOKE = "Invoke"
+STEP_CLICK = "Click"
+STEP_SENDKEYS = "SendKeys"
+STEP_FOCUS = "focus"
+STEP_RESTORE = "restore"
+
+FAILED_STEP_COUNTERS = {
+    STEP_INVOKE: COUNTER_FAILED_INVOKE,
+    STEP_CLICK: COUNTER_FAILED_CLICK,
+    STEP_SENDKEYS: COUNTER_FAILED_SENDKEYS,
+}
+
+def timed_step(steps: List[Tuple[str, float]], step: str, action: Callable[..., Any], *args: Any) -> Optional[Exception]:
+    """
+    Runs one action step and appends (step, seconds) to 'steps'. Returns its error, or None.
+    """
+    start = time.perf_counter()
+    try:
+        action(*args)
+        return None
+    except Exception as e:
+        return e
+    finally:
+        steps.append((step, time.perf_counter() - start))
+
+def suppress_repeat(action_cache: ActionCache, action_key: Any, button: Any, metrics: Optional[MetricsRegistry] = None) -> bool:
+    """
+    True if 'action_key' was pressed within the cooldown, so this press is skipped.
+    """
+    if not action_cache.is_recent(action_key):
+        return False
+    if metrics: metrics.inc(COUNTER_DUPLICATES_SUPPRESSED)
+    # The prompt is still closing; once the button is gone it may be pressed again if it returns
+    try:
+        gone = not button.Exists(0, 0)
+    except:
+        gone = True
+    if gone:
+        action_cache.forget(action_key)
+    return True
+
+def act_on_scan(window: Any, scan: ScanResult, window_service: WindowService, logger: Callable[[str], None], state_callback: Callable[[str], None], backend: Optional[UiBackend] = None, metrics: Optional[MetricsRegistry] = None, journal: Optional[Journal] = None, rule: Optional[Rule] = None, action_cache: Optional[ActionCache] = None, focus_free: bool = True) -> str:
+    """
+    Action half of 'process_window': presses the button the scan found. With 'focus_free', Invoke
+    is tried without focusing the window; the window is only focused for Click / SendKeys.
+    Actions go through 'backend' (default: UI Automation) and are recorded in 'journal'.
+    A 'rule' (multi-rule scans) chooses the action and the keys sent as the last resort.
+    A button pressed within the 'action_cache' cooldown is not pressed again; it is only checked for being gone.
+    Returns the tick outcome for this window.
+    """
+    backend = backend or UiaBackend()
+    if not scan.context_matched:
         if state_callback: state_callback(STATE_CONTEXT_FAILED)
-        return False # Stop processing this window if context fails
+        # Stop processing this window if context fails; a scan cut short by its budget retries at the base interval
+        return TICK_ACTIVE if scan.partial else TICK_IDLE
         
     if state_callback: state_callback(STATE_CONTEXT_MATCHED)
 
-    # Button Check
+    # Button Check (already resolved by the scan)
     if state_callback: state_callback(STATE_SEARCHING_BUTTON)
-    found_button = text_service.find_button_with_text(window, search_texts)
+    found_button = scan.button
     
     if found_button:
+        outcome = TICK_ACCEPTED
         if state_callback: state_callback(STATE_BUTTON_FOUND)
+        action_key = action_cache.key(window, found_button) if action_cache is not None else None
+        if action_key is not None and suppress_repeat(action_cache, action_key, found_button, metrics):
+            return TICK_ACTIVE
         btn_name = found_button.Name
-        logger(f"Found button: '{btn_name}' in '{name}'")
-        
-        # Focus
-        window_service.focus_window(window)
-        
-        try:
-            found_button.Invoke()
-            logger(f"Clicked '{btn_name}' (Invoke)")
-            if state_callback: state_callback(STATE_ACTION_SUCCESS)
-        except:
-            try:
-                found_button.Click()
-                logger(f"Clicked '{btn_name}' (Click)")
-                if state_callback: state_callback(STATE_ACTION_SUCCESS)
-            except Exception as e:
-                # Fallback to SendKeys
-                try:
-                     window.SendKeys('{Alt}{Enter}')
-                     logger("Sent {Alt}{Enter} (Fallback)")
-                     if state_callback: state_callback(STATE_ACTION_SUCCESS)
-                except Exception as e2:
-                    logger(f"Action failed: {e2}")
-                    if state_callback: state_callback(STATE_ACTION_FAILED)
-        
-        # Restore Focus
-        window_service.restore_previous_focus()
-        return True # Action taken
+        window_name = window.Name
+        logger(f"Found button: '{btn_name}' in '{window_name}'" + (f" (rule '{rule.name}')" if rule else ""))
+        method = None
+        error = None
+        keys = rule.keys if rule else DEFAULT_KEYS
+        keys_only = rule is not None and rule.action == ACTION_KEYS
+        # Fallback chain; the rule's keys are also the last resort for a click rule
+        plan = [] if keys_only else [(STEP_INVOKE, backend.invoke, found_button), (STEP_CLICK, backend.click, found_button)]
+        plan.append((STEP_SENDKEYS, backend.send_keys, window, keys))
+        # (step, seconds) in the order taken
+        steps: List[Tuple[str, float]] = []
+        focused = False
+        # The focus this action replaced; kept here, not on the shared service, since an action
+        # on a replacement executor worker may overlap one that timed out
+        saved_focus: List[Any] = []
+
+        with StageTimer(metrics, STAGE_ACTION) as timer:
+            for step, action, *args in plan:
+                # Invoke needs no focus; Click and SendKeys act on whatever is in front
+                if not focused and (step != STEP_INVOKE or not focus_free):
+                    timed_step(steps, STEP_FOCUS, lambda: saved_focus.append(window_service.focus_window(window)))
+                    focused = True
+                error = timed_step(steps, step, action, *args)
+                if error is None:
+                    method = step
+                    break
+                if metrics: metrics.inc(FAILED_STEP_COUNTERS[step])
+            if focused:
+                timed_step(steps, STEP_RESTORE, window_service.restore_focus, saved_focus[0] if saved_focus else None)
+
+        if method == STEP_SENDKEYS:
+            logger(f"Sent {keys}" + ("" if keys_only else " (Fallback)"))
+        elif method:
+            logger(f"Clicked '{btn_name}' ({method}" + (")" if focused else ", no focus)"))
+        else:
+            logger(f"Action failed: {error}")
+            outcome = TICK_ACTIVE
+        if state_callback: state_callback(STATE_ACTION_SUCCESS if method else STATE_ACTION_FAILED)
+        if metrics:
+            if focused:
+                metrics.observe(STAGE_FOCUS, sum(seconds for step, seconds in steps if step in (STEP_FOCUS, STEP_RESTORE)))
+            elif method:
+                metrics.inc(COUNTER_FOCUS_FREE)
+        if outcome == TICK_ACCEPTED:
+            if metrics: metrics.inc(COUNTER_ACCEPTS)
+            if action_key is not None: action_cache.remember(action_key)
+        if journal:
+            journal.record(EVENT_ACTION, window=window_name, button=btn_name, method=method,
+                           success=outcome == TICK_ACCEPTED, seconds=timer.seconds, rule=rule.name if rule else None,
+                           focused=focused, steps=steps)
+        return outcome # Action taken
     else:
         if state_callback: state_callback(STATE_BUTTON_FAILED)
-        return False
+        return TICK_ACTIVE
+
+def submit_action(executor: ActionExecutor, window: Any, scan: ScanResult, rule: Optional[Rule] = None, location_cache: Optional[ButtonLocationCache] = None, action_cache: Optional[ActionCache] = None, metrics: Optional[MetricsRegistry] = None) -> str:
+    """
+    Detection side of an asynchronous action: hands the button the scan found to 'executor'
+    by name and location, then returns without waiting. Returns the tick outcome for this window;
+    a button pressed within the 'action_cache' cooldown is not queued again.
+    """
+    try:
+        button_name = scan.button.Name
+    except:
+        return TICK_ACTIVE
+    if action_cache is not None and suppress_repeat(action_cache, action_cache.key(window, scan.button), scan.button, metrics):
+        return TICK_ACTIVE
+    location = scan.button_location
+    if location is None and location_cache:
+        # Found by probing its remembered location, which the scan result does not repeat
+        location = location_cache.location_for(window)
+    key = window_key(window)
+    request = ActionRequest(key, (key, button_name), button_name, location, rule)
+    # A queued press rechecks soon like an accept does; a refused one is retried next tick
+    return TICK_ACCEPTED if executor.submit(request) else TICK_ACTIVE
+
+def perform_action(request: ActionRequest, text_service: TextQueryService, window_service: WindowService, logger: Callable[[str], None], state_callback: Callable[[str], None], backend: Optional[UiBackend] = None, metrics: Optional[MetricsRegistry] = None, journal: Optional[Journal] = None, action_cache: Optional[ActionCache] = None, focus_free: bool = True) -> str:
+    """
+    Executor side: finds the requested window by its key and the button again (at its location,
+    else by name), then presses it through 'act_on_scan'. Returns the outcome, TICK_ACTIVE if
+    the window or button is gone.
+    """
+    backend = backend or UiaBackend()
+    window = backend.window_from_key(request.window_key)
+    if window is None:
+        return TICK_ACTIVE
+    found = follow_location(window, request.location, [request.button_name]) if request.location else None
+    button = found[0] if found else text_service.find_button_with_text(window, [request.button_name])
+    if button is None:
+        return TICK_ACTIVE
+    scan = ScanResult(context_matched=True, button=button, button_pattern=request.button_name, button_location=request.location)
+    return act_on_scan(window, scan, window_service, logger, state_callback, backend, metrics, journal, request.rule, action_cache, focus_free)
+
+def create_action_executor(config_manager: Any, perform: Callable[[ActionRequest], Any], backend: UiBackend, metrics: MetricsRegistry, logger: Callable[[str], None]) -> Optional[ActionExecutor]:
+    """
+    Returns a started executor for this run unless actions run inline ('async_actions' off).
+    """
+    if not config_manager.get("async_actions", True):
+        return None
+    executor = ActionExecutor(perform, backend, int(config_manager.get("action_queue_size", 16)),
+                              float(config_manager.get("action_timeout", 5.0)), metrics, logger)
+    executor.start()
+    return executor
+
+def process_window(window: Any, text_service: TextQueryService, window_service: WindowService, logger: Callable[[str], None], state_callback: Callable[[str], None], context_texts: TextsOrMatcher, search_texts: TextsOrMatcher, signature_cache: Optional[WindowSignatureCache] = None, location_cache: Optional[ButtonLocationCache] = None, action_lock: Optional[threading.Lock] = None, budget: Optional[ScanBudget] = None, backend: Optional[UiBackend] = None, metrics: Optional[MetricsRegistry] = None, journal: Optional[Journal] = None, rules: Optional[RuleGroup] = None, action_cache: Optional[ActionCache] = None, focus_free: bool = True, executor: Optional[ActionExecutor] = None, on_scan: Optional[Callable[[ScanResult], None]] = None):
+    """
+    Shared logic to process a single window:
+    1. Scan once for Context and Button (see 'scan_window_stage'), or for every rule of
+       'rules' at once (see 'scan_rules_stage'; the texts and location cache are then unused)
+    2. Action (serialized through 'action_lock' when windows are processed concurrently),
+       skipped for a button already pressed within the 'action_cache' cooldown.
+       With an 'executor' the action is only queued and runs on the executor's thread.
+    'on_scan' is called with the scan result before any action is taken.
+    Returns the tick outcome for this window (TICK_IDLE / TICK_ACTIVE / TICK_ACCEPTED).
+    """
+    rule = None
+    if rules:
+        scan, rule = scan_rules_stage(window, rules, text_service, state_callback, signature_cache, budget, metrics, journal)
+    else:
+        scan = scan_window_stage(window, text_service, state_callback, context_texts, search_texts, signature_cache, location_cache, budget, metrics, journal)
+    if on_scan is not None:
+        on_scan(scan)
+    if executor is not None and scan.context_matched and scan.button:
+        return submit_action(executor, window, scan, rule, location_cache, action_cache, metrics)
+    if action_lock is None or not (scan.context_matched and scan.button):
+        return act_on_scan(window, scan, window_service, logger, state_callback, backend, metrics, journal, rule, action_cache, focus_free)
+    with action_lock:
+        return act_on_scan(window, scan, window_service, logger, state_callback, backend, metrics, journal, rule, action_cache, focus_free)
 
 
 class AutomationStrategy(Protocol):
@@ -95,104 +308,369 @@ class AutomationStrategy(Protocol):
         """Run the automation loop."""
         ...
 
+EXCLUDED_TITLES = ["Ag-Accept", "Antigravity Monitor"]
+
+# How often (in ticks) cache and latency stats are logged in debug mode
+STATS_LOG_TICKS = 60
+
+def create_signature_cache(config_manager: Any) -> Optional[WindowSignatureCache]:
+    """
+    Returns a per-run signature cache if skipping unchanged windows is enabled.
+    """
+    if not config_manager.get("skip_unchanged_windows", False):
+        return None
+    return WindowSignatureCache(
+        levels=int(config_manager.get("signature_levels", 2)),
+        force_rescan_ticks=int(config_manager.get("signature_force_rescan_ticks", 10)),
+    )
+
+def create_location_cache(config_manager: Any) -> Optional[ButtonLocationCache]:
+    """
+    Returns a per-run button location cache unless disabled in config.
+    """
+    if not config_manager.get("button_location_cache", True):
+        return None
+    return ButtonLocationCache()
+
+def log_signature_stats(signature_cache: Optional[WindowSignatureCache], logger: Callable[[str], None], debug: bool) -> None:
+    if debug and signature_cache and signature_cache.ticks % STATS_LOG_TICKS == 0:
+        logger(signature_cache.summary())
+
+# Keys read only when a run starts
+RESTART_KEYS = ("detection_mode", "parallel_workers", "async_actions", "action_queue_size")
+
+def current_config(config_manager: Any, previous: Optional[ConfigSnapshot] = None) -> ConfigSnapshot:
+    """
+    Latest config snapshot. A ConfigService publishes new ones as the config changes;
+    plain mappings (tests, scripts) are snapshotted once.
+    """
+    snapshot = getattr(config_manager, "snapshot", None)
+    if callable(snapshot):
+        return snapshot()
+    return previous or ConfigSnapshot.from_mapping(config_manager)
+
+def apply_config_change(old: ConfigSnapshot, new: ConfigSnapshot, scheduler: SchedulerService, debug_service: DebugService, event_mode: bool, logger: Callable[[str], None]) -> None:
+    """
+    Applies a new snapshot between ticks: schedule and snapshot settings change in place.
+    """
+    configure_scheduler(scheduler, new, event_mode)
+    debug_service.configure_from(new)
+    logger(f"Config reloaded (version {new.version})")
+    changed = [key for key in RESTART_KEYS if old.get(key) != new.get(key)]
+    if changed:
+        logger(f"Restart monitoring to apply: {', '.join(changed)}")
+
+def journal_ticks(tick: Callable[[], str], journal: Optional[Journal], strategy: str) -> Callable[[], str]:
+    """
+    Wraps a scheduler tick so that each one is recorded in 'journal' (unchanged if None).
+    """
+    if journal is None:
+        return tick
+
+    def journaled_tick():
+        start = time.perf_counter()
+        outcome = tick()
+        journal.record(EVENT_TICK, strategy=strategy, outcome=outcome, seconds=time.perf_counter() - start)
+        return outcome
+    return journaled_tick
+
+def journal_discovery(journal: Journal, diff: Any, title_parts: Sequence[str]) -> None:
+    """
+    Records the target windows (titles containing any of 'title_parts') in a registry diff.
+    """
+    def titles(entries):
+        return [entry.title for entry in entries if any(part in entry.title for part in title_parts)]
+
+    added, removed, renamed = titles(diff.added), titles(diff.removed), titles(diff.renamed)
+    if added or removed or renamed:
+        journal.record(EVENT_DISCOVERY, added=added, removed=removed, renamed=renamed)
+
+def warn_unreachable_rules(rules: Any, target_title_part: str, logger: Callable[[str], None]) -> None:
+    """
+    AgentManager mode only scans the window whose title contains 'target_title_part'; logs each
+    rule whose title is unrelated to it, since such a rule only applies to other windows.
+    """
+    for rule in rules.rules:
+        if rule.title not in target_title_part and target_title_part not in rule.title:
+            logger(f"Rule '{rule.name}' is unused in AgentManager mode: its title '{rule.title}' does not match "
+                   f"the target window '{target_title_part}' (IDE mode scans every rule's windows)")
+
+def configure_scheduler(scheduler: SchedulerService, config_manager: Any, event_mode: bool) -> None:
+    """
+    Poll mode adapts around 'interval'. In event mode the scheduler only paces the
+    safety-net rescans, so its base and ceiling are the safety poll interval.
+    """
+    if event_mode:
+        safety_interval = float(config_manager.get("safety_poll_interval", 10.0))
+        scheduler.configure(
+            interval=safety_interval,
+            min_interval=config_manager.get("interval_min", 0.1),
+            max_interval=safety_interval,
+            backoff_factor=1.0,
+            burst_intervals=config_manager.get("burst_intervals", [0.2, 0.2, 0.5, 0.5]),
+            jitter=config_manager.get("interval_jitter", 0.1),
+        )
+    else:
+        scheduler.configure_from(config_manager)
+
 class IdeStrategy:
     @inject
-    def __init__(self, window_service: WindowService, text_service: TextQueryService, debug_service: DebugService):
+    def __init__(self, window_service: WindowService, text_service: TextQueryService, debug_service: DebugService, event_service: WindowEventService, scheduler: SchedulerService, backend: Optional[UiBackend] = None, metrics: Optional[MetricsRegistry] = None, journal: Optional[Journal] = None):
         self.window_service = window_service
         self.text_service = text_service
         self.debug_service = debug_service
+        self.event_service = event_service
+        self.scheduler = scheduler
+        self.backend = backend or UiaBackend()
+        self.metrics = metrics or MetricsRegistry()
+        self.journal = journal
+        # Scans may run concurrently, but focus + invoke always go through this single lane
+        self.action_lock = threading.Lock()
+        # Window title -> (seconds, nodes visited) of its latest scan
+        self.scan_latencies: Dict[str, Tuple[float, int]] = {}
+
+    def create_pool(self, config_manager: Any) -> Optional[ThreadPoolExecutor]:
+        workers = int(config_manager.get("parallel_workers", 1))
+        if workers <= 1:
+            return None
+        # Each scanning thread joins the multithreaded apartment, which UI Automation clients are recommended to use
+        return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ag-accept-scan",
+                                  initializer=self.backend.initialize_thread, initargs=(True,))
+
+    def latency_summary(self) -> str:
+        parts = [f"'{name}' {seconds * 1000:.1f} ms/{nodes} nodes" for name, (seconds, nodes) in self.scan_latencies.items()]
+        summary = "Scan latency: " + (", ".join(parts) if parts else "no windows")
+        exhausted = self.text_service.budget_exhaustions
+        if any(exhausted.values()):
+            summary += f" (budget exhausted: {exhausted.get(BUDGET_NODES, 0)} by nodes, {exhausted.get(BUDGET_TIME, 0)} by time)"
+        return summary
 
     def run(self, stop_event, snapshot_event, config_manager, logger, state_callback=None, debug=False):
-        pythoncom.CoInitialize()
+        self.backend.initialize_thread()
+        event_mode = False
+        pool = None
+        executor = None
         try:
-            target_title_part = config_manager.get("target_window_title", "Antigravity")
-            
-            # Consolidated Config: Use AgentManager keys as primary or merge?
-            # User asked to Reuse AgentManager logic.
-            raw_search_texts = config_manager.get("search_texts_agent_manager", ["Accept"])
-            search_texts = [s.strip() for s in raw_search_texts if s]
-            
-            # Merge with IDE defaults if empty?
-            if not search_texts: 
-                 search_texts = config_manager.get("search_texts_ide", ["Run command?", "Reject", "Accept"])
-
-            context_texts = config_manager.get("context_text_agent_manager", ["Run command?"])
-            interval = config_manager.get("interval", 1.0)
+            # Immutable snapshot; a newer one is picked up at the start of a tick
+            config = current_config(config_manager)
+            event_mode = config.detection_mode == "event"
+            safety_interval = config.get("safety_poll_interval")
+            configure_scheduler(self.scheduler, config, event_mode)
+            self.debug_service.configure_from(config)
             
             logger("Starting IDE Strategy (Unified)...")
+            if event_mode:
+                self.event_service.start()
+                logger(f"Event mode: scanning on window notifications (safety poll every {safety_interval}s)")
+
+            # Consolidated Config: AgentManager texts, falling back to the IDE list (compiled in the snapshot)
+            target_title_part = config.target_window_title
+            context_texts = config.context_matcher
+            search_texts = config.ide_search_matcher
+            # Configured rules replace the single title/context/button rule above
+            rules = config.rules
+            budget = config.budget
+            signature_cache = create_signature_cache(config)
+            location_cache = create_location_cache(config)
+            # Recent presses; kept across config reloads so a reload never causes a second press
+            action_cache = ActionCache.from_config(config)
+            if rules:
+                logger(f"Evaluating {len(rules)} rules for {len(rules.titles)} window titles")
+            executor = create_action_executor(config, lambda request: perform_action(
+                request, self.text_service, self.window_service, logger, state_callback, self.backend,
+                self.metrics, self.journal, action_cache, config.get("focus_free_actions", True)), self.backend, self.metrics, logger)
+            pool = self.create_pool(config)
+            if pool:
+                logger(f"Scanning windows in parallel ({config.get('parallel_workers')} workers)")
+            self.scan_latencies.clear()
+            tick_count = 0
+
+            # None means a full scan of every window; otherwise only the windows events pointed at
+            pending_windows = None
 
-            while not stop_event.is_set():
+            def scan_and_act(window):
+                start = time.perf_counter()
+                name = window.Name
+
+                def record_latency(scan):
+                    self.scan_latencies[name] = (time.perf_counter() - start, scan.nodes_visited)
+
+                return process_window(window, self.text_service, self.window_service, logger, state_callback, context_texts, search_texts,
+                                      signature_cache, location_cache, self.action_lock, budget, self.backend, self.metrics, self.journal,
+                                      rules.for_window(name) if rules else None, action_cache,
+                                      config.get("focus_free_actions", True), executor, record_latency)
+
+            def is_target(name):
+                return rules.matches_title(name) if rules else target_title_part in name
+
+            def tick():
+                nonlocal tick_count, config, target_title_part, context_texts, search_texts, rules, budget, signature_cache, location_cache, action_cache
+                tick_count += 1
+                self.metrics.inc(COUNTER_TICKS)
+                latest = current_config(config_manager, config)
+                if latest is not config:
+                    apply_config_change(config, latest, self.scheduler, self.debug_service, event_mode, logger)
+                    config = latest
+                    target_title_part = config.target_window_title
+                    context_texts = config.context_matcher
+                    search_texts = config.ide_search_matcher
+                    rules = config.rules
+                    budget = config.budget
+                    signature_cache = create_signature_cache(config)
+                    location_cache = create_location_cache(config)
+                    action_cache = ActionCache.from_config(config, action_cache)
+                    if executor is not None:
+                        executor.timeout = float(config.get("action_timeout"))
                 if debug and snapshot_event.is_set():
-                    self.debug_service.save_snapshot(
+                    path = self.debug_service.capture_snapshot(
                         f"IDE SNAPSHOT\n{self.window_service.get_all_window_titles_string()}"
                     )
-                    logger("Snapshot saved.")
+                    logger(f"Snapshot saving to {path}")
                     snapshot_event.clear()
 
+                outcomes = []
                 try:
-                    # Find all potential windows
-                    windows = self.window_service.get_all_windows(exclude_titles=["Ag-Accept", "Antigravity Monitor"])
-                    
                     if state_callback: state_callback(STATE_SEARCHING_WINDOW)
+                    if signature_cache: signature_cache.begin_tick()
 
-                    width_found_any = False
-                    for window in windows:
-                        name = window.Name
-                        if target_title_part in name:
-                            width_found_any = True
-                            # Process this window fully
-                            process_window(window, self.text_service, self.window_service, logger, state_callback, context_texts, search_texts)
-                    
-                    if not width_found_any:
-                         # Maybe set to idle or searching?
-                         pass
+                    targets = []
+                    with StageTimer(self.metrics, STAGE_DISCOVERY):
+                        if pending_windows is None:
+                            # One enumeration; titles and exclusions are only re-evaluated for changed windows
+                            diff = self.window_service.refresh_windows(exclude_titles=EXCLUDED_TITLES)
+                            if self.journal and diff:
+                                journal_discovery(self.journal, diff, rules.titles if rules else (target_title_part,))
+                            for entry in diff.removed:
+                                if signature_cache: signature_cache.evict(entry.key)
+                                if location_cache: location_cache.evict(entry.key)
+                            changed_keys = {entry.key for entry in diff.changed}
+                            entries = self.window_service.find_windows_matching(rules.titles) if rules else self.window_service.find_windows(target_title_part)
+                            for entry in entries:
+                                if event_mode and entry.key in changed_keys:
+                                    self.event_service.watch(entry.window)
+                                targets.append(entry.window)
+                        else:
+                            for window in pending_windows:
+                                name = window.Name
+                                if is_target(name) and not self.window_service.is_excluded(name, EXCLUDED_TITLES):
+                                    if event_mode:
+                                        self.event_service.watch(window)
+                                    targets.append(window)
+
+                    # Process each window fully; concurrently when a pool is configured
+                    if pool and len(targets) > 1:
+                        outcomes.extend(pool.map(scan_and_act, targets))
+                    else:
+                        outcomes.extend(scan_and_act(window) for window in targets)
+
+                    log_signature_stats(signature_cache, logger, debug)
+                    if debug and tick_count % STATS_LOG_TICKS == 0:
+                        logger(self.latency_summary())
 
                 except Exception as e:
                     logger(f"Loop error: {e}")
 
-                if stop_event.wait(interval):
-                    break
+                # No matching window at all is idle too, so the scheduler backs off
+                return combine_outcomes(outcomes)
+
+            def wait(delay):
+                nonlocal pending_windows
+                if event_mode:
+                    pending_windows = self.event_service.wait_for_windows(delay, stop_event)
+                else:
+                    self.scheduler.clock.wait(stop_event, delay)
+
+            self.scheduler.run(journal_ticks(tick, self.journal, "IDE"), stop_event, wait)
         finally:
-            pythoncom.CoUninitialize()
+            if pool:
+                pool.shutdown(wait=True)
+            if executor is not None:
+                executor.stop()
+            if event_mode:
+                self.event_service.stop()
+            self.backend.uninitialize_thread()
 
 class AgentManagerStrategy:
     @inject
-    def __init__(self, window_service: WindowService, text_service: TextQueryService, debug_service: DebugService):
+    def __init__(self, window_service: WindowService, text_service: TextQueryService, debug_service: DebugService, event_service: WindowEventService, scheduler: SchedulerService, backend: Optional[UiBackend] = None, metrics: Optional[MetricsRegistry] = None, journal: Optional[Journal] = None):
         self.window_service = window_service
         self.text_service = text_service
         self.debug_service = debug_service
-        self.scheduler = SchedulerService() # Not fully replacing main loop yet, but ready
+        self.event_service = event_service
+        self.scheduler = scheduler
+        self.backend = backend or UiaBackend()
+        self.metrics = metrics or MetricsRegistry()
+        self.journal = journal
 
     def run(self, stop_event, snapshot_event, config_manager, logger, state_callback=None, debug=False):
-        pythoncom.CoInitialize()
+        self.backend.initialize_thread()
+        event_mode = False
+        executor = None
         try:
-            target_title_part = config_manager.get("target_window_title", "Antigravity")
-            
-            # Extract texts
-            raw_search_texts = config_manager.get("search_texts_agent_manager", ["Accept"])
-            search_texts = [s.strip() for s in raw_search_texts if s]
-            
-            context_texts = config_manager.get("context_text_agent_manager", ["Run command?"])
-            interval = config_manager.get("interval", 1.0)
+            # Immutable snapshot; a newer one is picked up at the start of a tick
+            config = current_config(config_manager)
+            target_title_part = config.target_window_title
+            # Compiled once per snapshot; every node of every tick reuses them
+            context_texts = config.context_matcher
+            search_texts = config.search_matcher
+            # Rules whose title matches the locked window replace the texts above
+            rules = config.rules
+            event_mode = config.detection_mode == "event"
+            safety_interval = config.get("safety_poll_interval")
+            configure_scheduler(self.scheduler, config, event_mode)
+            self.debug_service.configure_from(config)
             
             target_window = None
+            signature_cache = create_signature_cache(config)
+            location_cache = create_location_cache(config)
+            action_cache = ActionCache.from_config(config)
+            executor = create_action_executor(config, lambda request: perform_action(
+                request, self.text_service, self.window_service, logger, state_callback, self.backend,
+                self.metrics, self.journal, action_cache, config.get("focus_free_actions", True)), self.backend, self.metrics, logger)
+            budget = config.budget
+            # None means "scan regardless"; a list holds the windows events pointed at
+            pending_windows = None
             
             logger(f"Waiting for target window '{target_title_part}'...")
+            warn_unreachable_rules(rules, target_title_part, logger)
+            if event_mode:
+                self.event_service.start()
+                logger(f"Event mode: scanning on window notifications (safety poll every {safety_interval}s)")
+
+            def forget_target():
+                nonlocal target_window
+                target_window = None
+                if signature_cache: signature_cache.clear()
+                if location_cache: location_cache.clear()
 
-            while not stop_event.is_set():
+            def tick():
+                nonlocal target_window, config, target_title_part, context_texts, search_texts, rules, budget, signature_cache, location_cache, action_cache
+                self.metrics.inc(COUNTER_TICKS)
+                latest = current_config(config_manager, config)
+                if latest is not config:
+                    apply_config_change(config, latest, self.scheduler, self.debug_service, event_mode, logger)
+                    if latest.target_window_title != target_title_part:
+                        forget_target()
+                    if latest.target_window_title != target_title_part or latest.get("rules") != config.get("rules"):
+                        warn_unreachable_rules(latest.rules, latest.target_window_title, logger)
+                    config = latest
+                    target_title_part = config.target_window_title
+                    context_texts = config.context_matcher
+                    search_texts = config.search_matcher
+                    rules = config.rules
+                    budget = config.budget
+                    signature_cache = create_signature_cache(config)
+                    location_cache = create_location_cache(config)
+                    action_cache = ActionCache.from_config(config, action_cache)
+                    if executor is not None:
+                        executor.timeout = float(config.get("action_timeout"))
                 # Snapshot
                 if debug and snapshot_event.is_set():
-                    content = f"AGENT MANAGER SNAPSHOT\n{self.window_service.get_all_window_titles_string()}"
-                    if target_window:
-                         try:
-                             content += f"\n\nTARGET STRUCTURE:\n{self.window_service.get_window_structure(target_window)}"
-                             # Dump text for debugging "Target text not found"
-                             content += f"\n\nTEXT DUMP:\n" + "\n".join(self.text_service.dump_texts(target_window))
-                         except: pass
-                    
-                    self.debug_service.save_snapshot(content)
-                    self.debug_service.open_snapshot()
-                    logger("Snapshot saved and opened.")
+                    header = f"AGENT MANAGER SNAPSHOT\n{self.window_service.get_all_window_titles_string()}"
+                    # Structure and text dump (for debugging "Target text not found") are captured
+                    # in one capped walk and written off this thread, then opened
+                    path = self.debug_service.capture_snapshot(header, target_window, self.backend, open_after=True)
+                    logger(f"Snapshot saving to {path}")
                     snapshot_event.clear()
 
                 try:
@@ -201,31 +679,57 @@ class AgentManagerStrategy:
                     if target_window:
                         try:
                             if not target_window.Exists(0, 0):
-                                target_window = None
+                                forget_target()
                         except:
-                            target_window = None
+                            forget_target()
 
                     if not target_window:
                         if state_callback: state_callback(STATE_SEARCHING_WINDOW)
-                        target_window = self.window_service.find_window_by_title(
-                            target_title_part, 
-                            exclude_titles=["Ag-Accept", "Antigravity Monitor"]
-                        )
+                        with StageTimer(self.metrics, STAGE_DISCOVERY):
+                            target_window = self.window_service.find_window_by_title(
+                                target_title_part, 
+                                exclude_titles=EXCLUDED_TITLES
+                            )
                         
                         if target_window:
                             # if state_callback: state_callback(STATE_WINDOW_FOUND)
-                            logger(f"Locked on to window: '{target_window.Name}'")
+                            target_name = target_window.Name
+                            logger(f"Locked on to window: '{target_name}'")
+                            if self.journal:
+                                self.journal.record(EVENT_DISCOVERY, added=[target_name], removed=[], renamed=[])
+                            if event_mode:
+                                self.event_service.watch(target_window)
                         else:
-                            stop_event.wait(interval)
-                            continue
+                            return TICK_IDLE
+                    elif pending_windows is not None:
+                        # Event mode: only rescan when the notifications concern our window
+                        target_key = window_key(target_window)
+                        if not any(window_key(w) == target_key for w in pending_windows):
+                            return TICK_IDLE
                     
                     # 2. Process using shared logic
-                    process_window(target_window, self.text_service, self.window_service, logger, state_callback, context_texts, search_texts)
+                    if signature_cache: signature_cache.begin_tick()
+                    group = rules.for_window(target_window.Name) if rules else None
+                    outcome = process_window(target_window, self.text_service, self.window_service, logger, state_callback, context_texts, search_texts, signature_cache, location_cache, budget=budget, backend=self.backend, metrics=self.metrics, journal=self.journal, rules=group, action_cache=action_cache, focus_free=config.get("focus_free_actions", True), executor=executor)
+                    log_signature_stats(signature_cache, logger, debug)
+                    return outcome
 
                 except Exception as e:
                     logger(f"Loop error: {e}")
-                    target_window = None
+                    forget_target()
+                    return TICK_IDLE
+
+            def wait(delay):
+                nonlocal pending_windows
+                if event_mode:
+                    pending_windows = self.event_service.wait_for_windows(delay, stop_event)
+                else:
+                    self.scheduler.clock.wait(stop_event, delay)
 
-                stop_event.wait(interval)
+            self.scheduler.run(journal_ticks(tick, self.journal, "AgentManager"), stop_event, wait)
         finally:
-            pythoncom.CoUninitialize()
+            if executor is not None:
+                executor.stop()
+            if event_mode:
+                self.event_service.stop()
+            self.backend.uninitialize_thread()
@@ -1,4 +1,6 @@
 
+from typing import Optional
+
 from injector import Module, Binder, singleton
 
 from ag_accept.services.config_service import ConfigService
@@ -6,18 +8,27 @@ from ag_accept.services.window_service import WindowService
 from ag_accept.services.text_query_service import TextQueryService
 from ag_accept.services.scheduler_service import SchedulerService
 from ag_accept.services.debug_service import DebugService
+from ag_accept.services.event_service import WindowEventService
 from ag_accept.services.automation_service import AutomationService
+from ag_accept.services.ui_backend import UiBackend, UiaBackend
 
 class AppModule(Module):
+    def __init__(self, backend: Optional[UiBackend] = None):
+        # UI Automation unless another backend (e.g. in-memory) is supplied
+        self.backend = backend
+
     def configure(self, binder: Binder) -> None:
         """
         Bind all services as singletons.
         """
+        backend = self.backend or UiaBackend()
+        binder.bind(UiBackend, to=backend)
         binder.bind(ConfigService, scope=singleton)
-        binder.bind(WindowService, scope=singleton)
-        binder.bind(TextQueryService, scope=singleton)
+        binder.bind(WindowService, to=lambda: WindowService(backend=backend), scope=singleton)
+        binder.bind(TextQueryService, to=lambda: TextQueryService(backend=backend), scope=singleton)
         binder.bind(SchedulerService, scope=singleton)
         binder.bind(DebugService, scope=singleton)
+        binder.bind(WindowEventService, scope=singleton)
         
         # AutomationService depends on specific instances of others, but Injector resolves recursively
         binder.bind(AutomationService, scope=singleton)
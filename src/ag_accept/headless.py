@@ -0,0 +1,80 @@
+"""
+Headless runner: starts the automation through the DI AppModule without importing any GUI or
+plotting modules (tkinter, customtkinter, matplotlib).
+"""
+import signal
+import sys
+import threading
+import time
+from typing import Callable, Optional, TextIO
+
+from injector import Injector
+
+from ag_accept.di_module import AppModule
+from ag_accept.services.automation_service import AutomationService
+from ag_accept.services.config_service import ConfigService
+
+# How long to wait for the automation thread to finish its tick after a stop request
+STOP_TIMEOUT = 5.0
+
+
+def make_logger(stream: TextIO) -> Callable[[str], None]:
+    lock = threading.Lock()
+
+    def log(message: str) -> None:
+        line = f"{time.strftime('%H:%M:%S')} {message}\n"
+        with lock:
+            stream.write(line)
+            stream.flush()
+    return log
+
+
+def install_signal_handlers(stop: threading.Event) -> None:
+    def handler(signum, frame):
+        stop.set()
+
+    for name in ("SIGINT", "SIGTERM", "SIGBREAK"):
+        sig = getattr(signal, name, None)
+        if sig is not None:
+            signal.signal(sig, handler)
+
+
+def run_headless(mode: Optional[str] = None, interval: Optional[float] = None, log_file: Optional[str] = None,
+                 injector: Optional[Injector] = None, stop: Optional[threading.Event] = None) -> int:
+    """
+    Runs the automation until a signal (or 'stop') arrives or the automation thread ends.
+    Returns the process exit code.
+    """
+    stream = open(log_file, "a", encoding="utf-8") if log_file else sys.stdout
+    logger = make_logger(stream)
+    stop = stop or threading.Event()
+    if threading.current_thread() is threading.main_thread():
+        install_signal_handlers(stop)
+
+    try:
+        injector = injector or Injector([AppModule()])
+        config_service = injector.get(ConfigService)
+        automation_service = injector.get(AutomationService)
+
+        mode = mode or config_service.get("mode", "AgentManager")
+        if interval is not None:
+            # A command line override for this run only; config.json keeps its own value
+            config_service.set("interval", interval, persist=False)
+        logger(f"Config loaded from: {config_service.get_config_path()}")
+        logger(f"Started headless (Mode: {mode}, Interval: {config_service.get('interval')}s)")
+
+        automation_service.start_automation(mode, logger)
+        while automation_service.is_running() and not stop.wait(0.5):
+            pass
+
+        thread = automation_service.thread
+        automation_service.stop_automation()
+        if thread:
+            thread.join(STOP_TIMEOUT)
+        automation_service.shutdown()
+        logger("Stopped.")
+        # Without a stop request the automation thread ended on its own (e.g. an error)
+        return 0 if stop.is_set() else 1
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
@@ -1,32 +1,50 @@
+import argparse
+from typing import List, Optional
 
-import tkinter as tk
-import customtkinter as ctk
-from injector import Injector
-from ag_accept.di_module import AppModule
-from ag_accept.ui import AutoAccepterUI
+MODES = ["IDE", "AgentManager"]
 
-def main():
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="ag-accept", description="Automatically accept Antigravity prompts.")
+    parser.add_argument("--headless", action="store_true", help="run the automation without the GUI")
+    parser.add_argument("--mode", choices=MODES, help="headless: strategy to run (default: config 'mode')")
+    parser.add_argument("--interval", type=float, help="headless: monitoring interval in seconds")
+    parser.add_argument("--log-file", help="headless: append the log here instead of stdout")
+    return parser.parse_args(argv)
+
+def build_gui():
+    """
+    Creates the root window and the UI (without entering the main loop). Returns (root, app).
+    """
+    # GUI modules are only imported here so that headless runs never load them
+    import tkinter as tk
+    import customtkinter as ctk
+    from injector import Injector
+    from ag_accept.di_module import AppModule
+    from ag_accept.ui import AutoAccepterUI
+
+    # Initialize DI
+    injector = Injector([AppModule])
+    
+    # Setup CustomTkinter
+    ctk.set_appearance_mode("Dark")  # Modes: "System" (standard), "Dark", "Light"
+    ctk.set_default_color_theme("blue")  # Themes: "blue" (standard), "green", "dark-blue"
+    
+    # Root CTk
+    root = ctk.CTk()
+    
+    # Binding specific instance
+    injector.binder.bind(ctk.CTk, to=root, scope=None)
+    # Also bind tk.Tk just in case as CTk inherits from it? 
+    # Actually CTk inherits from CTkBaseClass -> tkinter.Tk usually.
+    injector.binder.bind(tk.Tk, to=root, scope=None) 
+    
+    # Now we can resolve UI
+    app = injector.get(AutoAccepterUI)
+    return root, app
+
+def run_gui():
     try:
-        # Initialize DI
-        injector = Injector([AppModule])
-        
-        # Setup CustomTkinter
-        ctk.set_appearance_mode("Dark")  # Modes: "System" (standard), "Dark", "Light"
-        ctk.set_default_color_theme("blue")  # Themes: "blue" (standard), "green", "dark-blue"
-        
-        # Root CTk
-        root = ctk.CTk()
-        
-        # Binding specific instance
-        injector.binder.bind(ctk.CTk, to=root, scope=None)
-        # Also bind tk.Tk just in case as CTk inherits from it? 
-        # Actually CTk inherits from Tk or Widget? 
-        # CTk inherits from CTkBaseClass -> tkinter.Tk usually.
-        injector.binder.bind(tk.Tk, to=root, scope=None) 
-        
-        # Now we can resolve UI
-        app = injector.get(AutoAccepterUI)
-        
+        root, app = build_gui()
         root.mainloop()
     except Exception as e:
         import traceback
@@ -34,6 +52,13 @@ def main():
             f.write(f"\nCRASH IN MAIN LOOP/INIT:\n{traceback.format_exc()}\n")
         raise e
 
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    if args.headless:
+        from ag_accept.headless import run_headless
+        return run_headless(args.mode, args.interval, args.log_file)
+    run_gui()
+
 if __name__ == "__main__":
     try:
         main()
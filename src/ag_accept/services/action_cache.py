@@ -0,0 +1,83 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+from ag_accept.services.ui_backend import window_key
+
+
+def _runtime_id(control: Any) -> Any:
+    try:
+        return tuple(control.GetRuntimeId())
+    except:
+        return None
+
+
+class ActionCache:
+    """
+    Buttons pressed in the last 'ttl' seconds, keyed by window, button runtime ID and button name.
+    While a prompt is still being dismissed the next scan finds the same button again; instead of
+    focusing and pressing it a second time, 'act_on_scan' only checks whether it is gone.
+    Holds at most 'max_entries' entries, evicting the least recently used.
+    Safe to share between the scanning thread and the action executor.
+    """
+
+    def __init__(self, ttl: float = 5.0, max_entries: int = 256, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self.entries: "OrderedDict[Hashable, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config_manager: Any, previous: Optional["ActionCache"] = None) -> Optional["ActionCache"]:
+        """
+        Cache configured by 'action_cooldown' / 'action_cache_size', or None when the cooldown is 0.
+        'previous' is kept (with its entries) if its settings are unchanged.
+        """
+        ttl = float(config_manager.get("action_cooldown", 5.0))
+        max_entries = int(config_manager.get("action_cache_size", 256))
+        if ttl <= 0:
+            return None
+        if previous is not None and previous.ttl == ttl and previous.max_entries == max_entries:
+            return previous
+        return cls(ttl, max_entries)
+
+    def key(self, window: Any, button: Any) -> Tuple[Any, Any, str]:
+        try:
+            name = button.Name or ""
+        except:
+            name = ""
+        return window_key(window), _runtime_id(button), name
+
+    def is_recent(self, key: Hashable) -> bool:
+        """
+        True if 'key' was pressed less than 'ttl' seconds ago; expired entries are dropped.
+        """
+        with self._lock:
+            pressed_at = self.entries.get(key)
+            if pressed_at is None:
+                return False
+            if self.clock() - pressed_at >= self.ttl:
+                del self.entries[key]
+                return False
+            self.entries.move_to_end(key)
+            return True
+
+    def remember(self, key: Hashable) -> None:
+        with self._lock:
+            self.entries[key] = self.clock()
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def forget(self, key: Hashable) -> None:
+        with self._lock:
+            self.entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.entries.clear()
+
+    def __len__(self) -> int:
+        return len(self.entries)
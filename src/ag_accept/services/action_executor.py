@@ -0,0 +1,170 @@
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, Optional, Set, Tuple
+
+from ag_accept.services.metrics_service import (
+    MetricsRegistry, COUNTER_ACTIONS_DROPPED, COUNTER_ACTIONS_TIMED_OUT, STAGE_QUEUE
+)
+from ag_accept.services.tree_scanner import ButtonLocation
+from ag_accept.services.ui_backend import UiBackend, UiaBackend
+
+# Pending requests; detection drops new ones while this many wait
+ACTION_QUEUE_SIZE = 16
+# Seconds an action may run before it is given up (requests waiting twice as long are dropped)
+ACTION_TIMEOUT = 5.0
+
+_STOP = object()
+
+
+@dataclass(frozen=True)
+class ActionRequest:
+    """
+    A press handed from detection to the executor. It names the window (its 'window_key') and
+    the button (its name and where it was found) instead of holding controls created on the
+    scanning thread, so the executor finds both again on its own thread when it acts.
+    """
+    window_key: Any
+    key: Hashable
+    button_name: str
+    location: Optional[ButtonLocation] = None
+    rule: Any = None
+    created_at: float = field(default_factory=time.monotonic)
+
+
+class ActionExecutor:
+    """
+    Runs actions on a worker thread behind a bounded queue, so a slow or hung target app only
+    holds up its own action while scanning goes on. 'submit' never blocks: a full queue, or a
+    request for a button that is already pending, is refused. A supervisor thread gives up an
+    action that runs past 'timeout' and carries on with a fresh worker; requests that waited
+    longer than two timeouts in the queue (one hung action ahead of them, and then some) are
+    dropped as stale.
+    """
+
+    def __init__(self, perform: Callable[[ActionRequest], Any], backend: Optional[UiBackend] = None,
+                 queue_size: int = ACTION_QUEUE_SIZE, timeout: float = ACTION_TIMEOUT,
+                 metrics: Optional[MetricsRegistry] = None, logger: Optional[Callable[[str], None]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.perform = perform
+        self.backend = backend or UiaBackend()
+        self.timeout = timeout
+        self.metrics = metrics
+        self.logger = logger
+        self.clock = clock
+        self.completed = 0
+        self.dropped = 0
+        self.timed_out = 0
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._pending: Set[Hashable] = set()
+        # Worker generation -> (request, start) of the action it is running
+        self._busy: Dict[int, Tuple[ActionRequest, float]] = {}
+        self._generation = 0
+        self._stopped = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+        self._supervisor: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._worker is None:
+            self._start_worker()
+            self._supervisor = threading.Thread(target=self._supervise, name="ag-accept-action-watch", daemon=True)
+            self._supervisor.start()
+
+    def submit(self, request: ActionRequest) -> bool:
+        """
+        Queues 'request'. False if it was refused (already pending or the queue is full).
+        """
+        with self._lock:
+            if request.key in self._pending:
+                return False
+            try:
+                self._queue.put_nowait(request)
+            except queue.Full:
+                self._drop()
+                return False
+            self._pending.add(request.key)
+        return True
+
+    def is_pending(self, key: Hashable) -> bool:
+        return key in self._pending
+
+    def stop(self, timeout: float = ACTION_TIMEOUT) -> None:
+        """
+        Runs what is queued (stale requests are still dropped), then stops the threads.
+        """
+        if self._worker is None:
+            return
+        worker = self._worker
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            pass
+        worker.join(timeout)
+        self._stopped.set()
+        self._worker = None
+
+    # --- Threads ---
+
+    def _start_worker(self) -> None:
+        self._generation += 1
+        self._worker = threading.Thread(target=self._run, args=(self._generation,), name="ag-accept-action", daemon=True)
+        self._worker.start()
+
+    def _drop(self) -> None:
+        self.dropped += 1
+        if self.metrics: self.metrics.inc(COUNTER_ACTIONS_DROPPED)
+
+    def _run(self, generation: int) -> None:
+        # Actions run in the multithreaded apartment, like the parallel scanners
+        self.backend.initialize_thread(True)
+        try:
+            while generation == self._generation:
+                request = self._queue.get()
+                if request is _STOP:
+                    break
+                if generation != self._generation:
+                    # Taken over while this worker was stuck; hand the request back
+                    self._queue.put(request)
+                    break
+                waited = self.clock() - request.created_at
+                if self.metrics: self.metrics.observe(STAGE_QUEUE, waited)
+                if waited > 2 * self.timeout:
+                    # The prompt may well have changed since it was detected
+                    self._finish(request)
+                    self._drop()
+                    continue
+                self._busy[generation] = (request, self.clock())
+                try:
+                    self.perform(request)
+                    self.completed += 1
+                except Exception as e:
+                    if self.logger: self.logger(f"Action error: {e}")
+                finally:
+                    self._busy.pop(generation, None)
+                    self._finish(request)
+        finally:
+            self.backend.uninitialize_thread()
+
+    def _finish(self, request: ActionRequest) -> None:
+        with self._lock:
+            self._pending.discard(request.key)
+
+    def _supervise(self) -> None:
+        while not self._stopped.wait(min(0.25, self.timeout / 4)):
+            busy = self._busy.get(self._generation)
+            if busy is None:
+                continue
+            request, start = busy
+            if self.clock() - start < self.timeout:
+                continue
+            self.timed_out += 1
+            if self.metrics: self.metrics.inc(COUNTER_ACTIONS_TIMED_OUT)
+            if self.logger:
+                self.logger(f"Action on '{request.button_name}' timed out after {self.timeout:.1f}s; continuing without it")
+            # The stuck call cannot be interrupted; its thread is left to finish on its own
+            self._busy.pop(self._generation, None)
+            self._finish(request)
+            if self._worker is not None:
+                self._start_worker()
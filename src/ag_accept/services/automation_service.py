@@ -1,4 +1,5 @@
 
+import os
 import threading
 from typing import Optional, Callable
 from injector import inject, singleton
@@ -8,6 +9,10 @@ from ag_accept.services.debug_service import DebugService
 from ag_accept.services.scheduler_service import SchedulerService
 from ag_accept.services.window_service import WindowService
 from ag_accept.services.text_query_service import TextQueryService
+from ag_accept.services.event_service import WindowEventService
+from ag_accept.services.ui_backend import UiBackend
+from ag_accept.services.metrics_service import MetricsRegistry, MetricsSnapshot
+from ag_accept.services.journal_service import Journal
 from ag_accept.automation import IdeStrategy, AgentManagerStrategy, AutomationStrategy
 
 @singleton
@@ -23,13 +28,21 @@ class AutomationService:
                  debug: DebugService,
                  scheduler: SchedulerService,
                  window: WindowService, # passed to strategies
-                 text: TextQueryService # passed to strategies
+                 text: TextQueryService, # passed to strategies
+                 events: WindowEventService, # passed to strategies
+                 backend: UiBackend # passed to strategies
                  ):
         self.config = config
         self.debug_service = debug
         self.scheduler = scheduler
         self.window_service = window
         self.text_service = text
+        self.event_service = events
+        self.backend = backend
+        # Updated by the strategies' hot loop, read by the UI through 'get_metrics'
+        self.metrics = MetricsRegistry()
+        # Created on the first start; outlives individual runs until 'shutdown'
+        self.journal: Optional[Journal] = None
         
         self.thread: Optional[threading.Thread] = None
         self.stop_event: Optional[threading.Event] = None
@@ -44,12 +57,17 @@ class AutomationService:
         self.stop_event = threading.Event()
         self.snapshot_event.clear()
         
+        if self.journal is None:
+            self.journal = Journal.from_config(self.config, os.path.join(self.config.get_data_dir(), "journal"))
+            if self.journal:
+                self.journal.start()
+
         # Decide strategy
         strategy: Optional[AutomationStrategy] = None
         if mode == "IDE":
-            strategy = IdeStrategy(self.window_service, self.text_service, self.debug_service)
+            strategy = IdeStrategy(self.window_service, self.text_service, self.debug_service, self.event_service, self.scheduler, self.backend, self.metrics, self.journal)
         elif mode == "AgentManager":
-            strategy = AgentManagerStrategy(self.window_service, self.text_service, self.debug_service)
+            strategy = AgentManagerStrategy(self.window_service, self.text_service, self.debug_service, self.event_service, self.scheduler, self.backend, self.metrics, self.journal)
         
         if not strategy:
             logger(f"Error: Unknown mode {mode}")
@@ -77,9 +95,24 @@ class AutomationService:
         # We don't join here to avoid blocking UI, usually daemon thread just dies or logic stops
         self.is_running_flag = False
 
+    def shutdown(self) -> None:
+        """
+        Stops the automation and flushes the journal. Call once on application exit.
+        """
+        self.stop_automation()
+        if self.journal:
+            self.journal.close()
+            self.journal = None
+
     def trigger_snapshot(self) -> None:
         if self.is_running_flag:
             self.snapshot_event.set()
 
     def is_running(self) -> bool:
         return self.is_running_flag
+
+    def get_metrics(self) -> MetricsSnapshot:
+        """
+        Consistent-enough copy of the automation metrics; cheap enough to call once per UI refresh.
+        """
+        return self.metrics.snapshot()
@@ -0,0 +1,83 @@
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from ag_accept.services.text_matcher import TextsOrMatcher, as_matcher
+from ag_accept.services.tree_scanner import ButtonLocation
+from ag_accept.services.ui_backend import window_key
+
+
+def follow_location(window: Any, location: ButtonLocation, search_texts: TextsOrMatcher) -> Optional[Tuple[Any, str]]:
+    """
+    The button at 'location' in 'window' as (button, matched pattern), if a button matching
+    'search_texts' is still there; one GetChildren per level.
+    """
+    matcher = as_matcher(search_texts)
+    control = window
+    last = len(location.path) - 1
+    try:
+        for level, index in enumerate(location.path):
+            children = control.GetChildren()
+            if index >= len(children):
+                return None
+            control = children[index]
+            # Ancestors must still be the same containers, or the index path points elsewhere
+            if level < last and control.Name != location.ancestors[level]:
+                return None
+
+        pattern = matcher.search(control.Name)
+        if pattern is None or control.ControlTypeName != "ButtonControl":
+            return None
+        if location.automation_id and control.AutomationId != location.automation_id:
+            return None
+        return control, pattern
+    except Exception:
+        return None
+
+
+class ButtonLocationCache:
+    """
+    Remembers where the last matched button of each window was, so the next scan can
+    probe that exact spot (one GetChildren per level) before searching the whole tree.
+    """
+
+    def __init__(self):
+        self.locations: Dict[Any, ButtonLocation] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def remember(self, window: Any, location: Optional[ButtonLocation]) -> None:
+        if location is not None and location.path:
+            self.locations[window_key(window)] = location
+
+    def location_for(self, window: Any) -> Optional[ButtonLocation]:
+        """The remembered button location of 'window', if any."""
+        return self.locations.get(window_key(window))
+
+    def probe(self, window: Any, search_texts: TextsOrMatcher) -> Optional[Tuple[Any, str]]:
+        """
+        Follows the remembered path and returns (button, matched pattern) if a matching
+        button is still there, otherwise None.
+        """
+        location = self.location_for(window)
+        if location is None:
+            return None
+
+        found = follow_location(window, location, search_texts)
+        if found is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return found
+
+    def retain(self, keys: Iterable[Any]) -> None:
+        """
+        Drops locations of windows that are no longer present.
+        """
+        keep = set(keys)
+        for key in [k for k in self.locations if k not in keep]:
+            self.evict(key)
+
+    def evict(self, key: Any) -> None:
+        self.locations.pop(key, None)
+
+    def clear(self) -> None:
+        self.locations.clear()
@@ -1,32 +1,258 @@
+import copy
 import json
 import os
+import threading
+import time
 import platformdirs
-from typing import Any, List, Optional
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, List, Mapping, Optional, Tuple
+
+from ag_accept.services.rule_engine import Rule, RuleSet
+from ag_accept.services.text_matcher import TextMatcher
+from ag_accept.services.tree_scanner import ScanBudget
 
 APP_NAME = "ag-accept"
 APP_AUTHOR = "RyosukeMondo"
 
+DEFAULT_CONFIG = {
+    "interval": 1.0,
+    "interval_min": 0.1,
+    "interval_max": 5.0,
+    "backoff_factor": 1.5,
+    "burst_intervals": [0.2, 0.2, 0.5, 0.5],
+    "interval_jitter": 0.1,
+    "target_window_title": "Antigravity",
+    "search_texts_ide": ["Run command?", "Reject", "Accept"],
+    "search_texts_agent_manager": ["Accept"],
+    "context_text_agent_manager": ["Run command?"],
+    # Accept rules: {"name", "title", "context": [...], "buttons": [...], "action": "click"|"keys", "keys", "priority"}.
+    # Empty = the single rule given by the keys above
+    "rules": [],
+    "match_case_insensitive": False,
+    "match_whole_word": False,
+    "mode": "AgentManager",
+    "detection_mode": "poll",
+    "safety_poll_interval": 10.0,
+    "skip_unchanged_windows": False,
+    "button_location_cache": True,
+    "action_cooldown": 5.0,
+    "action_cache_size": 256,
+    "focus_free_actions": True,
+    "async_actions": True,
+    "action_queue_size": 16,
+    "action_timeout": 5.0,
+    "parallel_workers": 1,
+    "signature_levels": 2,
+    "signature_force_rescan_ticks": 10,
+    "scan_node_budget": 20000,
+    "scan_time_budget": 2.0,
+    "scan_order": "dfs",
+    "journal_enabled": True,
+    "journal_dir": "",
+    "journal_max_bytes": 10485760,
+    "journal_max_age": 86400.0,
+    "journal_compress": False,
+    "journal_keep": 10,
+    "snapshot_dir": "",
+    "snapshot_max_nodes": 5000,
+    "snapshot_max_depth": 25,
+    "snapshot_compress": False,
+    "snapshot_keep": 20,
+    "debug_enabled": False,
+    "window_width": 600,
+    "window_height": 700
+}
+
+# Allowed values of enumerated keys
+CONFIG_CHOICES = {
+    "mode": ("IDE", "AgentManager"),
+    "detection_mode": ("poll", "event"),
+    "scan_order": ("dfs", "bfs", "best"),
+}
+# Keys that must be strictly positive
+POSITIVE_KEYS = ("interval", "safety_poll_interval", "action_queue_size", "action_timeout")
+# Lists of UI texts; entries that are not strings are dropped
+TEXT_LIST_KEYS = ("search_texts_ide", "search_texts_agent_manager", "context_text_agent_manager")
+
+# Seconds between config.json mtime checks
+CONFIG_POLL_INTERVAL = 1.0
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    return value
+
+
+def validate_config(values: Mapping[str, Any]) -> Tuple[dict, List[str]]:
+    """
+    Defaults merged with 'values', each known key coerced to the type of its default.
+    Invalid values fall back to the default and are reported in the returned errors.
+    """
+    config = copy.deepcopy(DEFAULT_CONFIG)
+    errors = []
+    for key, value in values.items():
+        default = DEFAULT_CONFIG.get(key)
+        try:
+            if default is None or value is None:
+                pass
+            elif isinstance(default, bool):
+                if not isinstance(value, bool):
+                    raise ValueError("expected true/false")
+            elif isinstance(default, (int, float)):
+                value = type(default)(value)
+            elif isinstance(default, str):
+                value = str(value)
+            elif isinstance(default, list):
+                if not isinstance(value, list):
+                    raise ValueError("expected a list")
+            if key in CONFIG_CHOICES and value not in CONFIG_CHOICES[key]:
+                raise ValueError(f"expected one of {', '.join(CONFIG_CHOICES[key])}")
+            if key in POSITIVE_KEYS and value <= 0:
+                raise ValueError("expected a positive number")
+            if key == "rules":
+                # Invalid rules are dropped one by one; the valid ones still apply
+                valid = []
+                for index, entry in enumerate(value):
+                    try:
+                        Rule.from_mapping(entry, index)
+                        valid.append(entry)
+                    except ValueError as e:
+                        errors.append(f"rules[{index}]: {e}")
+                value = valid
+            if key in TEXT_LIST_KEYS:
+                valid = []
+                for index, entry in enumerate(value):
+                    if isinstance(entry, str):
+                        valid.append(entry)
+                    else:
+                        errors.append(f"{key}[{index}]: {entry!r} (expected a string)")
+                value = valid
+        except (TypeError, ValueError) as e:
+            errors.append(f"{key}: {value!r} ({e})")
+            continue
+        config[key] = value
+    return config, errors
+
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """
+    Immutable, validated view of the config at one point in time, with the values the
+    automation loop needs already typed and compiled. Exposes 'get' like ConfigService,
+    so anything that reads config can be handed a snapshot.
+    """
+    values: Mapping[str, Any]
+    version: int = 0
+    errors: Tuple[str, ...] = ()
+    context_matcher: TextMatcher = field(init=False, repr=False)
+    search_matcher: TextMatcher = field(init=False, repr=False)
+    ide_search_matcher: TextMatcher = field(init=False, repr=False)
+    budget: ScanBudget = field(init=False)
+    rules: RuleSet = field(init=False, repr=False)
+
+    def __post_init__(self):
+        search_texts = [s.strip() for s in self.values["search_texts_agent_manager"] if s]
+        context_texts = self.values["context_text_agent_manager"]
+        object.__setattr__(self, "context_matcher", TextMatcher.from_config(self, context_texts))
+        object.__setattr__(self, "search_matcher", TextMatcher.from_config(self, search_texts))
+        # IDE mode falls back to its own list when the shared one is empty
+        ide_texts = search_texts or self.values["search_texts_ide"]
+        object.__setattr__(self, "ide_search_matcher", TextMatcher.from_config(self, ide_texts))
+        object.__setattr__(self, "budget", ScanBudget.from_config(self))
+        object.__setattr__(self, "rules", RuleSet.from_config(self))
+
+    @classmethod
+    def from_mapping(cls, values: Mapping[str, Any], version: int = 0) -> "ConfigSnapshot":
+        config, errors = validate_config(values)
+        return cls(_freeze(config), version, tuple(errors))
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.values.get(key, default)
+
+    @property
+    def interval(self) -> float:
+        return self.values["interval"]
+
+    @property
+    def target_window_title(self) -> str:
+        return self.values["target_window_title"]
+
+    @property
+    def detection_mode(self) -> str:
+        return self.values["detection_mode"]
+
 class ConfigService:
     """
     Service for managing application configuration.
     Wraps config file operations and provides typed accessors.
+    Every change (set, reload, or an edit of config.json noticed by 'snapshot') publishes a new
+    ConfigSnapshot; readers on other threads use 'snapshot()' instead of the mutable dict.
+    Values set with 'persist=False' (e.g. command line overrides) apply on top of the file
+    values but are never written to it.
     """
     def __init__(self):
         self.config_dir = platformdirs.user_config_dir(APP_NAME, APP_AUTHOR)
         self.config_path = os.path.join(self.config_dir, "config.json")
-        self.default_config = {
-            "interval": 1.0,
-            "target_window_title": "Antigravity",
-            "search_texts_ide": ["Run command?", "Reject", "Accept"],
-            "search_texts_agent_manager": ["Accept"],
-            "context_text_agent_manager": ["Run command?"],
-            "mode": "AgentManager",
-            "debug_enabled": False,
-            "window_width": 600,
-            "window_height": 700
-        }
+        self.default_config = copy.deepcopy(DEFAULT_CONFIG)
+        self.poll_interval = CONFIG_POLL_INTERVAL
+        self._lock = threading.RLock()
+        self._version = 0
+        self._snapshot: Optional[ConfigSnapshot] = None
+        self._file_mtime: Optional[float] = None
+        self._last_poll = 0.0
+        self._overrides: dict = {}
         self.config = self._load_config()
 
+    @property
+    def config(self) -> dict:
+        return self._config
+
+    @config.setter
+    def config(self, value: dict) -> None:
+        with self._lock:
+            self._config = value
+            self._publish()
+
+    def _publish(self) -> None:
+        self._version += 1
+        snapshot = ConfigSnapshot.from_mapping({**self._config, **self._overrides}, self._version)
+        for error in snapshot.errors:
+            print(f"ConfigService: Invalid value, using default: {error}")
+        # A single reference assignment, so readers see either the old or the new snapshot
+        self._snapshot = snapshot
+
+    def snapshot(self) -> ConfigSnapshot:
+        """
+        Current immutable config. Checks config.json for external edits at most every
+        'poll_interval' seconds and reloads it when its mtime changed.
+        """
+        now = time.monotonic()
+        if now - self._last_poll >= self.poll_interval:
+            self._last_poll = now
+            self.check_for_changes()
+        return self._snapshot
+
+    def check_for_changes(self) -> bool:
+        """Reloads config.json if it changed on disk since it was last read or written. Returns True if so."""
+        try:
+            mtime = os.path.getmtime(self.config_path)
+        except OSError:
+            return False
+        if mtime == self._file_mtime:
+            return False
+        self.reload()
+        return True
+
+    def _file_stamp(self) -> Optional[float]:
+        try:
+            return os.path.getmtime(self.config_path)
+        except OSError:
+            return None
+
     def _load_config(self) -> dict:
         if not os.path.exists(self.config_path):
             try:
@@ -38,35 +264,70 @@ class ConfigService:
                 return self.default_config.copy()
 
         try:
-            with open(self.config_path, "r", encoding="utf-8") as f:
-                user_config = json.load(f)
-                # Merge with defaults
-                config = self.default_config.copy()
-                config.update(user_config)
-                return config
+            return self._read_config()
         except Exception as e:
             print(f"ConfigService: Error loading config: {e}")
             return self.default_config.copy()
 
+    def _read_config(self) -> dict:
+        """Defaults merged with config.json; raises if the file cannot be read or parsed."""
+        stamp = self._file_stamp()
+        with open(self.config_path, "r", encoding="utf-8") as f:
+            user_config = json.load(f)
+        # Merge with defaults
+        config = self.default_config.copy()
+        config.update(user_config)
+        self._file_mtime = stamp
+        return config
+
     def save(self) -> None:
-        """Saves values to disk."""
-        try:
-            with open(self.config_path, "w", encoding="utf-8") as f:
-                json.dump(self.config, f, indent=4)
-        except Exception as e:
-            print(f"ConfigService: Error saving config: {e}")
+        """Saves values to disk (temp file + rename, so readers never see a partial file)."""
+        with self._lock:
+            tmp_path = self.config_path + ".tmp"
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(self.config, f, indent=4)
+                os.replace(tmp_path, self.config_path)
+                # Our own write is not an external change
+                self._file_mtime = self._file_stamp()
+            except Exception as e:
+                print(f"ConfigService: Error saving config: {e}")
 
     def reload(self) -> None:
-        self.config = self._load_config()
+        if self._snapshot is None or not os.path.exists(self.config_path):
+            self.config = self._load_config()
+            return
+        try:
+            self.config = self._read_config()
+        except Exception as e:
+            # E.g. a half-saved edit: keep the last good config until the file changes again
+            self._file_mtime = self._file_stamp()
+            print(f"ConfigService: Error loading config, keeping the previous one: {e}")
 
     def get(self, key: str, default: Any = None) -> Any:
+        if key in self._overrides:
+            return self._overrides[key]
         return self.config.get(key, default)
 
-    def set(self, key: str, value: Any) -> None:
-        self.config[key] = value
+    def set(self, key: str, value: Any, persist: bool = True) -> None:
+        """
+        Sets 'key' in memory and publishes a new snapshot. With 'persist' the value is written by
+        the next 'save'; without it the value only overrides the file for this run.
+        """
+        with self._lock:
+            if persist:
+                self._overrides.pop(key, None)
+                self._config[key] = value
+            else:
+                self._overrides[key] = value
+            self._publish()
 
     def get_config_path(self) -> str:
         return self.config_path
+
+    def get_data_dir(self) -> str:
+        """Per-user directory for files the app produces (journal, snapshots)."""
+        return platformdirs.user_data_dir(APP_NAME, APP_AUTHOR)
     
     # Typed Accessors 
     
@@ -86,6 +347,18 @@ class ConfigService:
     def mode(self, value: str):
         self.set("mode", value)
 
+    @property
+    def detection_mode(self) -> str:
+        return self.get("detection_mode", "poll")
+
+    @detection_mode.setter
+    def detection_mode(self, value: str):
+        self.set("detection_mode", value)
+
+    @property
+    def safety_poll_interval(self) -> float:
+        return float(self.get("safety_poll_interval", 10.0))
+
     @property
     def debug_enabled(self) -> bool:
         return bool(self.get("debug_enabled", False))
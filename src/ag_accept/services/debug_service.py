@@ -1,28 +1,162 @@
+import glob
+import gzip
 import os
+import threading
+import time
+from typing import Any, Iterator, List, Optional, Tuple
+
+import platformdirs
+
+from ag_accept.services.config_service import APP_NAME, APP_AUTHOR
+from ag_accept.services.ui_backend import UiBackend, UiaBackend, window_key
+
+SNAPSHOT_PREFIX = "snapshot-"
+
+
+def default_snapshot_dir() -> str:
+    return os.path.join(platformdirs.user_data_dir(APP_NAME, APP_AUTHOR), "snapshots")
+
+
+def iter_tree(backend: UiBackend, root: Any, max_depth: int = 25, max_nodes: int = 5000) -> Iterator[Tuple[int, dict]]:
+    """
+    Pre-order (depth, properties) of the subtree under 'root', reading each node once.
+    Stops after 'max_nodes' nodes (0 = unlimited); unreadable nodes are skipped.
+    """
+    stack = [(root, 0)]
+    count = 0
+    while stack:
+        control, depth = stack.pop()
+        try:
+            props = backend.get_properties(control)
+        except Exception as e:
+            props = {"error": str(e)}
+        yield depth, props
+        count += 1
+        if max_nodes and count >= max_nodes:
+            return
+        if depth < max_depth:
+            try:
+                children = backend.get_children(control)
+            except Exception:
+                continue
+            stack.extend((child, depth + 1) for child in reversed(children))
+
+
+def format_structure_line(depth: int, props: dict) -> str:
+    indent = "  " * depth
+    if "error" in props:
+        return f"{indent}<Error reading control: {props['error']}>"
+    extra = ""
+    if props.get("rect"):
+        extra += f" Rect:{props['rect']}"
+    if props.get("automation_id"):
+        extra += f" AutoID:{props['automation_id']}"
+    return f"{indent}- [{props.get('control_type', '')}] '{props.get('name', '')}'{extra}"
+
 
 class DebugService:
     """
     Service for saving and viewing debug snapshots.
+    Snapshots are timestamped files (optionally gzipped) in the user data dir, captured and
+    written on a background thread; only the newest 'keep' are retained.
     """
-    
-    def __init__(self, debug_filename: str = "debug_snapshot.txt"):
-        self.debug_filename = debug_filename
 
-    def save_snapshot(self, content: str) -> None:
+    def __init__(self):
+        self.snapshot_dir = default_snapshot_dir()
+        self.max_nodes = 5000
+        self.max_depth = 25
+        self.compress = False
+        self.keep = 20
+        self.last_path: Optional[str] = None
+        self.capture_thread: Optional[threading.Thread] = None
+
+    def configure_from(self, config_manager: Any) -> None:
+        self.snapshot_dir = config_manager.get("snapshot_dir") or default_snapshot_dir()
+        self.max_nodes = int(config_manager.get("snapshot_max_nodes", self.max_nodes))
+        self.max_depth = int(config_manager.get("snapshot_max_depth", self.max_depth))
+        self.compress = bool(config_manager.get("snapshot_compress", self.compress))
+        self.keep = int(config_manager.get("snapshot_keep", self.keep))
+
+    def capture_snapshot(self, header: str, window: Any = None, backend: Optional[UiBackend] = None, open_after: bool = False) -> str:
         """
-        Saves the given string content to a file.
+        Starts writing a snapshot ('header', then the structure and text of 'window' from a
+        single walk) on a background thread. Returns the path it is written to.
+        The background thread looks 'window' up again by its key rather than using a control
+        created on the calling thread.
         """
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(self.snapshot_dir, f"{SNAPSHOT_PREFIX}{stamp}.txt" + (".gz" if self.compress else ""))
+        n = 1
+        while os.path.exists(path):
+            path = os.path.join(self.snapshot_dir, f"{SNAPSHOT_PREFIX}{stamp}-{n}.txt" + (".gz" if self.compress else ""))
+            n += 1
+        self.capture_thread = threading.Thread(
+            target=self._capture, args=(path, header, window_key(window) if window is not None else None, backend or UiaBackend(), open_after),
+            name="ag-accept-snapshot", daemon=True,
+        )
+        self.capture_thread.start()
+        return path
+
+    def _capture(self, path: str, header: str, key: Any, backend: UiBackend, open_after: bool) -> None:
+        backend.initialize_thread(True)
         try:
-            with open(self.debug_filename, "w", encoding="utf-8") as f:
-                f.write(content)
+            os.makedirs(self.snapshot_dir, exist_ok=True)
+            opener = gzip.open if path.endswith(".gz") else open
+            with opener(path, "wt", encoding="utf-8") as f:
+                f.write(header)
+                window = backend.window_from_key(key) if key is not None else None
+                if key is not None and window is None:
+                    f.write("\n\nTARGET STRUCTURE:\n<Window is gone>\n")
+                if window is not None:
+                    # Structure is streamed as it is walked; the (shorter) text dump follows it
+                    texts: List[str] = []
+                    count = 0
+                    f.write("\n\nTARGET STRUCTURE:\n")
+                    for depth, props in iter_tree(backend, window, self.max_depth, self.max_nodes):
+                        count += 1
+                        f.write(format_structure_line(depth, props) + "\n")
+                        if props.get("name"):
+                            texts.append(f"{'  ' * depth}{props['name']} [{props.get('control_type', '')}]")
+                    if self.max_nodes and count >= self.max_nodes:
+                        f.write(f"... stopped after {self.max_nodes} nodes\n")
+                    f.write("\nTEXT DUMP:\n")
+                    f.write("\n".join(texts))
+                    f.write("\n")
+            self.last_path = path
+            self.prune()
         except Exception as e:
             print(f"DebugService: Failed to save snapshot: {e}")
+            return
+        finally:
+            backend.uninitialize_thread()
+        if open_after:
+            self.open_snapshot(path)
+
+    def prune(self) -> None:
+        """Deletes all but the newest 'keep' snapshots (0 = keep all)."""
+        if self.keep <= 0:
+            return
+        snapshots = sorted(glob.glob(os.path.join(self.snapshot_dir, SNAPSHOT_PREFIX + "*")), key=os.path.getmtime)
+        for old in snapshots[:-self.keep]:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+
+    def save_snapshot(self, content: str) -> None:
+        """
+        Saves the given string content as a new snapshot (in the background).
+        """
+        self.capture_snapshot(content)
 
-    def open_snapshot(self) -> None:
+    def open_snapshot(self, path: Optional[str] = None) -> None:
         """
-        Opens the snapshot file using the OS default application.
+        Opens the snapshot file (default: the latest) using the OS default application.
         """
+        path = path or self.last_path
+        if not path:
+            return
         try:
-            os.startfile(self.debug_filename)
+            os.startfile(path)
         except Exception as e:
             print(f"DebugService: Failed to open snapshot: {e}")
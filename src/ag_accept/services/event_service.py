@@ -0,0 +1,213 @@
+import threading
+import time
+from dataclasses import dataclass
+from typing import Protocol, Any, Callable, Dict, List, Optional
+
+from ag_accept.services.ui_backend import uia_client, window_key
+
+EVENT_WINDOW_OPENED = "window_opened"
+EVENT_STRUCTURE_CHANGED = "structure_changed"
+
+# UIA identifiers (UIAutomationClient.h)
+UIA_WINDOW_OPENED_EVENT_ID = 20016
+TREE_SCOPE_SUBTREE = 7
+
+
+@dataclass
+class WindowEvent:
+    """
+    A notification that a top-level window appeared or its tree changed.
+    """
+    kind: str
+    window: Any
+
+
+class EventSource(Protocol):
+    def start(self, callback: Callable[[WindowEvent], None]) -> None:
+        """Begin delivering events to 'callback' (may be called from any thread)."""
+        ...
+
+    def stop(self) -> None:
+        """Stop delivering events and release subscriptions."""
+        ...
+
+    def watch(self, window: Any) -> None:
+        """Subscribe to structure changes of a specific top-level window."""
+        ...
+
+
+class InProcessEventSource:
+    """
+    Event source driven by explicit 'emit' calls. Used by tests and anywhere
+    events are produced in Python rather than by UI Automation.
+    """
+
+    def __init__(self):
+        self.callback: Optional[Callable[[WindowEvent], None]] = None
+        self.watched: Dict[Any, Any] = {}
+
+    def start(self, callback: Callable[[WindowEvent], None]) -> None:
+        self.callback = callback
+
+    def stop(self) -> None:
+        self.callback = None
+        self.watched.clear()
+
+    def watch(self, window: Any) -> None:
+        self.watched[window_key(window)] = window
+
+    def emit(self, kind: str, window: Any) -> None:
+        if self.callback:
+            self.callback(WindowEvent(kind, window))
+
+
+class UiaEventSource:
+    """
+    Event source backed by UI Automation COM event handlers.
+    Window-opened is subscribed on the desktop; structure-changed only on watched windows,
+    so the handler always knows which top-level window was affected.
+    """
+
+    def __init__(self):
+        self.callback: Optional[Callable[[WindowEvent], None]] = None
+        self.uia = None
+        self.window_handler = None
+        # Handlers are kept alive here for as long as UIA may call them
+        self.structure_handlers: Dict[Any, Any] = {}
+        self.watched: Dict[Any, Any] = {}
+
+    def start(self, callback: Callable[[WindowEvent], None]) -> None:
+        import comtypes
+        import uiautomation as auto
+        from comtypes.gen import UIAutomationClient as UIA
+
+        self.callback = callback
+        self.uia = uia_client()
+        source = self
+
+        class WindowOpenedHandler(comtypes.COMObject):
+            _com_interfaces_ = [UIA.IUIAutomationEventHandler]
+
+            def IUIAutomationEventHandler_HandleAutomationEvent(self, sender, event_id):
+                try:
+                    control = auto.Control.CreateControlFromElement(sender)
+                    top = control.GetTopLevelControl() or control
+                    source._dispatch(EVENT_WINDOW_OPENED, top)
+                except Exception:
+                    pass
+
+        self.window_handler = WindowOpenedHandler()
+        self.uia.AddAutomationEventHandler(UIA_WINDOW_OPENED_EVENT_ID, self.uia.GetRootElement(),
+                                           TREE_SCOPE_SUBTREE, None, self.window_handler)
+
+    def watch(self, window: Any) -> None:
+        key = window_key(window)
+        if key in self.watched or not self.uia:
+            return
+        # One handler object per window so events are attributed without walking up from the sender
+        handler = self._structure_handler_for(window)
+        try:
+            self.uia.AddStructureChangedEventHandler(window.Element, TREE_SCOPE_SUBTREE, None, handler)
+        except Exception:
+            return
+        self.watched[key] = window
+        self.structure_handlers[key] = handler
+
+    def _structure_handler_for(self, window: Any) -> Any:
+        import comtypes
+        from comtypes.gen import UIAutomationClient as UIA
+        source = self
+
+        class WindowStructureHandler(comtypes.COMObject):
+            _com_interfaces_ = [UIA.IUIAutomationStructureChangedEventHandler]
+
+            def IUIAutomationStructureChangedEventHandler_HandleStructureChangedEvent(self, sender, change_type, runtime_id):
+                source._dispatch(EVENT_STRUCTURE_CHANGED, window)
+
+        return WindowStructureHandler()
+
+    def stop(self) -> None:
+        self.callback = None
+        if self.uia:
+            try:
+                self.uia.RemoveAllEventHandlers()
+            except Exception:
+                pass
+        self.uia = None
+        self.window_handler = None
+        self.structure_handlers.clear()
+        self.watched.clear()
+
+    def _dispatch(self, kind: str, window: Any) -> None:
+        callback = self.callback
+        if callback:
+            callback(WindowEvent(kind, window))
+
+
+class WindowEventService:
+    """
+    Collects window events from a pluggable EventSource and hands them to the automation
+    loop in coalesced batches: one entry per affected window, however many events it produced.
+    """
+
+    def __init__(self, source: Optional[EventSource] = None, debounce: float = 0.05):
+        self.source = source or UiaEventSource()
+        self.debounce = debounce
+        self.condition = threading.Condition()
+        self.pending: Dict[Any, Any] = {}
+        self.running = False
+
+    def start(self) -> None:
+        with self.condition:
+            self.pending.clear()
+        self.source.start(self._on_event)
+        self.running = True
+
+    def stop(self) -> None:
+        self.running = False
+        try:
+            self.source.stop()
+        finally:
+            with self.condition:
+                self.pending.clear()
+                self.condition.notify_all()
+
+    def watch(self, window: Any) -> None:
+        try:
+            self.source.watch(window)
+        except Exception as e:
+            print(f"WindowEventService: Failed to watch window: {e}")
+
+    def _on_event(self, event: WindowEvent) -> None:
+        try:
+            key = window_key(event.window)
+        except Exception:
+            return
+        with self.condition:
+            self.pending[key] = event.window
+            self.condition.notify_all()
+
+    def wait_for_windows(self, timeout: float, stop_event: threading.Event) -> Optional[List[Any]]:
+        """
+        Blocks until at least one window is affected, 'timeout' elapses or 'stop_event' is set.
+        Returns the affected windows, [] when stopping, or None on timeout (safety-net poll due).
+        """
+        deadline = time.monotonic() + timeout
+        with self.condition:
+            while not self.pending:
+                if stop_event.is_set():
+                    return []
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                # Short slices so a stop request is noticed promptly
+                self.condition.wait(min(remaining, 0.25))
+
+        # Let a burst of related events settle into the same batch
+        if self.debounce > 0:
+            stop_event.wait(self.debounce)
+
+        with self.condition:
+            windows = list(self.pending.values())
+            self.pending.clear()
+        return windows
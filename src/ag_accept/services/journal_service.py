@@ -0,0 +1,191 @@
+import glob
+import gzip
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+# Record kinds
+EVENT_TICK = "tick"            # One scheduler tick: strategy, outcome, seconds
+EVENT_DISCOVERY = "discovery"  # Target windows appeared / disappeared / were renamed
+EVENT_MATCH = "match"          # A window scan found the context: button found?, nodes, seconds
+EVENT_ACTION = "action"        # Button pressed (or not): method, success, seconds
+
+ACTIVE_SUFFIX = ".jsonl"
+# Writer thread flushes after draining at most this many queued records
+FLUSH_BATCH = 256
+
+_CLOSE = object()
+
+
+class Journal:
+    """
+    Append-only JSONL journal of automation events.
+    'record' only puts the event on a bounded queue (dropping it when full) and never touches
+    the disk; a background thread writes, flushes and rotates. The active file is
+    '<name>.jsonl'; on rotation it is renamed to '<name>-<YYYYmmdd-HHMMSS>.jsonl' (gzipped to
+    '.jsonl.gz' when 'compress' is set) and only the newest 'keep' rotated files are kept.
+    A 'max_bytes', 'max_age' or 'keep' of 0 disables that limit.
+    """
+
+    def __init__(self, directory: str, name: str = "journal", max_bytes: int = 10 * 1024 * 1024,
+                 max_age: float = 24 * 3600.0, compress: bool = False, keep: int = 10, queue_size: int = 10000):
+        self.directory = directory
+        self.name = name
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.compress = compress
+        self.keep = keep
+        self.dropped = 0
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._file = None
+        self._opened_at = 0.0
+
+    @classmethod
+    def from_config(cls, config_manager: Any, default_directory: str) -> Optional["Journal"]:
+        """
+        Journal configured by the 'journal_*' keys, or None when disabled.
+        """
+        if not config_manager.get("journal_enabled", True):
+            return None
+        return cls(
+            config_manager.get("journal_dir") or default_directory,
+            max_bytes=int(config_manager.get("journal_max_bytes", 10 * 1024 * 1024)),
+            max_age=float(config_manager.get("journal_max_age", 24 * 3600.0)),
+            compress=bool(config_manager.get("journal_compress", False)),
+            keep=int(config_manager.get("journal_keep", 10)),
+        )
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.directory, self.name + ACTIVE_SUFFIX)
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="ag-accept-journal", daemon=True)
+            self._thread.start()
+
+    def record(self, kind: str, **fields: Any) -> None:
+        fields["ts"] = time.time()
+        fields["kind"] = kind
+        try:
+            self._queue.put_nowait(fields)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self, timeout: float = 5.0) -> None:
+        """
+        Writes what is queued, then stops the writer thread.
+        """
+        if self._thread is None:
+            return
+        try:
+            self._queue.put(_CLOSE, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+        self._thread = None
+
+    # --- Writer thread ---
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            written = 0
+            while item is not _CLOSE:
+                self._write(item)
+                written += 1
+                if written >= FLUSH_BATCH:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if self._file:
+                self._file.flush()
+            if item is _CLOSE:
+                break
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        try:
+            if self._file is None:
+                self._open()
+            elif (self.max_bytes and self._file.tell() >= self.max_bytes) or (self.max_age and time.time() - self._opened_at >= self.max_age):
+                self._rotate()
+            self._file.write(json.dumps(record, separators=(",", ":"), default=str) + "\n")
+        except Exception as e:
+            print(f"Journal: Error writing {self.path}: {e}")
+
+    def _open(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        self._opened_at = time.time()
+        if os.path.exists(self.path):
+            # Appending to a file left by an earlier run: its age counts from its first record
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._opened_at = float(json.loads(f.readline())["ts"])
+            except Exception:
+                pass
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def _rotate(self) -> None:
+        self._file.close()
+        self._file = None
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self._opened_at))
+        rotated = os.path.join(self.directory, f"{self.name}-{stamp}{ACTIVE_SUFFIX}")
+        n = 1
+        while os.path.exists(rotated) or os.path.exists(rotated + ".gz"):
+            rotated = os.path.join(self.directory, f"{self.name}-{stamp}-{n}{ACTIVE_SUFFIX}")
+            n += 1
+        os.replace(self.path, rotated)
+        if self.compress:
+            with open(rotated, "rb") as src, gzip.open(rotated + ".gz", "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(rotated)
+        self._prune()
+        self._open()
+
+    def _prune(self) -> None:
+        if self.keep <= 0:
+            return
+        for old in rotated_files(self.directory, self.name)[:-self.keep]:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+
+
+def rotated_files(directory: str, name: str = "journal") -> List[str]:
+    """Rotated journal files, oldest first."""
+    pattern = os.path.join(directory, f"{name}-*{ACTIVE_SUFFIX}")
+    return sorted(glob.glob(pattern) + glob.glob(pattern + ".gz"), key=lambda p: os.path.basename(p).split(".")[0])
+
+
+def read_journal(path: str, name: str = "journal") -> Iterator[Dict[str, Any]]:
+    """
+    Records from a journal file ('.jsonl' or '.jsonl.gz') or from a journal directory
+    (rotated files oldest first, then the active file). Unparseable lines are skipped.
+    """
+    if os.path.isdir(path):
+        files = rotated_files(path, name)
+        active = os.path.join(path, name + ACTIVE_SUFFIX)
+        if os.path.exists(active):
+            files.append(active)
+    else:
+        files = [path]
+
+    for file_path in files:
+        opener = gzip.open if file_path.endswith(".gz") else open
+        with opener(file_path, "rt", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
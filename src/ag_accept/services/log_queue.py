@@ -0,0 +1,73 @@
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import List, Tuple
+
+# Status / display tag pairs
+STATUS_INFO = ("INFO", "normal")
+STATUS_SUCCESS = ("SUCCESS", "success")
+STATUS_ERROR = ("ERROR", "error")
+STATUS_CHECK = ("CHECK", "muted")
+
+
+@dataclass(frozen=True)
+class LogRecord:
+    timestamp: str
+    status: str
+    tag: str
+    message: str
+
+
+def classify(message: str) -> Tuple[str, str]:
+    msg_lower = message.lower()
+    if "success" in msg_lower:
+        return STATUS_SUCCESS
+    if "error" in msg_lower or "fail" in msg_lower:
+        return STATUS_ERROR
+    if "checking" in msg_lower or "skipping" in msg_lower:
+        return STATUS_CHECK
+    return STATUS_INFO
+
+
+class LogQueue:
+    """
+    Bounded, thread-safe hand-off of log records from worker threads to the UI thread.
+    When full, the oldest record is dropped and counted; 'drain' reports the drops since the
+    previous drain so the consumer can show a summary instead.
+    """
+
+    def __init__(self, maxsize: int = 1000):
+        self.maxsize = maxsize
+        self._records = deque()
+        self._lock = threading.Lock()
+        self._dropped_pending = 0
+        self.dropped = 0  # All-time
+
+    def push(self, message: str) -> None:
+        status, tag = classify(message)
+        record = LogRecord(time.strftime("%H:%M:%S"), status, tag, message)
+        with self._lock:
+            if len(self._records) >= self.maxsize:
+                self._records.popleft()
+                self._dropped_pending += 1
+                self.dropped += 1
+            self._records.append(record)
+
+    def drain(self, max_items: int = 0) -> Tuple[List[LogRecord], int]:
+        """
+        Removes up to 'max_items' records (0 = all), oldest first.
+        Returns (records, dropped since the last drain).
+        """
+        with self._lock:
+            if not max_items or max_items >= len(self._records):
+                records = list(self._records)
+                self._records.clear()
+            else:
+                records = [self._records.popleft() for _ in range(max_items)]
+            dropped = self._dropped_pending
+            self._dropped_pending = 0
+        return records, dropped
+
+    def __len__(self) -> int:
+        return len(self._records)
@@ -0,0 +1,330 @@
+import random
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from ag_accept.services.tree_scanner import NodeInfo
+from ag_accept.services.ui_backend import TopLevelListing, control_properties, find_listed_window, walk_find_first
+
+PROMPT_CONTEXT = "Run command?"
+PROMPT_ACCEPT = "Accept"
+
+
+class MemoryRect:
+    def __init__(self, left: int, top: int, right: int, bottom: int):
+        self.left, self.top, self.right, self.bottom = left, top, right, bottom
+
+
+class MemoryControl:
+    """
+    In-memory UI element with the uiautomation Control surface the services use.
+    Every property read, child listing and action goes through its backend, which counts
+    the call and adds the simulated cross-process latency.
+    """
+
+    def __init__(self, backend: "MemoryBackend", name: str = "", control_type: str = "PaneControl",
+                 automation_id: str = "", is_offscreen: bool = False, native_handle: int = 0):
+        self.backend = backend
+        self._name = name
+        self._control_type = control_type
+        self._automation_id = automation_id
+        self._is_offscreen = is_offscreen
+        self._native_handle = native_handle
+        self._rect = MemoryRect(0, 0, 800, 600)
+        self.runtime_id = backend.next_runtime_id()
+        self.parent: Optional["MemoryControl"] = None
+        self.children: List["MemoryControl"] = []
+        # Actions; 'on_invoke' lets a tree react, e.g. a dialog closing once accepted
+        self.supports_invoke = control_type == "ButtonControl"
+        self.on_invoke: Optional[Callable[["MemoryControl"], None]] = None
+        self.invoked = 0
+        self.clicked = 0
+        self.keys_sent: List[str] = []
+
+    def __repr__(self) -> str:
+        return f"MemoryControl({self._control_type}, {self._name!r})"
+
+    # Tree editing (free: this is the "application" side, not the automation client)
+
+    def add(self, *children: "MemoryControl") -> "MemoryControl":
+        for child in children:
+            child.parent = self
+            self.children.append(child)
+        return self
+
+    def remove(self) -> None:
+        if self.parent is not None:
+            self.parent.children.remove(self)
+            self.parent = None
+
+    def rename(self, name: str) -> None:
+        self._name = name
+
+    def walk(self):
+        stack = [self]
+        while stack:
+            control = stack.pop()
+            yield control
+            stack.extend(reversed(control.children))
+
+    # Automation surface
+
+    @property
+    def Name(self) -> str:
+        self.backend.charge("property")
+        return self._name
+
+    @property
+    def ControlTypeName(self) -> str:
+        self.backend.charge("property")
+        return self._control_type
+
+    @property
+    def AutomationId(self) -> str:
+        self.backend.charge("property")
+        return self._automation_id
+
+    @property
+    def IsOffscreen(self) -> bool:
+        self.backend.charge("property")
+        return self._is_offscreen
+
+    @property
+    def BoundingRectangle(self) -> MemoryRect:
+        self.backend.charge("property")
+        return self._rect
+
+    @property
+    def NativeWindowHandle(self) -> int:
+        self.backend.charge("property")
+        return self._native_handle
+
+    def GetChildren(self) -> List["MemoryControl"]:
+        self.backend.charge("children")
+        return list(self.children)
+
+    def GetRuntimeId(self) -> List[int]:
+        self.backend.charge("property")
+        return list(self.runtime_id)
+
+    def Exists(self, maxSearchSeconds: float = 0, searchIntervalSeconds: float = 0.5) -> bool:
+        self.backend.charge("property")
+        control = self
+        while control.parent is not None:
+            control = control.parent
+        return control is self.backend.root
+
+    def Invoke(self) -> None:
+        self.backend.charge("action")
+        if not self.supports_invoke:
+            raise RuntimeError(f"{self!r} does not support Invoke")
+        self.invoked += 1
+        if self.on_invoke:
+            self.on_invoke(self)
+
+    def Click(self) -> None:
+        self.backend.charge("action")
+        self.clicked += 1
+        if self.on_invoke:
+            self.on_invoke(self)
+
+    def SendKeys(self, keys: str) -> None:
+        self.backend.charge("action")
+        self.keys_sent.append(keys)
+
+    def SetFocus(self) -> None:
+        self.backend.charge("action")
+        self.backend.focused = self
+
+
+class MemoryBackend:
+    """
+    Pure-Python UI tree backend. Runs anywhere, so hot paths can be tested and measured
+    without Windows. 'latency' is added to every per-element call and 'bulk_latency' to
+    each bulk request, to mimic cross-process UI Automation costs.
+    Call counters are plain ints; concurrent callers may lose the odd increment.
+    """
+
+    def __init__(self, latency: float = 0.0, bulk_latency: float = 0.0):
+        self.latency = latency
+        self.bulk_latency = bulk_latency
+        self.stats: Dict[str, int] = {"property": 0, "children": 0, "bulk": 0, "action": 0}
+        self._runtime_ids = 0
+        self._handles = 0x10000
+        self.root = MemoryControl(self, "Desktop", "PaneControl")
+        self.focused: Optional[MemoryControl] = None
+
+    def next_runtime_id(self) -> tuple:
+        self._runtime_ids += 1
+        return (42, self._runtime_ids)
+
+    def next_handle(self) -> int:
+        self._handles += 2
+        return self._handles
+
+    def charge(self, kind: str) -> None:
+        self.stats[kind] += 1
+        if self.latency > 0:
+            time.sleep(self.latency)
+
+    def reset_stats(self) -> None:
+        for kind in self.stats:
+            self.stats[kind] = 0
+
+    @property
+    def calls(self) -> int:
+        return sum(self.stats.values())
+
+    def initialize_thread(self, multithreaded: bool = False) -> None:
+        pass
+
+    def uninitialize_thread(self) -> None:
+        pass
+
+    def get_root(self) -> Any:
+        return self.root
+
+    def get_children(self, control: Any) -> List[Any]:
+        return control.GetChildren()
+
+    def get_properties(self, control: Any) -> Dict[str, Any]:
+        return control_properties(control)
+
+    def find_first(self, root: Any, predicate: Callable[[Any, int], bool]) -> Optional[Any]:
+        return walk_find_first(root, predicate)
+
+    def prefetch_subtree(self, root: Any, max_depth: int = 25) -> NodeInfo:
+        self.stats["bulk"] += 1
+        if self.bulk_latency > 0:
+            time.sleep(self.bulk_latency)
+
+        def to_node(control: MemoryControl, depth: int) -> NodeInfo:
+            r = control._rect
+            node = NodeInfo(control._name, control._control_type, control._automation_id, control._is_offscreen,
+                            (r.left, r.top, r.right, r.bottom), control=control)
+            if depth < max_depth:
+                node.children = [to_node(c, depth + 1) for c in control.children]
+            return node
+
+        return to_node(root, 0)
+
+    def list_top_level(self, root: Any) -> TopLevelListing:
+        # Modelled as one cached FindAll, like the UI Automation adapter
+        self.stats["bulk"] += 1
+        if self.bulk_latency > 0:
+            time.sleep(self.bulk_latency)
+        return [(w._native_handle or tuple(w.runtime_id), w._name, (lambda w: lambda: w)(w)) for w in root.children]
+
+    def window_from_key(self, key: Any) -> Optional[Any]:
+        return find_listed_window(self, key)
+
+    def invoke(self, control: Any) -> None:
+        control.Invoke()
+
+    def click(self, control: Any) -> None:
+        control.Click()
+
+    def send_keys(self, control: Any, keys: str) -> None:
+        control.SendKeys(keys)
+
+    def get_focused(self) -> Optional[Any]:
+        return self.focused
+
+    def set_focus(self, control: Any) -> None:
+        control.SetFocus()
+
+
+# Synthetic trees
+
+_CONTAINER_TYPES = ["PaneControl", "GroupControl", "ListControl", "CustomControl"]
+_LEAF_TYPES = ["TextControl", "TextControl", "TextControl", "HyperlinkControl", "ImageControl", "ButtonControl"]
+_WORDS = ["src", "main", "build", "output", "terminal", "explorer", "search", "problems", "editor",
+          "chat", "agent", "diff", "file", "line", "task", "view", "panel", "status", "debug", "test"]
+_BUTTON_NAMES = ["Copy", "Retry", "Close", "More Actions...", "Expand", "Collapse", "Open"]
+
+
+def build_prompt_dialog(backend: MemoryBackend, context_text: str = PROMPT_CONTEXT, accept_text: str = PROMPT_ACCEPT,
+                        dismiss_on_accept: bool = True) -> MemoryControl:
+    """
+    The "Run command?" prompt: the context text plus Reject / Accept buttons.
+    Accepting removes the dialog from the tree unless 'dismiss_on_accept' is False.
+    """
+    dialog = MemoryControl(backend, "", "GroupControl")
+    accept = MemoryControl(backend, accept_text, "ButtonControl", automation_id="accept")
+    dialog.add(
+        MemoryControl(backend, context_text, "TextControl"),
+        MemoryControl(backend, "Reject", "ButtonControl", automation_id="reject"),
+        accept,
+    )
+    if dismiss_on_accept:
+        accept.on_invoke = lambda _: dialog.remove()
+    return dialog
+
+
+def generate_window(backend: MemoryBackend, title: str = "Antigravity", depth: int = 6, fan_out: int = 4,
+                    max_nodes: Optional[int] = None, prompt: bool = True, context_text: str = PROMPT_CONTEXT,
+                    accept_text: str = PROMPT_ACCEPT, seed: int = 0) -> MemoryControl:
+    """
+    Builds a window tree level by level: up to 'fan_out' children per container, down to 'depth'
+    levels or until 'max_nodes' elements exist. Names and control types vary like an editor's tree
+    (some unnamed containers, text lines, unrelated buttons). With 'prompt', a prompt dialog is
+    appended under the last deepest container, where a chat panel would add it.
+    """
+    rng = random.Random(seed)
+    window = MemoryControl(backend, title, "WindowControl", native_handle=backend.next_handle())
+    budget = (max_nodes - 1) if max_nodes else None
+    if prompt and budget is not None:
+        budget = max(0, budget - 4)
+
+    level = [window]
+    last_container = window
+    for d in range(1, depth + 1):
+        next_level = []
+        leaf_level = d == depth
+        for parent in level:
+            for i in range(rng.randint(max(1, fan_out // 2), fan_out)):
+                if budget is not None and budget <= 0:
+                    break
+                if leaf_level or rng.random() < 0.25:
+                    control_type = rng.choice(_LEAF_TYPES)
+                else:
+                    control_type = rng.choice(_CONTAINER_TYPES)
+                if control_type == "ButtonControl":
+                    name = rng.choice(_BUTTON_NAMES)
+                elif control_type in _CONTAINER_TYPES:
+                    name = "" if rng.random() < 0.5 else f"{rng.choice(_WORDS)} {rng.choice(_WORDS)}"
+                else:
+                    name = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(1, 6)))
+                child = MemoryControl(backend, name, control_type, automation_id=f"n{d}_{i}")
+                parent.add(child)
+                if budget is not None:
+                    budget -= 1
+                if control_type in _CONTAINER_TYPES:
+                    next_level.append(child)
+                    last_container = child
+        if not next_level or (budget is not None and budget <= 0):
+            break
+        level = next_level
+
+    if prompt:
+        last_container.add(build_prompt_dialog(backend, context_text, accept_text))
+    return window
+
+
+def generate_desktop(backend: MemoryBackend, windows: int = 1, nodes_per_window: int = 1000, fan_out: int = 8,
+                     prompt_windows: int = 1, other_windows: int = 0, title: str = "Antigravity", seed: int = 0) -> MemoryControl:
+    """
+    Populates the backend's root with 'windows' target windows of about 'nodes_per_window'
+    elements each (the first 'prompt_windows' showing a prompt) plus 'other_windows' small
+    unrelated windows. Returns the root.
+    """
+    depth = 1
+    while fan_out ** depth < nodes_per_window:
+        depth += 1
+    # Level sizes average ~3/4 of 'fan_out', so allow a few extra levels to reach the node target
+    depth += 3
+    for i in range(windows):
+        name = title if windows == 1 else f"{title} - project {i}"
+        backend.root.add(generate_window(backend, name, depth, fan_out, nodes_per_window, prompt=i < prompt_windows, seed=seed + i))
+    for i in range(other_windows):
+        backend.root.add(generate_window(backend, f"Untitled - Notepad {i}", 3, 3, prompt=False, seed=seed + 1000 + i))
+    return backend.root
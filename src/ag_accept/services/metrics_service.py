@@ -0,0 +1,264 @@
+import bisect
+import threading
+import time
+import weakref
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Counters
+COUNTER_TICKS = "ticks"
+COUNTER_WINDOWS_SCANNED = "windows_scanned"
+COUNTER_NODES_VISITED = "nodes_visited"
+COUNTER_ACCEPTS = "accepts"
+COUNTER_FAILED_INVOKE = "failed_invoke"
+COUNTER_FAILED_CLICK = "failed_click"
+COUNTER_FAILED_SENDKEYS = "failed_sendkeys"
+COUNTER_DUPLICATES_SUPPRESSED = "duplicates_suppressed"  # Button found again within its action cooldown
+COUNTER_FOCUS_FREE = "focus_free_actions"                 # Actions that succeeded without focusing the window
+COUNTER_ACTIONS_DROPPED = "actions_dropped"                # Action requests refused (queue full) or gone stale
+COUNTER_ACTIONS_TIMED_OUT = "actions_timed_out"            # Actions given up after the action timeout
+
+COUNTERS = (
+    COUNTER_TICKS, COUNTER_WINDOWS_SCANNED, COUNTER_NODES_VISITED, COUNTER_ACCEPTS,
+    COUNTER_FAILED_INVOKE, COUNTER_FAILED_CLICK, COUNTER_FAILED_SENDKEYS, COUNTER_DUPLICATES_SUPPRESSED,
+    COUNTER_FOCUS_FREE, COUNTER_ACTIONS_DROPPED, COUNTER_ACTIONS_TIMED_OUT,
+)
+
+# Pipeline stages with latency histograms
+STAGE_DISCOVERY = "discovery"  # Enumerating / finding target windows
+STAGE_CONTEXT = "context"      # Tree walk for the context (the button is resolved in the same walk)
+STAGE_BUTTON = "button"        # Probing the button's last known location
+STAGE_ACTION = "action"        # Invoke/Click/SendKeys, plus focus and its restore when needed
+STAGE_FOCUS = "focus"          # Focus + focus restore, for actions that needed them
+STAGE_QUEUE = "queue"          # Wait between detecting a button and the action executor taking it up
+
+STAGES = (STAGE_DISCOVERY, STAGE_CONTEXT, STAGE_BUTTON, STAGE_ACTION, STAGE_FOCUS, STAGE_QUEUE)
+
+# Histogram bucket upper bounds in seconds; one extra overflow bucket follows the last bound
+LATENCY_BUCKETS = (0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0, 5.0)
+
+
+class _Shard:
+    """
+    Metrics written by a single thread. Writers never share a shard, so updates need no lock;
+    readers sum all shards and may see an update half-applied, which is fine for telemetry.
+    """
+    __slots__ = ("generation", "totals", "hist_totals", "slot_ids", "slot_counts", "slot_hist")
+
+    def __init__(self, generation: int, slots: int):
+        n_buckets = len(LATENCY_BUCKETS) + 1
+        self.generation = generation
+        self.totals = [0] * len(COUNTERS)
+        self.hist_totals = [[0] * n_buckets for _ in STAGES]
+        self.slot_ids = [-1] * slots
+        self.slot_counts = [[0] * len(COUNTERS) for _ in range(slots)]
+        self.slot_hist = [[[0] * n_buckets for _ in STAGES] for _ in range(slots)]
+
+
+class _ShardLease:
+    """
+    Ties a shard to the thread writing it: kept in the thread's local storage, so it is
+    collected when the thread ends, and the shard then goes back to the registry for reuse.
+    """
+    __slots__ = ("shard", "__weakref__")
+
+    def __init__(self, shard: _Shard):
+        self.shard = shard
+
+
+@dataclass(frozen=True)
+class StageLatency:
+    count: int
+    p50: float
+    p95: float
+    buckets: Tuple[int, ...]
+
+
+@dataclass(frozen=True)
+class MetricsSnapshot:
+    """
+    Point-in-time copy of the registry. 'recent' and 'latency' cover the last 'window_seconds'.
+    """
+    totals: Dict[str, int]
+    recent: Dict[str, int]
+    latency: Dict[str, StageLatency]
+    window_seconds: float
+    taken_at: float = field(default=0.0)
+
+    @property
+    def accepts_per_minute(self) -> float:
+        return self.recent.get(COUNTER_ACCEPTS, 0) * 60.0 / self.window_seconds if self.window_seconds else 0.0
+
+    @property
+    def failures(self) -> Dict[str, int]:
+        return {
+            "Invoke": self.totals.get(COUNTER_FAILED_INVOKE, 0),
+            "Click": self.totals.get(COUNTER_FAILED_CLICK, 0),
+            "SendKeys": self.totals.get(COUNTER_FAILED_SENDKEYS, 0),
+        }
+
+    def summary(self) -> str:
+        latency = ", ".join(
+            f"{stage} p95 {lat.p95 * 1000:.1f} ms" for stage, lat in self.latency.items() if lat.count
+        )
+        failures = ", ".join(f"{kind} {n}" for kind, n in self.failures.items() if n)
+        duplicates = self.totals.get(COUNTER_DUPLICATES_SUPPRESSED, 0)
+        given_up = ", ".join(f"{kind} {n}" for kind, n in (("timed out", self.totals.get(COUNTER_ACTIONS_TIMED_OUT, 0)),
+                                                           ("dropped", self.totals.get(COUNTER_ACTIONS_DROPPED, 0))) if n)
+        return (f"Ticks {self.totals[COUNTER_TICKS]}, windows scanned {self.totals[COUNTER_WINDOWS_SCANNED]}, "
+                f"nodes {self.totals[COUNTER_NODES_VISITED]}, accepts/min {self.accepts_per_minute:.1f}"
+                + (f", duplicates suppressed {duplicates}" if duplicates else "")
+                + (f" | {latency}" if latency else "")
+                + (f" | failed: {failures}" if failures else "")
+                + (f" | actions {given_up}" if given_up else ""))
+
+
+def _percentile(buckets: List[int], count: int, q: float) -> float:
+    """Upper bound of the bucket holding the q-quantile (the last finite bound for overflow)."""
+    if not count:
+        return 0.0
+    target = q * count
+    seen = 0
+    for i, n in enumerate(buckets):
+        seen += n
+        if seen >= target:
+            return LATENCY_BUCKETS[min(i, len(LATENCY_BUCKETS) - 1)]
+    return LATENCY_BUCKETS[-1]
+
+
+class MetricsRegistry:
+    """
+    Fixed-size automation metrics: all-time counters plus a rolling window of 'slots' time
+    slots of 'slot_seconds' each, for counters and per-stage latency histograms.
+    Safe to update from any number of threads without locking (see _Shard). A thread's shard
+    is reused by later threads once it ends, so the registry holds one shard per thread that
+    was alive at the same time, however many threads come and go.
+    """
+
+    def __init__(self, slots: int = 12, slot_seconds: float = 5.0, clock: Callable[[], float] = time.monotonic):
+        self.slots = slots
+        self.slot_seconds = slot_seconds
+        self.clock = clock
+        self._counter_index = {name: i for i, name in enumerate(COUNTERS)}
+        self._stage_index = {name: i for i, name in enumerate(STAGES)}
+        self._local = threading.local()
+        self._shards: List[_Shard] = []
+        # Shards of ended threads; only taken and returned under '_lock'
+        self._free: List[_Shard] = []
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    def _shard(self) -> _Shard:
+        lease = getattr(self._local, "lease", None)
+        if lease is None or lease.shard.generation != self._generation:
+            with self._lock:
+                if self._free:
+                    shard = self._free.pop()
+                else:
+                    shard = _Shard(self._generation, self.slots)
+                    self._shards.append(shard)
+            lease = _ShardLease(shard)
+            weakref.finalize(lease, self._release, shard)
+            self._local.lease = lease
+        return lease.shard
+
+    def _release(self, shard: _Shard) -> None:
+        # Its counts stay in the shard (and in the totals); the next new thread keeps adding to them
+        with self._lock:
+            if shard.generation == self._generation:
+                self._free.append(shard)
+
+    def _slot(self, shard: _Shard) -> int:
+        epoch = int(self.clock() / self.slot_seconds)
+        i = epoch % self.slots
+        if shard.slot_ids[i] != epoch:
+            counts = shard.slot_counts[i]
+            for c in range(len(counts)):
+                counts[c] = 0
+            for hist in shard.slot_hist[i]:
+                for b in range(len(hist)):
+                    hist[b] = 0
+            shard.slot_ids[i] = epoch
+        return i
+
+    def inc(self, counter: str, n: int = 1) -> None:
+        shard = self._shard()
+        c = self._counter_index[counter]
+        shard.totals[c] += n
+        shard.slot_counts[self._slot(shard)][c] += n
+
+    def observe(self, stage: str, seconds: float) -> None:
+        shard = self._shard()
+        s = self._stage_index[stage]
+        b = bisect.bisect_left(LATENCY_BUCKETS, seconds)
+        shard.hist_totals[s][b] += 1
+        shard.slot_hist[self._slot(shard)][s][b] += 1
+
+    def reset(self) -> None:
+        """
+        Starts from zero. Threads pick up fresh shards on their next update.
+        """
+        with self._lock:
+            self._generation += 1
+            self._shards = []
+            self._free = []
+
+    def snapshot(self) -> MetricsSnapshot:
+        now = self.clock()
+        epoch = int(now / self.slot_seconds)
+        oldest = epoch - self.slots + 1
+        n_buckets = len(LATENCY_BUCKETS) + 1
+
+        totals = [0] * len(COUNTERS)
+        recent = [0] * len(COUNTERS)
+        hist = [[0] * n_buckets for _ in STAGES]
+        for shard in list(self._shards):
+            for c, v in enumerate(shard.totals):
+                totals[c] += v
+            for i, slot_id in enumerate(shard.slot_ids):
+                if oldest <= slot_id <= epoch:
+                    for c, v in enumerate(shard.slot_counts[i]):
+                        recent[c] += v
+                    for s, stage_hist in enumerate(shard.slot_hist[i]):
+                        row = hist[s]
+                        for b, v in enumerate(stage_hist):
+                            row[b] += v
+
+        latency = {}
+        for s, stage in enumerate(STAGES):
+            count = sum(hist[s])
+            latency[stage] = StageLatency(count, _percentile(hist[s], count, 0.5), _percentile(hist[s], count, 0.95), tuple(hist[s]))
+
+        # The current slot is only partly elapsed, so the window is what has actually been covered
+        window = (self.slots - 1) * self.slot_seconds + (now - epoch * self.slot_seconds)
+        return MetricsSnapshot(
+            totals=dict(zip(COUNTERS, totals)),
+            recent=dict(zip(COUNTERS, recent)),
+            latency=latency,
+            window_seconds=window,
+            taken_at=now,
+        )
+
+
+class StageTimer:
+    """
+    Context manager that records the elapsed time of a block into a stage histogram
+    and keeps it in 'seconds'. A None registry only measures.
+    """
+    __slots__ = ("metrics", "stage", "start", "seconds")
+
+    def __init__(self, metrics: Optional[MetricsRegistry], stage: str):
+        self.metrics = metrics
+        self.stage = stage
+        self.start = 0.0
+        self.seconds = 0.0
+
+    def __enter__(self) -> "StageTimer":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        self.seconds = time.perf_counter() - self.start
+        if self.metrics is not None:
+            self.metrics.observe(self.stage, self.seconds)
+        return False
@@ -0,0 +1,195 @@
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from ag_accept.services.text_matcher import TextMatcher
+from ag_accept.services.tree_scanner import ButtonLocation, ScanResult
+
+# Rule actions
+ACTION_CLICK = "click"  # Invoke the button, falling back to Click and then the rule's keys
+ACTION_KEYS = "keys"    # Focus the window and send the rule's keys
+
+ACTIONS = (ACTION_CLICK, ACTION_KEYS)
+DEFAULT_KEYS = "{Alt}{Enter}"
+
+# Distinct window titles whose rule group is remembered before the lookup cache starts over
+GROUP_CACHE_SIZE = 256
+
+
+def _texts(values: Mapping[str, Any], key: str) -> Tuple[str, ...]:
+    texts = values.get(key, ())
+    if isinstance(texts, str) or not isinstance(texts, (list, tuple)):
+        raise ValueError(f"'{key}' must be a list of texts")
+    return tuple(str(t).strip() for t in texts if t and str(t).strip())
+
+
+@dataclass(frozen=True)
+class Rule:
+    """
+    One accept rule: in windows whose title contains 'title', once any of the 'context'
+    texts is present (none = always), press the first button named by any of 'buttons'.
+    When several rules match a window the highest 'priority' wins, ties in config order.
+    """
+    name: str
+    title: str
+    buttons: Tuple[str, ...]
+    context: Tuple[str, ...] = ()
+    action: str = ACTION_CLICK
+    keys: str = DEFAULT_KEYS
+    priority: int = 0
+
+    @classmethod
+    def from_mapping(cls, values: Mapping[str, Any], index: int = 0) -> "Rule":
+        """
+        Parses one entry of the 'rules' config list. Raises ValueError if it is invalid.
+        """
+        if not isinstance(values, Mapping):
+            raise ValueError("expected an object")
+        title = values.get("title")
+        if not isinstance(title, str) or not title:
+            raise ValueError("'title' is required")
+        buttons = _texts(values, "buttons")
+        if not buttons:
+            raise ValueError("'buttons' must name at least one button")
+        action = values.get("action", ACTION_CLICK)
+        if action not in ACTIONS:
+            raise ValueError(f"'action' must be one of {', '.join(ACTIONS)}")
+        try:
+            priority = int(values.get("priority", 0))
+        except (TypeError, ValueError):
+            raise ValueError("'priority' must be an integer")
+        return cls(
+            name=str(values.get("name") or f"rule {index + 1}"),
+            title=title,
+            buttons=buttons,
+            context=_texts(values, "context"),
+            action=action,
+            keys=str(values.get("keys") or DEFAULT_KEYS),
+            priority=priority,
+        )
+
+    def applies_to(self, window_title: str) -> bool:
+        return self.title in window_title
+
+
+def parse_rules(entries: Sequence[Any]) -> Tuple[List[Rule], List[str]]:
+    """
+    Valid rules from the 'rules' config list, and an error for each invalid entry.
+    """
+    rules, errors = [], []
+    for index, entry in enumerate(entries):
+        try:
+            rules.append(Rule.from_mapping(entry, index))
+        except ValueError as e:
+            errors.append(f"rules[{index}]: {e}")
+    return rules, errors
+
+
+@dataclass(frozen=True)
+class RuleMatch:
+    """The winning rule of a scan and the button it presses."""
+    rule: Rule
+    button: Any
+    button_pattern: str
+    button_location: Optional[ButtonLocation]
+
+
+class RuleGroup:
+    """
+    The rules that apply to one window, with the texts of all of them compiled into one
+    context matcher and one button matcher. A single collect-mode walk checks every rule
+    on each node, so adding a rule adds a pattern rather than another scan.
+    """
+
+    def __init__(self, rules: Sequence[Rule], config_manager: Any):
+        # Stable sort: config order breaks priority ties
+        self.rules: List[Rule] = sorted(rules, key=lambda r: -r.priority)
+        self.context_matcher = TextMatcher.from_config(config_manager, [t for r in self.rules for t in r.context])
+        self.button_matcher = TextMatcher.from_config(config_manager, [t for r in self.rules for t in r.buttons])
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def _context_ok(self, rule: Rule, scan: ScanResult) -> bool:
+        return not rule.context or any(text in scan.context_patterns for text in rule.context)
+
+    def _button(self, rule: Rule, scan: ScanResult) -> Optional[str]:
+        # First button the walk reached, like the single-rule scan
+        for pattern in scan.button_hits:
+            if pattern in rule.buttons:
+                return pattern
+        return None
+
+    def context_matched(self, scan: ScanResult) -> bool:
+        return any(self._context_ok(rule, scan) for rule in self.rules)
+
+    def is_done(self, scan: ScanResult) -> bool:
+        """
+        Stop condition for the walk: some rule is satisfied and no unsatisfied rule outranks it.
+        """
+        pending = None
+        for rule in self.rules:
+            if self._context_ok(rule, scan) and self._button(rule, scan) is not None:
+                return pending is None or rule.priority >= pending
+            if pending is None:
+                pending = rule.priority
+        return False
+
+    def select(self, scan: ScanResult) -> Optional[RuleMatch]:
+        for rule in self.rules:
+            if self._context_ok(rule, scan):
+                pattern = self._button(rule, scan)
+                if pattern is not None:
+                    button, location = scan.button_hits[pattern]
+                    return RuleMatch(rule, button, pattern, location)
+        return None
+
+
+class RuleSet:
+    """
+    All configured rules. 'for_window' groups them by window title; windows whose titles
+    select the same rules share one compiled group. The group caches are the only mutable
+    part of a snapshot and are guarded by a lock, since pool workers share the snapshot.
+    """
+
+    def __init__(self, rules: Sequence[Rule], config_manager: Any = None):
+        self.rules: Tuple[Rule, ...] = tuple(rules)
+        self.config_manager = config_manager if config_manager is not None else {}
+        self.titles: Tuple[str, ...] = tuple(dict.fromkeys(rule.title for rule in self.rules))
+        self._groups: Dict[Tuple[int, ...], RuleGroup] = {}
+        self._by_title: Dict[str, Optional[RuleGroup]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config_manager: Any) -> "RuleSet":
+        rules, _ = parse_rules(config_manager.get("rules") or ())
+        return cls(rules, config_manager)
+
+    def __bool__(self) -> bool:
+        return bool(self.rules)
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def matches_title(self, window_title: str) -> bool:
+        return any(title in window_title for title in self.titles)
+
+    def for_window(self, window_title: str) -> Optional[RuleGroup]:
+        """
+        The group of rules whose title pattern occurs in 'window_title', or None.
+        """
+        with self._lock:
+            try:
+                return self._by_title[window_title]
+            except KeyError:
+                pass
+            indices = tuple(i for i, rule in enumerate(self.rules) if rule.applies_to(window_title))
+            group = None
+            if indices:
+                group = self._groups.get(indices)
+                if group is None:
+                    group = self._groups[indices] = RuleGroup([self.rules[i] for i in indices], self.config_manager)
+            if len(self._by_title) >= GROUP_CACHE_SIZE:
+                self._by_title.clear()
+            self._by_title[window_title] = group
+            return group
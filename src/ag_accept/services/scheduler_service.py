@@ -1,27 +1,171 @@
 import time
+import random
 import threading
-from typing import Callable
+from typing import Protocol, Any, Callable, List, Optional, Sequence
+
+# Tick outcomes reported by tasks; they drive the next delay
+TICK_IDLE = "idle"          # No target window or no context: back off
+TICK_ACTIVE = "active"      # Context present but nothing accepted: base interval
+TICK_ACCEPTED = "accepted"  # Something was accepted: burst of quick rechecks
+
+_OUTCOME_RANK = {TICK_IDLE: 0, TICK_ACTIVE: 1, TICK_ACCEPTED: 2}
+
+
+def combine_outcomes(outcomes: Sequence[Optional[str]]) -> str:
+    """
+    Reduces per-window outcomes to a tick outcome (the most eventful one wins).
+    """
+    best = TICK_IDLE
+    for outcome in outcomes:
+        if outcome and _OUTCOME_RANK.get(outcome, 0) > _OUTCOME_RANK[best]:
+            best = outcome
+    return best
+
+
+class Clock(Protocol):
+    def now(self) -> float:
+        """Monotonic time in seconds."""
+        ...
+
+    def wait(self, stop_event: threading.Event, seconds: float) -> bool:
+        """Sleep up to 'seconds'; return True if 'stop_event' was set."""
+        ...
+
+
+class SystemClock:
+    def now(self) -> float:
+        return time.monotonic()
+
+    def wait(self, stop_event: threading.Event, seconds: float) -> bool:
+        return stop_event.wait(seconds)
+
+
+class VirtualClock:
+    """
+    Clock that never sleeps: waiting just advances 'now'. Makes scheduling tests deterministic.
+    """
+
+    def __init__(self, start: float = 0.0):
+        self.time = start
+        self.waits: List[float] = []
+
+    def now(self) -> float:
+        return self.time
+
+    def wait(self, stop_event: threading.Event, seconds: float) -> bool:
+        self.waits.append(seconds)
+        self.time += seconds
+        return stop_event.is_set()
+
 
 class SchedulerService:
     """
-    Service for running a periodic task until a stop event is set.
+    Adaptive scheduler for the automation loop.
+    - Backs off exponentially (up to 'max_interval') while ticks are idle
+    - Runs a fast burst schedule right after an accept
+    - Applies jitter and keeps every delay within [min_interval, max_interval]
     """
 
-    def start(self, task: Callable, interval: float, stop_event: threading.Event):
+    def __init__(self, clock: Optional[Clock] = None, rng: Optional[random.Random] = None):
+        self.clock = clock or SystemClock()
+        self.rng = rng or random.Random()
+        self.configure()
+
+    def configure(self, interval: float = 1.0, min_interval: float = 0.1, max_interval: float = 5.0,
+                  backoff_factor: float = 1.5, burst_intervals: Sequence[float] = (0.2, 0.2, 0.5, 0.5),
+                  jitter: float = 0.1) -> None:
         """
-        Runs the 'task' function periodically. 
-        Waits 'interval' seconds between iterations.
-        Checks 'stop_event' to determine when to exit.
+        Sets the schedule and resets adaptive state.
+        """
+        self.min_interval = max(0.0, float(min_interval))
+        self.max_interval = max(self.min_interval, float(max_interval))
+        self.interval = self._clamp(float(interval))
+        self.backoff_factor = max(1.0, float(backoff_factor))
+        self.burst_intervals = [float(d) for d in burst_intervals]
+        self.jitter = max(0.0, float(jitter))
+        self.reset()
+
+    def configure_from(self, config_manager: Any, interval: Optional[float] = None) -> None:
+        """
+        Reads the schedule from config. 'interval' overrides the configured base interval.
+        """
+        self.configure(
+            interval=interval if interval is not None else config_manager.get("interval", 1.0),
+            min_interval=config_manager.get("interval_min", 0.1),
+            max_interval=config_manager.get("interval_max", 5.0),
+            backoff_factor=config_manager.get("backoff_factor", 1.5),
+            burst_intervals=config_manager.get("burst_intervals", [0.2, 0.2, 0.5, 0.5]),
+            jitter=config_manager.get("interval_jitter", 0.1),
+        )
+
+    def reset(self) -> None:
+        self.idle_streak = 0
+        self.burst: List[float] = []
+        self.last_delay = self.interval
+
+    def _clamp(self, delay: float) -> float:
+        return min(self.max_interval, max(self.min_interval, delay))
+
+    def next_delay(self, outcome: Optional[str]) -> float:
+        """
+        Computes the wait before the next tick given how the last tick went.
+        """
+        if outcome == TICK_ACCEPTED:
+            self.idle_streak = 0
+            self.burst = list(self.burst_intervals)
+
+        if self.burst:
+            delay = self.burst.pop(0)
+        elif outcome == TICK_IDLE:
+            delay = self.interval * (self.backoff_factor ** self.idle_streak)
+            # Once at the ceiling the streak stops growing, so the power never overflows
+            if delay < self.max_interval:
+                self.idle_streak += 1
+        else:
+            self.idle_streak = 0
+            delay = self.interval
+
+        if self.jitter:
+            delay *= 1.0 + self.rng.uniform(-self.jitter, self.jitter)
+
+        self.last_delay = self._clamp(delay)
+        return self.last_delay
+
+    def run(self, task: Callable[[], Optional[str]], stop_event: threading.Event,
+            wait: Optional[Callable[[float], Any]] = None) -> None:
+        """
+        Runs 'task' until 'stop_event' is set, waiting an adaptive delay between ticks.
+        'task' returns a TICK_* outcome (None counts as active).
+        'wait' replaces the clock's sleep, e.g. to wake up early on window events.
         """
         while not stop_event.is_set():
             try:
-                task()
+                outcome = task()
             except Exception as e:
                 # We catch exceptions here to prevent the thread from dying entirely on one error,
                 # but ideally the task handles its own local errors.
-                # Since we don't have a logger injected here, we print or ignore.
                 print(f"SchedulerService: Error in task: {e}")
-            
-            # Wait for the interval or stop signal
-            if stop_event.wait(interval):
+                outcome = TICK_IDLE
+
+            if stop_event.is_set():
+                break
+            try:
+                delay = self.next_delay(outcome)
+            except Exception as e:
+                print(f"SchedulerService: Error computing delay: {e}")
+                self.reset()
+                delay = self.max_interval
+            if wait is not None:
+                wait(delay)
+            elif self.clock.wait(stop_event, delay):
                 break
+
+    def start(self, task: Callable, interval: float, stop_event: threading.Event):
+        """
+        Runs the 'task' function periodically, starting from 'interval' seconds between iterations
+        and adapting to the outcome 'task' returns.
+        Checks 'stop_event' to determine when to exit.
+        """
+        self.configure(interval=interval, min_interval=min(interval, self.min_interval),
+                       max_interval=max(interval, self.max_interval))
+        self.run(task, stop_event)
@@ -0,0 +1,100 @@
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from ag_accept.services.states import (
+    STATE_IDLE, STATE_SEARCHING_WINDOW, STATE_WINDOW_FOUND,
+    STATE_CHECKING_CONTEXT, STATE_CONTEXT_MATCHED, STATE_CONTEXT_FAILED,
+    STATE_SEARCHING_BUTTON, STATE_BUTTON_FOUND, STATE_BUTTON_FAILED,
+    STATE_ACTION_SUCCESS, STATE_ACTION_FAILED
+)
+
+# Pipeline nodes, in order
+NODE_WINDOW = "window"
+NODE_CONTEXT = "context"
+NODE_BUTTON = "button"
+NODE_ACTION = "action"
+
+NODES = (NODE_WINDOW, NODE_CONTEXT, NODE_BUTTON, NODE_ACTION)
+
+# Node statuses
+STATUS_IDLE = "idle"
+STATUS_WORKING = "working"
+STATUS_OK = "ok"
+STATUS_FAILED = "failed"
+
+# state -> node updates applied on top of the current node statuses
+TRANSITIONS = {
+    STATE_WINDOW_FOUND: ((NODE_WINDOW, STATUS_OK),),
+    STATE_CHECKING_CONTEXT: ((NODE_CONTEXT, STATUS_WORKING),),
+    STATE_CONTEXT_MATCHED: ((NODE_CONTEXT, STATUS_OK),),
+    STATE_CONTEXT_FAILED: ((NODE_CONTEXT, STATUS_FAILED), (NODE_BUTTON, STATUS_IDLE)),
+    STATE_SEARCHING_BUTTON: ((NODE_BUTTON, STATUS_WORKING),),
+    STATE_BUTTON_FOUND: ((NODE_BUTTON, STATUS_OK),),
+    STATE_BUTTON_FAILED: ((NODE_BUTTON, STATUS_FAILED),),
+    STATE_ACTION_SUCCESS: ((NODE_ACTION, STATUS_OK),),
+    STATE_ACTION_FAILED: ((NODE_ACTION, STATUS_FAILED),),
+}
+
+# States that start a new tick (all nodes reset first)
+RESET_STATES = (STATE_IDLE, STATE_SEARCHING_WINDOW)
+
+
+@dataclass(frozen=True)
+class TickSummary:
+    """Furthest pipeline node a tick reached and how it ended there."""
+    node: str
+    status: str
+
+    def __str__(self) -> str:
+        return f"{self.node.capitalize()} {self.status}"
+
+
+class StateChannel:
+    """
+    Coalescing hand-off of pipeline states from automation threads to the UI.
+    Producers call the channel as their 'state_callback'; it only folds the state into the
+    latest status per node (under a short lock) and never touches Tk. The UI polls it once
+    per frame and gets the current statuses only when something changed.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._statuses = {node: STATUS_IDLE for node in NODES}
+        self._version = 0
+        self._last_tick: Optional[TickSummary] = None
+
+    def __call__(self, state: str) -> None:
+        self.push(state)
+
+    def push(self, state: str) -> None:
+        with self._lock:
+            if state in RESET_STATES:
+                summary = self._summarize()
+                if summary:
+                    self._last_tick = summary
+                for node in NODES:
+                    self._statuses[node] = STATUS_IDLE
+                if state == STATE_SEARCHING_WINDOW:
+                    self._statuses[NODE_WINDOW] = STATUS_WORKING
+            else:
+                for node, status in TRANSITIONS.get(state, ()):
+                    self._statuses[node] = status
+            self._version += 1
+
+    def _summarize(self) -> Optional[TickSummary]:
+        for node in reversed(NODES):
+            status = self._statuses[node]
+            if status != STATUS_IDLE:
+                return TickSummary(node, status)
+        return None
+
+    def poll(self, since_version: int = -1) -> Optional[Tuple[int, Dict[str, str], Optional[TickSummary]]]:
+        """
+        Returns (version, statuses, last tick summary) if anything was pushed after 'since_version',
+        otherwise None.
+        """
+        if self._version == since_version:
+            return None
+        with self._lock:
+            return self._version, dict(self._statuses), self._last_tick
@@ -0,0 +1,12 @@
+# Pipeline states reported through 'state_callback' by the automation loop
+STATE_IDLE = "IDLE"
+STATE_SEARCHING_WINDOW = "SEARCHING_WINDOW"
+STATE_WINDOW_FOUND = "WINDOW_FOUND"
+STATE_CHECKING_CONTEXT = "CHECKING_CONTEXT"
+STATE_CONTEXT_MATCHED = "CONTEXT_MATCHED"
+STATE_CONTEXT_FAILED = "CONTEXT_FAILED"
+STATE_SEARCHING_BUTTON = "SEARCHING_BUTTON"
+STATE_BUTTON_FOUND = "BUTTON_FOUND"
+STATE_BUTTON_FAILED = "BUTTON_FAILED"
+STATE_ACTION_SUCCESS = "ACTION_SUCCESS"
+STATE_ACTION_FAILED = "ACTION_FAILED"
@@ -0,0 +1,169 @@
+import re
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+
+@dataclass(frozen=True)
+class TextMatch:
+    """
+    A single pattern hit. Offsets refer to the (case-folded, if enabled) text.
+    """
+    pattern: str
+    start: int
+    end: int
+
+
+def _is_word_char(c: str) -> bool:
+    return c.isalnum() or c == "_"
+
+
+class TextMatcher:
+    """
+    Multi-pattern substring matcher compiled once and reused for every node name.
+
+    'search' answers "which pattern hits first?" with a single compiled regex
+    (leftmost hit, longest pattern on ties), which runs in C.
+    'find_all' reports every hit, including overlapping ones, with an Aho-Corasick automaton.
+    Both scan each name once regardless of how many patterns are configured.
+    """
+
+    def __init__(self, patterns: Iterable[str], case_insensitive: bool = False, whole_word: bool = False):
+        self.case_insensitive = case_insensitive
+        self.whole_word = whole_word
+        # Empty patterns would match everything, so they are dropped
+        self.patterns: List[str] = list(dict.fromkeys(p for p in patterns if p))
+        self._keys = [self._fold(p) for p in self.patterns]
+        self._group_to_pattern: List[str] = []
+        self._regex = self._compile_regex()
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+        self._build_automaton()
+
+    @classmethod
+    def from_config(cls, config_manager: Any, patterns: Iterable[str]) -> "TextMatcher":
+        """
+        Compiles 'patterns' with the matching options from the config.
+        """
+        return cls(
+            patterns,
+            case_insensitive=bool(config_manager.get("match_case_insensitive", False)),
+            whole_word=bool(config_manager.get("match_whole_word", False)),
+        )
+
+    def __bool__(self) -> bool:
+        return bool(self.patterns)
+
+    def __repr__(self) -> str:
+        return f"TextMatcher({self.patterns!r}, case_insensitive={self.case_insensitive}, whole_word={self.whole_word})"
+
+    def _fold(self, text: str) -> str:
+        return text.casefold() if self.case_insensitive else text
+
+    def _compile_regex(self) -> Optional["re.Pattern[str]"]:
+        if not self.patterns:
+            return None
+        # Longest first so that ties at the same start position prefer the longer pattern
+        order = sorted(range(len(self._keys)), key=lambda i: len(self._keys[i]), reverse=True)
+        parts = []
+        for i in order:
+            key = self._keys[i]
+            expr = re.escape(key)
+            if self.whole_word:
+                if _is_word_char(key[0]):
+                    expr = r"(?<!\w)" + expr
+                if _is_word_char(key[-1]):
+                    expr = expr + r"(?!\w)"
+            parts.append(f"({expr})")
+            self._group_to_pattern.append(self.patterns[i])
+        return re.compile("|".join(parts))
+
+    def _build_automaton(self) -> None:
+        goto, fail, out = self._goto, self._fail, self._out
+        for index, key in enumerate(self._keys):
+            state = 0
+            for c in key:
+                nxt = goto[state].get(c)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][c] = nxt
+                    goto.append({})
+                    fail.append(0)
+                    out.append([])
+                state = nxt
+            out[state].append(index)
+
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for c, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and c not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(c, 0)
+                out[nxt] = out[nxt] + out[fail[nxt]]
+
+    def _is_whole_word(self, text: str, start: int, end: int, key: str) -> bool:
+        if _is_word_char(key[0]) and start > 0 and _is_word_char(text[start - 1]):
+            return False
+        if _is_word_char(key[-1]) and end < len(text) and _is_word_char(text[end]):
+            return False
+        return True
+
+    def search(self, text: str) -> Optional[str]:
+        """
+        Returns the first pattern found in 'text', or None.
+        """
+        if self._regex is None or not text:
+            return None
+        m = self._regex.search(self._fold(text))
+        if m is None:
+            return None
+        return self._group_to_pattern[m.lastindex - 1]
+
+    def matches(self, text: str) -> bool:
+        return self.search(text) is not None
+
+    def find_all(self, text: str) -> List[TextMatch]:
+        """
+        Returns every pattern hit in 'text' (overlapping included), ordered by end offset.
+        """
+        if not self.patterns or not text:
+            return []
+        folded = self._fold(text)
+        goto, fail, out, keys = self._goto, self._fail, self._out, self._keys
+        hits = []
+        state = 0
+        for pos, c in enumerate(folded):
+            while state and c not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(c, 0)
+            for index in out[state]:
+                key = keys[index]
+                end = pos + 1
+                start = end - len(key)
+                if self.whole_word and not self._is_whole_word(folded, start, end, key):
+                    continue
+                hits.append(TextMatch(self.patterns[index], start, end))
+        return hits
+
+    def matched_patterns(self, text: str) -> List[str]:
+        """
+        Returns the distinct patterns that occur in 'text', in configuration order.
+        """
+        found = {hit.pattern for hit in self.find_all(text)}
+        return [p for p in self.patterns if p in found]
+
+
+TextsOrMatcher = Union[TextMatcher, List[str]]
+
+
+def as_matcher(texts: Optional[TextsOrMatcher]) -> TextMatcher:
+    """
+    Accepts either a compiled matcher or a plain list of texts (compiled on the spot).
+    """
+    if isinstance(texts, TextMatcher):
+        return texts
+    return TextMatcher(texts or [])
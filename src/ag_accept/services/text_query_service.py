@@ -1,5 +1,11 @@
-import uiautomation as auto
-from typing import List, Optional, Any
+import threading
+from typing import Dict, List, Optional, Any
+
+from ag_accept.services.text_matcher import TextMatcher, TextsOrMatcher, as_matcher
+from ag_accept.services.tree_scanner import (
+    BUDGET_NODES, BUDGET_TIME, ScanBudget, ScanResult, ScanUntil, TreeScanner, PrefetchTreeScanner, WalkerTreeScanner
+)
+from ag_accept.services.ui_backend import UiBackend, UiaBackend
 
 class TextQueryService:
     """
@@ -7,53 +13,75 @@ class TextQueryService:
     Encapsulates the recursive text search logic from IDE mode.
     """
 
-    def has_text_recursive(self, control: Any, texts: List[str], max_depth: int = 25) -> bool:
+    def __init__(self, scanner: Optional[TreeScanner] = None, backend: Optional[UiBackend] = None):
+        self.backend = backend or UiaBackend()
+        # Bulk prefetch first, per-node walking if the prefetch is unavailable
+        self.scanner = scanner or PrefetchTreeScanner(prefetch=self.backend.prefetch_subtree, fallback=WalkerTreeScanner())
+        # Scans cut short by their budget, by reason (BUDGET_NODES / BUDGET_TIME)
+        self.budget_exhaustions: Dict[str, int] = {BUDGET_NODES: 0, BUDGET_TIME: 0}
+        self._stats_lock = threading.Lock()
+
+    def has_text_recursive(self, control: Any, texts: TextsOrMatcher, max_depth: int = 25, budget: Optional[ScanBudget] = None) -> bool:
         """
         Recursively checks if any of the given texts exist in the control or its children.
+        With a 'budget', the search stops when it runs out and reports False if nothing was found by then.
         """
-        return self._has_text_recursive_internal(control, texts, 0, max_depth)
+        if budget is not None:
+            return self.scan_window(control, texts, [], max_depth, budget).context_matched
+        return self._has_text_recursive_internal(control, as_matcher(texts), 0, max_depth)
 
-    def _has_text_recursive_internal(self, control: Any, texts: List[str], current_depth: int, max_depth: int) -> bool:
+    def _has_text_recursive_internal(self, control: Any, matcher: TextMatcher, current_depth: int, max_depth: int) -> bool:
         if current_depth > max_depth:
             return False
             
         try:
-            c_name = control.Name
-            for t in texts:
-                if t in c_name:
-                    return True
+            if matcher.matches(control.Name):
+                return True
         except:
             pass
 
         try:
             for child in control.GetChildren():
-                if self._has_text_recursive_internal(child, texts, current_depth + 1, max_depth):
+                if self._has_text_recursive_internal(child, matcher, current_depth + 1, max_depth):
                     return True
         except:
             pass
             
         return False
 
-    def find_button_with_text(self, root_control: Any, texts: List[str]) -> Optional[Any]:
+    def find_button_with_text(self, root_control: Any, texts: TextsOrMatcher) -> Optional[Any]:
         """
         Finds a ButtonControl that contains any of the specified texts in its Name.
         """
+        matcher = as_matcher(texts)
+
         def button_matcher(control, depth):
             try:
                 if control.ControlTypeName == "ButtonControl":
-                    c_name = control.Name
-                    for s in texts:
-                        if s in c_name:
-                            return True
+                    return matcher.matches(control.Name)
             except:
                 pass
             return False
 
         try:
-            return root_control.FindFirst(auto.TreeScope.Descendants, button_matcher)
+            return self.backend.find_first(root_control, button_matcher)
         except Exception:
             return None
 
+    def scan_window(self, root_control: Any, context_texts: TextsOrMatcher, search_texts: TextsOrMatcher, max_depth: int = 25,
+                    budget: Optional[ScanBudget] = None, until: Optional[ScanUntil] = None) -> ScanResult:
+        """
+        Walks the control tree once, checking context texts and button texts together.
+        An empty context list counts as matched and the root is never a button candidate.
+        If 'budget' runs out first, the result is partial and the exhaustion is counted.
+        With 'until', all hits are collected until it returns True (see WalkerTreeScanner.scan).
+        """
+        result = self.scanner.scan(root_control, context_texts, search_texts, max_depth, budget, until)
+        if result.exhausted:
+            with self._stats_lock:
+                self.budget_exhaustions[result.exhausted] = self.budget_exhaustions.get(result.exhausted, 0) + 1
+        return result
+
     def dump_texts(self, control: Any, max_depth: int = 25) -> List[str]:
         """
         Dumps all text found in the control tree for debugging.
@@ -0,0 +1,635 @@
+import heapq
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Protocol, Any, Callable, Dict, List, Optional, Set, Tuple
+
+from ag_accept.services.text_matcher import TextsOrMatcher, as_matcher
+
+# Traversal orders
+ORDER_DEPTH_FIRST = "dfs"      # Document order, like FindFirst
+ORDER_BREADTH_FIRST = "bfs"    # Shallow nodes first
+ORDER_BEST_FIRST = "best"      # Breadth-first, but the neighbourhood of a context hit is explored first
+
+# Why a scan stopped early
+BUDGET_NODES = "nodes"
+BUDGET_TIME = "time"
+
+# The deadline is checked every this many nodes so the clock read stays off the hot path
+DEADLINE_CHECK_INTERVAL = 16
+
+
+@dataclass(frozen=True)
+class ScanBudget:
+    """
+    Limits for a single traversal. 0 means unlimited.
+    """
+    max_nodes: int = 0
+    time_limit: float = 0.0
+    order: str = ORDER_DEPTH_FIRST
+
+    @classmethod
+    def from_config(cls, config_manager: Any) -> "ScanBudget":
+        return cls(
+            max_nodes=int(config_manager.get("scan_node_budget", 0) or 0),
+            time_limit=float(config_manager.get("scan_time_budget", 0.0) or 0.0),
+            order=config_manager.get("scan_order", ORDER_DEPTH_FIRST) or ORDER_DEPTH_FIRST,
+        )
+
+    def deadline(self, start: float) -> Optional[float]:
+        return start + self.time_limit if self.time_limit > 0 else None
+
+
+UNLIMITED = ScanBudget()
+
+
+@dataclass(frozen=True)
+class ButtonLocation:
+    """
+    Where a button was found inside its window: the child index at each level below the
+    window, the names of the ancestors along that path (window excluded) and its AutomationId.
+    """
+    path: Tuple[int, ...]
+    ancestors: Tuple[str, ...]
+    automation_id: str = ""
+
+
+@dataclass
+class ScanResult:
+    """
+    Outcome of a single-pass scan over a window tree.
+    """
+    context_matched: bool = False
+    button: Optional[Any] = None
+    nodes_visited: int = 0
+    context_pattern: Optional[str] = None
+    button_pattern: Optional[str] = None
+    button_location: Optional[ButtonLocation] = None
+    # Set when a budget ran out before the tree was fully searched (BUDGET_NODES / BUDGET_TIME)
+    exhausted: Optional[str] = None
+    # Collect mode only: every context pattern seen, and the first button (control, location) per button pattern
+    context_patterns: Set[str] = field(default_factory=set)
+    button_hits: Dict[str, Tuple[Any, ButtonLocation]] = field(default_factory=dict)
+
+    @property
+    def partial(self) -> bool:
+        return self.exhausted is not None
+
+
+class NodeInfo:
+    """
+    Plain snapshot of a control and its subtree.
+    Properties are read up front so matching can run without further COM calls.
+    The live control is only materialized when someone asks for it (e.g. to Invoke a button).
+    """
+    __slots__ = ("name", "control_type", "automation_id", "is_offscreen", "rect", "children", "_control", "_factory")
+
+    def __init__(self, name: str = "", control_type: str = "", automation_id: str = "", is_offscreen: bool = False,
+                 rect: Optional[Tuple[int, int, int, int]] = None, children: Optional[List["NodeInfo"]] = None,
+                 control: Any = None, factory: Optional[Callable[[], Any]] = None):
+        self.name = name
+        self.control_type = control_type
+        self.automation_id = automation_id
+        self.is_offscreen = is_offscreen
+        self.rect = rect
+        self.children = children if children is not None else []
+        self._control = control
+        self._factory = factory
+
+    @property
+    def control(self) -> Any:
+        if self._control is None and self._factory is not None:
+            self._control = self._factory()
+            self._factory = None
+        return self._control
+
+
+# Collect-mode stop condition: called after each new hit, True ends the walk
+ScanUntil = Callable[[ScanResult], bool]
+
+
+class TreeScanner(Protocol):
+    def scan(self, root_control: Any, context_texts: TextsOrMatcher, search_texts: TextsOrMatcher, max_depth: int = 25,
+             budget: Optional[ScanBudget] = None, until: Optional[ScanUntil] = None) -> ScanResult:
+        """Walk the tree once and report context and button matches."""
+        ...
+
+    def snapshot(self, root_control: Any, max_depth: int = 25) -> NodeInfo:
+        """Capture the tree as NodeInfo for in-process inspection."""
+        ...
+
+
+# Frames are [item, depth, child index, parent frame, name, child frames, visited, hot] so a match
+# can recover its path and the best-first frontier can reach the siblings of a context hit
+_ITEM, _DEPTH, _INDEX, _PARENT, _NAME, _CHILDREN, _VISITED, _HOT = range(8)
+
+
+def _frame(item: Any, depth: int, index: int, parent: Optional[list], name: str) -> list:
+    return [item, depth, index, parent, name, None, False, False]
+
+
+class _Frontier:
+    """
+    Pending frames of a traversal in the requested order.
+    Best-first pops from a depth-first 'hot' stack before a breadth-first heap; 'promote'
+    moves the unvisited siblings and the subtree of a context hit onto the hot stack.
+    """
+
+    def __init__(self, order: str, root: list):
+        self.order = order
+        self.seq = 0
+        self.hot: List[list] = []
+        if order == ORDER_BREADTH_FIRST:
+            self.items: Any = deque([root])
+        elif order == ORDER_BEST_FIRST:
+            self.items = [(0, 0, root)]
+        else:
+            self.items = [root]
+
+    def has_pending(self) -> bool:
+        if self.order == ORDER_BEST_FIRST:
+            return any(not f[_VISITED] for f in self.hot) or any(not e[2][_VISITED] for e in self.items)
+        return bool(self.items)
+
+    def push_children(self, parent: list, frames: List[list]) -> None:
+        """'frames' are in document order."""
+        if self.order == ORDER_BREADTH_FIRST:
+            self.items.extend(frames)
+        elif self.order == ORDER_BEST_FIRST:
+            parent[_CHILDREN] = frames
+            if parent[_HOT]:
+                for f in frames:
+                    f[_HOT] = True
+                self.hot.extend(reversed(frames))
+            else:
+                for f in frames:
+                    self.seq += 1
+                    heapq.heappush(self.items, (f[_DEPTH], self.seq, f))
+        else:
+            self.items.extend(reversed(frames))
+
+    def promote(self, frame: list) -> None:
+        """Explores the rest of the context hit's parent, and the hit's own subtree, next."""
+        if self.order != ORDER_BEST_FIRST:
+            return
+        frame[_HOT] = True
+        parent = frame[_PARENT]
+        if parent is not None and parent[_CHILDREN]:
+            for f in reversed(parent[_CHILDREN]):
+                if not f[_VISITED]:
+                    f[_HOT] = True
+                    self.hot.append(f)
+
+    def pop(self) -> Optional[list]:
+        if self.order == ORDER_BREADTH_FIRST:
+            return self.items.popleft() if self.items else None
+        if self.order != ORDER_BEST_FIRST:
+            return self.items.pop() if self.items else None
+
+        while self.hot:
+            frame = self.hot.pop()
+            if not frame[_VISITED]:
+                frame[_VISITED] = True
+                return frame
+        while self.items:
+            frame = heapq.heappop(self.items)[2]
+            if not frame[_VISITED]:
+                frame[_VISITED] = True
+                return frame
+        return None
+
+
+class _BudgetGuard:
+    """
+    Tracks node count and deadline for one traversal.
+    """
+    __slots__ = ("max_nodes", "deadline", "countdown")
+
+    def __init__(self, budget: ScanBudget, start: float):
+        self.max_nodes = budget.max_nodes
+        self.deadline = budget.deadline(start)
+        self.countdown = DEADLINE_CHECK_INTERVAL
+
+    def exhausted(self, nodes_visited: int) -> Optional[str]:
+        if self.max_nodes and nodes_visited >= self.max_nodes:
+            return BUDGET_NODES
+        if self.deadline is not None:
+            self.countdown -= 1
+            if self.countdown <= 0:
+                self.countdown = DEADLINE_CHECK_INTERVAL
+                if time.perf_counter() >= self.deadline:
+                    return BUDGET_TIME
+        return None
+
+
+def _location_from_frame(frame: list, automation_id: str) -> ButtonLocation:
+    path = []
+    ancestors = []
+    parent = frame[_PARENT]
+    while parent is not None and parent[_PARENT] is not None:
+        ancestors.append(parent[_NAME] or "")
+        parent = parent[_PARENT]
+    while frame[_PARENT] is not None:
+        path.append(frame[_INDEX])
+        frame = frame[_PARENT]
+    return ButtonLocation(tuple(reversed(path)), tuple(reversed(ancestors)), automation_id or "")
+
+
+def _collect_context(result: ScanResult, context: Any, name: str) -> bool:
+    """Adds every context pattern in 'name' to 'result'; True if any was new."""
+    new = False
+    for hit in context.find_all(name):
+        if hit.pattern not in result.context_patterns:
+            result.context_patterns.add(hit.pattern)
+            if result.context_pattern is None:
+                result.context_pattern = hit.pattern
+            new = True
+    if new:
+        result.context_matched = True
+    return new
+
+
+def _new_button_patterns(result: ScanResult, buttons: Any, name: str) -> List[str]:
+    return [p for p in dict.fromkeys(hit.pattern for hit in buttons.find_all(name)) if p not in result.button_hits]
+
+
+class WalkerTreeScanner:
+    """
+    Per-node scanner: every Name, ControlTypeName and GetChildren() is its own COM call.
+    Works with any control object and is the fallback when bulk prefetching fails.
+    """
+
+    def scan(self, root_control: Any, context_texts: TextsOrMatcher, search_texts: TextsOrMatcher, max_depth: int = 25,
+             budget: Optional[ScanBudget] = None, until: Optional[ScanUntil] = None) -> ScanResult:
+        """
+        Walks the control tree once, checking context texts and button texts together.
+        An empty context list counts as matched. The root itself is never a button candidate,
+        mirroring the Descendants scope of 'find_button_with_text'.
+        Stops as soon as both the context and a button have been found, or when 'budget' runs out
+        (the result is then marked partial).
+        With 'until' (collect mode), every context pattern and the first button per pattern are
+        recorded instead, and the walk ends when 'until' returns True after a new hit.
+        """
+        if until is not None:
+            return self._collect(root_control, as_matcher(context_texts), as_matcher(search_texts), max_depth, budget or UNLIMITED, until)
+        budget = budget or UNLIMITED
+        guard = _BudgetGuard(budget, time.perf_counter())
+        context = as_matcher(context_texts)
+        buttons = as_matcher(search_texts)
+        result = ScanResult(context_matched=not context)
+        frontier = _Frontier(budget.order, _frame(root_control, 0, 0, None, ""))
+
+        while True:
+            frame = frontier.pop()
+            if frame is None:
+                break
+            control, depth = frame[_ITEM], frame[_DEPTH]
+            result.nodes_visited += 1
+
+            try:
+                c_name = control.Name
+            except:
+                c_name = ""
+            frame[_NAME] = c_name
+
+            if c_name:
+                if not result.context_matched:
+                    pattern = context.search(c_name)
+                    if pattern is not None:
+                        result.context_matched = True
+                        result.context_pattern = pattern
+                        frontier.promote(frame)
+
+                # Name is checked first so ControlTypeName is only read for likely candidates
+                if result.button is None and depth > 0:
+                    pattern = buttons.search(c_name)
+                    if pattern is not None:
+                        try:
+                            if control.ControlTypeName == "ButtonControl":
+                                result.button = control
+                                result.button_pattern = pattern
+                                try:
+                                    automation_id = control.AutomationId
+                                except:
+                                    automation_id = ""
+                                result.button_location = _location_from_frame(frame, automation_id)
+                        except:
+                            pass
+
+            if result.context_matched and (result.button is not None or not buttons):
+                break
+
+            if depth < max_depth:
+                try:
+                    children = control.GetChildren()
+                except:
+                    children = []
+                frontier.push_children(frame, [_frame(child, depth + 1, index, frame, "") for index, child in enumerate(children)])
+
+            exhausted = guard.exhausted(result.nodes_visited)
+            if exhausted and frontier.has_pending():
+                result.exhausted = exhausted
+                break
+
+        return result
+
+    def snapshot(self, root_control: Any, max_depth: int = 25) -> NodeInfo:
+        return self._snapshot_node(root_control, 0, max_depth)
+
+    def _snapshot_node(self, control: Any, depth: int, max_depth: int) -> NodeInfo:
+        node = NodeInfo(control=control)
+        try:
+            node.name = control.Name or ""
+            node.control_type = control.ControlTypeName
+        except:
+            pass
+        try:
+            node.automation_id = control.AutomationId or ""
+        except:
+            pass
+        try:
+            node.is_offscreen = bool(control.IsOffscreen)
+        except:
+            pass
+        try:
+            rect = control.BoundingRectangle
+            node.rect = (rect.left, rect.top, rect.right, rect.bottom)
+        except:
+            pass
+
+        if depth < max_depth:
+            try:
+                for child in control.GetChildren():
+                    node.children.append(self._snapshot_node(child, depth + 1, max_depth))
+            except:
+                pass
+        return node
+
+    def _collect(self, root_control: Any, context: Any, buttons: Any, max_depth: int, budget: ScanBudget, until: ScanUntil) -> ScanResult:
+        guard = _BudgetGuard(budget, time.perf_counter())
+        result = ScanResult(context_matched=not context)
+        frontier = _Frontier(budget.order, _frame(root_control, 0, 0, None, ""))
+        context_left = len(context.patterns)
+        buttons_left = len(buttons.patterns)
+
+        while True:
+            frame = frontier.pop()
+            if frame is None:
+                break
+            control, depth = frame[_ITEM], frame[_DEPTH]
+            result.nodes_visited += 1
+
+            try:
+                c_name = control.Name
+            except:
+                c_name = ""
+            frame[_NAME] = c_name
+
+            hit = False
+            if c_name:
+                if context_left and _collect_context(result, context, c_name):
+                    context_left = len(context.patterns) - len(result.context_patterns)
+                    frontier.promote(frame)
+                    hit = True
+                if buttons_left and depth > 0:
+                    patterns = _new_button_patterns(result, buttons, c_name)
+                    if patterns:
+                        try:
+                            is_button = control.ControlTypeName == "ButtonControl"
+                        except:
+                            is_button = False
+                        if is_button:
+                            try:
+                                automation_id = control.AutomationId
+                            except:
+                                automation_id = ""
+                            location = _location_from_frame(frame, automation_id)
+                            for pattern in patterns:
+                                result.button_hits[pattern] = (control, location)
+                            if result.button is None:
+                                result.button, result.button_pattern, result.button_location = control, patterns[0], location
+                            buttons_left -= len(patterns)
+                            hit = True
+
+            if hit and until(result):
+                break
+
+            if depth < max_depth:
+                try:
+                    children = control.GetChildren()
+                except:
+                    children = []
+                frontier.push_children(frame, [_frame(child, depth + 1, index, frame, "") for index, child in enumerate(children)])
+
+            exhausted = guard.exhausted(result.nodes_visited)
+            if exhausted and frontier.has_pending():
+                result.exhausted = exhausted
+                break
+
+        return result
+
+
+def uia_prefetch_subtree(root_control: Any, max_depth: int = 25) -> NodeInfo:
+    """
+    Fetches the whole subtree of 'root_control' with Name, ControlType, AutomationId,
+    IsOffscreen and BoundingRectangle cached, using a single UIA BuildUpdatedCache call.
+    Reading the cached values afterwards is in-process.
+    """
+    import uiautomation as auto
+    from ag_accept.services.ui_backend import uia_client
+
+    uia = uia_client()
+    request = uia.CreateCacheRequest()
+    for property_id in (auto.PropertyId.NameProperty,
+                        auto.PropertyId.ControlTypeProperty,
+                        auto.PropertyId.AutomationIdProperty,
+                        auto.PropertyId.IsOffscreenProperty,
+                        auto.PropertyId.BoundingRectangleProperty):
+        request.AddProperty(property_id)
+    request.TreeScope = auto.TreeScope.Subtree
+    # uiautomation's GetChildren() walks the raw view, so prefetch the same view
+    request.TreeFilter = uia.RawViewCondition
+
+    element = root_control.Element.BuildUpdatedCache(request)
+
+    def to_node(el: Any, depth: int) -> NodeInfo:
+        rect = el.CachedBoundingRectangle
+        node = NodeInfo(
+            name=el.CachedName or "",
+            control_type=auto.ControlTypeNames.get(el.CachedControlType, ""),
+            automation_id=el.CachedAutomationId or "",
+            is_offscreen=bool(el.CachedIsOffscreen),
+            rect=(rect.left, rect.top, rect.right, rect.bottom),
+            factory=lambda: auto.Control.CreateControlFromElement(el),
+        )
+        if depth < max_depth:
+            children = el.GetCachedChildren()
+            if children:
+                for i in range(children.Length):
+                    node.children.append(to_node(children.GetElement(i), depth + 1))
+        return node
+
+    node = to_node(element, 0)
+    node._control = root_control
+    node._factory = None
+    return node
+
+
+def _tree_exceeds(root: NodeInfo, limit: int) -> bool:
+    """True if the tree under 'root' has more than 'limit' nodes (counting stops there)."""
+    count = 0
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        count += 1
+        if count > limit:
+            return True
+        stack.extend(node.children)
+    return False
+
+
+class PrefetchTreeScanner:
+    """
+    Bulk scanner: fetches the subtree with all needed properties in one request,
+    then matches in-process. Falls back to 'fallback' if the prefetch fails.
+    The prefetch cannot be cut short, so a window whose tree turned out larger than the
+    scan budget (more nodes than 'max_nodes', or a fetch slower than 'time_limit') is
+    scanned by the budgeted 'fallback' from then on, until a complete fallback scan shows
+    it fits the budget again.
+    """
+
+    def __init__(self, prefetch: Callable[[Any, int], NodeInfo] = uia_prefetch_subtree, fallback: Optional[TreeScanner] = None,
+                 key: Optional[Callable[[Any], Any]] = None):
+        if key is None:
+            # Imported here: ui_backend imports this module
+            from ag_accept.services.ui_backend import window_key as key
+        self.prefetch = prefetch
+        self.fallback = fallback or WalkerTreeScanner()
+        self.key = key
+        # Keys of roots whose tree is too large to prefetch within the budget
+        self.large_trees: Set[Any] = set()
+
+    def scan(self, root_control: Any, context_texts: TextsOrMatcher, search_texts: TextsOrMatcher, max_depth: int = 25,
+             budget: Optional[ScanBudget] = None, until: Optional[ScanUntil] = None) -> ScanResult:
+        budget = budget or UNLIMITED
+        bounded = budget.max_nodes > 0 or budget.time_limit > 0
+        key = self.key(root_control) if bounded else None
+        if key is not None and key in self.large_trees:
+            result = self.fallback.scan(root_control, context_texts, search_texts, max_depth, budget, until)
+            # A walk that ended without a match or an exhausted budget covered the whole tree
+            if not result.partial and not (result.context_matched and result.button is not None):
+                self.large_trees.discard(key)
+            return result
+
+        start = time.perf_counter()
+        try:
+            root = self.prefetch(root_control, max_depth)
+        except Exception:
+            return self.fallback.scan(root_control, context_texts, search_texts, max_depth, budget, until)
+        if key is not None and ((budget.time_limit > 0 and time.perf_counter() - start > budget.time_limit) or
+                                (budget.max_nodes > 0 and _tree_exceeds(root, budget.max_nodes))):
+            self.large_trees.add(key)
+
+        # The deadline counts from before the prefetch; the node budget limits the matching that follows
+        guard = _BudgetGuard(budget, start)
+        context = as_matcher(context_texts)
+        buttons = as_matcher(search_texts)
+        if until is not None:
+            return self._collect(root, context, buttons, guard, budget, until)
+        result = ScanResult(context_matched=not context)
+        button_node = None
+        frontier = _Frontier(budget.order, _frame(root, 0, 0, None, root.name))
+
+        while True:
+            frame = frontier.pop()
+            if frame is None:
+                break
+            node, depth = frame[_ITEM], frame[_DEPTH]
+            result.nodes_visited += 1
+            name = node.name
+
+            if name:
+                if not result.context_matched:
+                    pattern = context.search(name)
+                    if pattern is not None:
+                        result.context_matched = True
+                        result.context_pattern = pattern
+                        frontier.promote(frame)
+                if button_node is None and depth > 0 and node.control_type == "ButtonControl":
+                    pattern = buttons.search(name)
+                    if pattern is not None:
+                        button_node = node
+                        result.button_pattern = pattern
+                        result.button_location = _location_from_frame(frame, node.automation_id)
+
+            if result.context_matched and (button_node is not None or not buttons):
+                break
+
+            if node.children:
+                frontier.push_children(frame, [_frame(child, depth + 1, index, frame, child.name) for index, child in enumerate(node.children)])
+
+            exhausted = guard.exhausted(result.nodes_visited)
+            if exhausted and frontier.has_pending():
+                result.exhausted = exhausted
+                break
+
+        if button_node is not None:
+            result.button = button_node.control
+        return result
+
+    def _collect(self, root: NodeInfo, context: Any, buttons: Any, guard: _BudgetGuard, budget: ScanBudget, until: ScanUntil) -> ScanResult:
+        result = ScanResult(context_matched=not context)
+        frontier = _Frontier(budget.order, _frame(root, 0, 0, None, root.name))
+        context_left = len(context.patterns)
+        buttons_left = len(buttons.patterns)
+        hit_nodes: Dict[str, NodeInfo] = {}
+
+        while True:
+            frame = frontier.pop()
+            if frame is None:
+                break
+            node, depth = frame[_ITEM], frame[_DEPTH]
+            result.nodes_visited += 1
+            name = node.name
+
+            hit = False
+            if name:
+                if context_left and _collect_context(result, context, name):
+                    context_left = len(context.patterns) - len(result.context_patterns)
+                    frontier.promote(frame)
+                    hit = True
+                if buttons_left and depth > 0 and node.control_type == "ButtonControl":
+                    patterns = _new_button_patterns(result, buttons, name)
+                    if patterns:
+                        location = _location_from_frame(frame, node.automation_id)
+                        for pattern in patterns:
+                            # The live control is filled in once the walk is over
+                            result.button_hits[pattern] = (None, location)
+                            hit_nodes[pattern] = node
+                        if result.button_pattern is None:
+                            result.button_pattern, result.button_location = patterns[0], location
+                        buttons_left -= len(patterns)
+                        hit = True
+
+            if hit and until(result):
+                break
+
+            if node.children:
+                frontier.push_children(frame, [_frame(child, depth + 1, index, frame, child.name) for index, child in enumerate(node.children)])
+
+            exhausted = guard.exhausted(result.nodes_visited)
+            if exhausted and frontier.has_pending():
+                result.exhausted = exhausted
+                break
+
+        for pattern, node in hit_nodes.items():
+            result.button_hits[pattern] = (node.control, result.button_hits[pattern][1])
+        if result.button_pattern is not None:
+            result.button = result.button_hits[result.button_pattern][0]
+        return result
+
+    def snapshot(self, root_control: Any, max_depth: int = 25) -> NodeInfo:
+        try:
+            return self.prefetch(root_control, max_depth)
+        except Exception:
+            return self.fallback.snapshot(root_control, max_depth)
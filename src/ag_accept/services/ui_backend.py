@@ -0,0 +1,231 @@
+from typing import Any, Callable, Dict, List, Optional, Protocol, Tuple, runtime_checkable
+
+from ag_accept.services.tree_scanner import NodeInfo, uia_prefetch_subtree
+
+# (key, title, control factory) per top-level window
+TopLevelListing = List[Tuple[Any, str, Callable[[], Any]]]
+
+
+def window_key(window: Any) -> Any:
+    """
+    Stable identity for a window: its native handle when it has one, else its UIA runtime ID.
+    """
+    try:
+        handle = window.NativeWindowHandle
+        if handle:
+            return handle
+    except:
+        pass
+    try:
+        return tuple(window.GetRuntimeId())
+    except:
+        return id(window)
+
+
+def uia_client() -> Any:
+    """
+    The process-wide IUIAutomation COM object behind 'uiautomation'. It is only reachable through
+    the package's private '_AutomationClient' (hence the pinned version); raises a clear error if
+    an update moved it, instead of every bulk path quietly falling back to per-element calls.
+    """
+    import uiautomation as auto
+    try:
+        return auto._AutomationClient.instance().IUIAutomation
+    except AttributeError as e:
+        raise RuntimeError(f"Unsupported uiautomation {getattr(auto, 'VERSION', '?')}: no IUIAutomation client ({e})") from e
+
+
+def list_children_as_windows(root: Any) -> TopLevelListing:
+    """
+    Generic top-level listing: GetChildren() plus one Name read per window.
+    """
+    result = []
+    for window in root.GetChildren():
+        try:
+            name = window.Name or ""
+        except:
+            name = ""
+        result.append((window_key(window), name, (lambda w: lambda: w)(window)))
+    return result
+
+
+def control_properties(control: Any) -> Dict[str, Any]:
+    """Name, control type, AutomationId, offscreen flag and rect of a Control-like 'control'."""
+    rect = control.BoundingRectangle
+    return {
+        "name": control.Name or "",
+        "control_type": control.ControlTypeName,
+        "automation_id": control.AutomationId or "",
+        "is_offscreen": bool(control.IsOffscreen),
+        "rect": (rect.left, rect.top, rect.right, rect.bottom),
+    }
+
+
+def walk_find_first(root: Any, predicate: Callable[[Any, int], bool]) -> Optional[Any]:
+    """First descendant of 'root' (pre-order) for which predicate(control, depth) is true, via GetChildren()."""
+    stack = [(child, 1) for child in reversed(root.GetChildren())]
+    while stack:
+        control, depth = stack.pop()
+        if predicate(control, depth):
+            return control
+        stack.extend((child, depth + 1) for child in reversed(control.GetChildren()))
+    return None
+
+
+def find_listed_window(backend: "UiBackend", key: Any) -> Optional[Any]:
+    """The top-level window of 'backend' whose 'window_key' is 'key', created on the calling thread; None if it is gone."""
+    for listed_key, _, factory in backend.list_top_level(backend.get_root()):
+        if listed_key == key:
+            return factory()
+    return None
+
+
+@runtime_checkable
+class UiBackend(Protocol):
+    """
+    Everything the services need from a UI tree provider.
+
+    Controls handed out by a backend expose the uiautomation Control surface that the scanners
+    read directly (Name, ControlTypeName, AutomationId, IsOffscreen, BoundingRectangle,
+    GetChildren, GetRuntimeId, Exists); the module-level operations, bulk fetches, actions and
+    COM apartment handling go through the backend so they can be swapped out.
+    """
+
+    def initialize_thread(self, multithreaded: bool = False) -> None:
+        """Prepares the calling thread for UI calls (COM apartment for UI Automation)."""
+        ...
+
+    def uninitialize_thread(self) -> None:
+        ...
+
+    def get_root(self) -> Any:
+        ...
+
+    def get_children(self, control: Any) -> List[Any]:
+        ...
+
+    def get_properties(self, control: Any) -> Dict[str, Any]:
+        """Name, control type, AutomationId, offscreen flag and rect of 'control'."""
+        ...
+
+    def find_first(self, root: Any, predicate: Callable[[Any, int], bool]) -> Optional[Any]:
+        """First descendant of 'root' (pre-order) for which predicate(control, depth) is true."""
+        ...
+
+    def prefetch_subtree(self, root: Any, max_depth: int = 25) -> NodeInfo:
+        """Whole subtree with properties in one bulk request. Raises if unsupported."""
+        ...
+
+    def list_top_level(self, root: Any) -> TopLevelListing:
+        ...
+
+    def window_from_key(self, key: Any) -> Optional[Any]:
+        """
+        The top-level window whose 'window_key' is 'key', created on the calling thread; None if it is gone.
+        Lets another thread (and COM apartment) act on a window found elsewhere.
+        """
+        ...
+
+    def invoke(self, control: Any) -> None:
+        ...
+
+    def click(self, control: Any) -> None:
+        ...
+
+    def send_keys(self, control: Any, keys: str) -> None:
+        ...
+
+    def get_focused(self) -> Optional[Any]:
+        ...
+
+    def set_focus(self, control: Any) -> None:
+        ...
+
+
+class UiaBackend:
+    """
+    Windows UI Automation through the 'uiautomation' package.
+    uiautomation and pythoncom are only imported once a method needs them.
+    """
+
+    def initialize_thread(self, multithreaded: bool = False) -> None:
+        import pythoncom
+        if multithreaded:
+            pythoncom.CoInitializeEx(pythoncom.COINIT_MULTITHREADED)
+        else:
+            pythoncom.CoInitialize()
+
+    def uninitialize_thread(self) -> None:
+        import pythoncom
+        pythoncom.CoUninitialize()
+
+    def get_root(self) -> Any:
+        import uiautomation as auto
+        return auto.GetRootControl()
+
+    def get_children(self, control: Any) -> List[Any]:
+        return control.GetChildren()
+
+    def get_properties(self, control: Any) -> Dict[str, Any]:
+        return control_properties(control)
+
+    def find_first(self, root: Any, predicate: Callable[[Any, int], bool]) -> Optional[Any]:
+        import uiautomation as auto
+        return root.FindFirst(auto.TreeScope.Descendants, predicate)
+
+    def prefetch_subtree(self, root: Any, max_depth: int = 25) -> NodeInfo:
+        return uia_prefetch_subtree(root, max_depth)
+
+    def window_from_key(self, key: Any) -> Optional[Any]:
+        if isinstance(key, int):
+            import uiautomation as auto
+            try:
+                window = auto.ControlFromHandle(key)
+                if window is not None:
+                    return window
+            except Exception:
+                pass
+        return find_listed_window(self, key)
+
+    def list_top_level(self, root: Any) -> TopLevelListing:
+        """
+        One FindAllBuildCache call with Name and NativeWindowHandle cached;
+        falls back to GetChildren() plus per-window reads.
+        """
+        try:
+            import uiautomation as auto
+
+            uia = uia_client()
+            request = uia.CreateCacheRequest()
+            request.AddProperty(auto.PropertyId.NameProperty)
+            request.AddProperty(auto.PropertyId.NativeWindowHandleProperty)
+            request.AddProperty(auto.PropertyId.RuntimeIdProperty)
+            elements = root.Element.FindAllBuildCache(auto.TreeScope.Children, uia.CreateTrueCondition(), request)
+
+            def factory(el):
+                return lambda: auto.Control.CreateControlFromElement(el)
+
+            result = []
+            for i in range(elements.Length):
+                el = elements.GetElement(i)
+                key = el.CachedNativeWindowHandle or tuple(el.GetCachedPropertyValue(auto.PropertyId.RuntimeIdProperty))
+                result.append((key, el.CachedName or "", factory(el)))
+            return result
+        except Exception:
+            return list_children_as_windows(root)
+
+    def invoke(self, control: Any) -> None:
+        control.Invoke()
+
+    def click(self, control: Any) -> None:
+        control.Click()
+
+    def send_keys(self, control: Any, keys: str) -> None:
+        control.SendKeys(keys)
+
+    def get_focused(self) -> Optional[Any]:
+        import uiautomation as auto
+        return auto.GetFocusedControl()
+
+    def set_focus(self, control: Any) -> None:
+        control.SetFocus()
@@ -1,33 +1,230 @@
-import uiautomation as auto
-from typing import List, Optional, Any
-import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Any, Set, Tuple
+
+from ag_accept.services.debug_service import format_structure_line
+from ag_accept.services.tree_scanner import NodeInfo, TreeScanner, PrefetchTreeScanner, WalkerTreeScanner
+from ag_accept.services.ui_backend import TopLevelListing, UiBackend, UiaBackend, list_children_as_windows
+
+class WindowEntry:
+    """
+    A top-level window known to the registry, with its title and cached classification.
+    The control object is only created when first needed and then reused across refreshes.
+    """
+    __slots__ = ("key", "title", "excluded", "order", "_window", "_factory")
+
+    def __init__(self, key: Any, title: str, factory: Callable[[], Any], order: int):
+        self.key = key
+        self.title = title
+        self.excluded = False
+        self.order = order
+        self._window = None
+        self._factory = factory
+
+    @property
+    def window(self) -> Any:
+        if self._window is None:
+            self._window = self._factory()
+        return self._window
+
+    def __repr__(self) -> str:
+        return f"WindowEntry({self.title!r})"
+
+
+@dataclass
+class RegistryDiff:
+    added: List[WindowEntry] = field(default_factory=list)
+    removed: List[WindowEntry] = field(default_factory=list)
+    renamed: List[WindowEntry] = field(default_factory=list)
+
+    @property
+    def changed(self) -> List[WindowEntry]:
+        """Windows whose classification may differ from the last refresh."""
+        return self.added + self.renamed
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.renamed)
+
+    def absorb(self, later: "RegistryDiff") -> None:
+        """
+        Folds the diff of a later refresh into this one, so it spans both refreshes.
+        A window added and removed again in between is dropped altogether.
+        """
+        added = {e.key for e in self.added}
+        removed = {e.key for e in self.removed}
+        for entry in later.removed:
+            self.renamed = [e for e in self.renamed if e.key != entry.key]
+            if entry.key in added:
+                self.added = [e for e in self.added if e.key != entry.key]
+                added.discard(entry.key)
+            elif entry.key not in removed:
+                self.removed.append(entry)
+                removed.add(entry.key)
+        for entry in later.added:
+            self.added.append(entry)
+            added.add(entry.key)
+        renamed = {e.key for e in self.renamed}
+        for entry in later.renamed:
+            if entry.key not in added and entry.key not in renamed:
+                self.renamed.append(entry)
+                renamed.add(entry.key)
+
+
+class WindowRegistry:
+    """
+    Incrementally maintained list of top-level windows keyed by native handle / runtime ID.
+    Each refresh enumerates the desktop once and diffs it against the previous state;
+    exclusions and title-fragment lookups are only recomputed for added or renamed windows.
+    """
+
+    def __init__(self, root_provider: Callable[[], Any], lister: Callable[[Any], TopLevelListing] = list_children_as_windows):
+        self.root_provider = root_provider
+        self.lister = lister
+        self.entries: Dict[Any, WindowEntry] = {}
+        self.exclude_titles: Tuple[str, ...] = ()
+        self._exclude_lower: List[str] = []
+        # fragment -> keys of windows whose title contains it
+        self._fragments: Dict[str, Set[Any]] = {}
+
+    def set_exclusions(self, exclude_titles: Iterable[str]) -> None:
+        exclude_titles = tuple(ex for ex in exclude_titles if ex)
+        if exclude_titles == self.exclude_titles:
+            return
+        self.exclude_titles = exclude_titles
+        self._exclude_lower = [ex.lower() for ex in exclude_titles]
+        for entry in self.entries.values():
+            self._classify(entry)
+
+    def _classify(self, entry: WindowEntry) -> None:
+        title_lower = entry.title.lower()
+        entry.excluded = any(ex in title_lower for ex in self._exclude_lower)
+
+    def _index(self, entry: WindowEntry) -> None:
+        for fragment, keys in self._fragments.items():
+            if fragment in entry.title:
+                keys.add(entry.key)
+            else:
+                keys.discard(entry.key)
+
+    def refresh(self) -> RegistryDiff:
+        """
+        Re-enumerates the desktop and returns what was added, removed or renamed.
+        """
+        diff = RegistryDiff()
+        listing = self.lister(self.root_provider())
+        seen = set()
+
+        for order, (key, title, factory) in enumerate(listing):
+            seen.add(key)
+            entry = self.entries.get(key)
+            if entry is None:
+                entry = WindowEntry(key, title, factory, order)
+                self.entries[key] = entry
+                diff.added.append(entry)
+            else:
+                entry.order = order
+                if entry.title == title:
+                    continue
+                entry.title = title
+                diff.renamed.append(entry)
+            self._classify(entry)
+            self._index(entry)
+
+        for key in [k for k in self.entries if k not in seen]:
+            entry = self.entries.pop(key)
+            for keys in self._fragments.values():
+                keys.discard(key)
+            diff.removed.append(entry)
+
+        return diff
+
+    def windows(self, include_excluded: bool = False) -> List[WindowEntry]:
+        """
+        Returns the known windows in desktop order.
+        """
+        entries = sorted(self.entries.values(), key=lambda e: e.order)
+        if include_excluded:
+            return entries
+        return [e for e in entries if not e.excluded]
+
+    def find(self, fragment: str, include_excluded: bool = False) -> List[WindowEntry]:
+        """
+        Returns windows whose title contains 'fragment', in desktop order.
+        The first lookup of a fragment indexes it; later refreshes keep the index current.
+        """
+        keys = self._fragments.get(fragment)
+        if keys is None:
+            keys = {e.key for e in self.entries.values() if fragment in e.title}
+            self._fragments[fragment] = keys
+        entries = sorted((self.entries[k] for k in keys), key=lambda e: e.order)
+        if include_excluded:
+            return entries
+        return [e for e in entries if not e.excluded]
+
+    def get(self, key: Any) -> Optional[WindowEntry]:
+        return self.entries.get(key)
+
 
 class WindowService:
     """
     Service for managing windows, including finding, focusing, and structure analysis.
     """
-    def __init__(self):
+    def __init__(self, scanner: Optional[TreeScanner] = None, backend: Optional[UiBackend] = None):
         self.previous_focus_control = None
+        self.backend = backend or UiaBackend()
+        self.scanner = scanner or PrefetchTreeScanner(prefetch=self.backend.prefetch_subtree, fallback=WalkerTreeScanner())
+        self.registry = WindowRegistry(self.get_root_control, lister=self.backend.list_top_level)
+        # Changes seen by lookups since the last 'refresh_windows', which returns them
+        self._pending_diff = RegistryDiff()
 
     def get_root_control(self) -> Any:
-        return auto.GetRootControl()
+        return self.backend.get_root()
+
+    def is_excluded(self, name: str, exclude_titles: List[str]) -> bool:
+        return any(ex.lower() in name.lower() for ex in exclude_titles if ex)
+
+    def _refresh(self) -> None:
+        self._pending_diff.absorb(self.registry.refresh())
+
+    def refresh_windows(self, exclude_titles: List[str] = []) -> RegistryDiff:
+        """
+        Updates the window registry and returns which top-level windows were added, removed or renamed
+        since the last call (including changes picked up by lookups in between).
+        """
+        try:
+            self.registry.set_exclusions(exclude_titles)
+            self._refresh()
+        except Exception:
+            return RegistryDiff()
+        diff, self._pending_diff = self._pending_diff, RegistryDiff()
+        return diff
+
+    def find_windows(self, title_part: str) -> List[WindowEntry]:
+        """
+        Returns the registered, non-excluded windows whose title contains 'title_part'.
+        Uses the registry as of the last refresh; no COM calls are made.
+        """
+        return self.registry.find(title_part)
+
+    def find_windows_matching(self, title_parts: Iterable[str]) -> List[WindowEntry]:
+        """
+        Like 'find_windows', for windows whose title contains any of 'title_parts' (each listed once).
+        """
+        entries = {}
+        for title_part in title_parts:
+            for entry in self.registry.find(title_part):
+                entries[entry.key] = entry
+        return sorted(entries.values(), key=lambda e: e.order)
 
     def get_all_windows(self, exclude_titles: List[str] = []) -> List[Any]:
         """
         Returns a listing of all top-level windows, optionally excluding some by title.
         """
-        windows = []
         try:
-            root = self.get_root_control()
-            for window in root.GetChildren():
-                name = window.Name
-                # Simple exclusion check
-                if any(ex.lower() in name.lower() for ex in exclude_titles if ex):
-                    continue
-                windows.append(window)
+            self.registry.set_exclusions(exclude_titles)
+            self._refresh()
+            return [entry.window for entry in self.registry.windows()]
         except Exception:
-            pass
-        return windows
+            return []
 
     def find_window_by_title(self, title_part: str, exclude_titles: List[str] = []) -> Optional[Any]:
         """
@@ -35,91 +232,82 @@ class WindowService:
         Returns the best match or None.
         """
         try:
-            root = self.get_root_control()
-            best_match = None
-            
-            for window in root.GetChildren():
-                name = window.Name
-                
-                # Check exclusions
-                if any(ex.lower() in name.lower() for ex in exclude_titles if ex):
-                    continue
+            self.registry.set_exclusions(exclude_titles)
+            self._refresh()
+            matches = self.registry.find(title_part)
+            if not matches:
+                return None
 
-                # Exact match priority
-                if name == title_part:
-                    return window
-                
-                # Partial match
-                if title_part in name:
-                    if not best_match:
-                        best_match = window
-            
-            return best_match
+            # Exact match priority, then the first partial match
+            for entry in matches:
+                if entry.title == title_part:
+                    return entry.window
+            return matches[0].window
         except Exception:
             return None
 
-    def focus_window(self, window: Any) -> None:
+    def focus_window(self, window: Any) -> Optional[Any]:
         """
         Focuses the specified window and saves the currently focused element
-        to enable 'restore_previous_focus'.
+        to enable 'restore_previous_focus'. Also returns that element, for callers that
+        restore it themselves with 'restore_focus' (actions that may run concurrently).
         """
         try:
             # Save current focus
-            self.previous_focus_control = auto.GetFocusedControl()
+            self.previous_focus_control = self.backend.get_focused()
         except:
             self.previous_focus_control = None
+        previous = self.previous_focus_control
 
         try:
-            window.SetFocus()
+            self.backend.set_focus(window)
         except Exception as e:
             # Log or re-raise? For service, maybe just warn or let caller handle.
             # We'll assume caller handles specific errors if needed.
             print(f"WindowService: Failed to focus window: {e}")
+        return previous
 
-    def restore_previous_focus(self) -> None:
+    def restore_focus(self, control: Optional[Any]) -> None:
         """
-        Restores focus to the element that was focused before 'focus_window' was last called.
+        Gives focus back to 'control' (as returned by 'focus_window'), if any.
         """
-        if self.previous_focus_control:
+        if control:
             try:
-                self.previous_focus_control.SetFocus()
+                self.backend.set_focus(control)
             except Exception as e:
                 print(f"WindowService: Failed to restore focus: {e}")
-            finally:
-                self.previous_focus_control = None
+
+    def restore_previous_focus(self) -> None:
+        """
+        Restores focus to the element that was focused before 'focus_window' was last called.
+        """
+        try:
+            self.restore_focus(self.previous_focus_control)
+        finally:
+            self.previous_focus_control = None
 
     def get_window_structure(self, window: Any, depth: int = 0, max_depth: int = 5) -> str:
         """
         Returns a string representation of the window structure for debugging.
+        The subtree is captured in one prefetch and formatted in-process.
         """
         if depth > max_depth:
             return ""
-        
-        indent = "  " * depth
+
         try:
-            name = window.Name
-            control_type = window.ControlTypeName
-            
-            extra = ""
-            try:
-                rect = window.BoundingRectangle
-                extra += f" Rect:{rect}"
-            except: pass
-            
-            try:
-                auto_id = window.AutomationId
-                if auto_id:
-                    extra += f" AutoID:{auto_id}"
-            except: pass
-            
-            info = f"\n{indent}- [{control_type}] '{name}'{extra}"
-            
-            for child in window.GetChildren():
-                info += self.get_window_structure(child, depth + 1, max_depth)
-            
-            return info
+            node = self.scanner.snapshot(window, max_depth - depth)
         except Exception as e:
-            return f"\n{indent}<Error reading control: {e}>"
+            return "\n" + format_structure_line(depth, {"error": str(e)})
+
+        lines = []
+        self._format_structure(node, depth, lines)
+        return "".join(lines)
+
+    def _format_structure(self, node: NodeInfo, depth: int, lines: List[str]) -> None:
+        props = {"name": node.name, "control_type": node.control_type, "automation_id": node.automation_id, "rect": node.rect}
+        lines.append("\n" + format_structure_line(depth, props))
+        for child in node.children:
+            self._format_structure(child, depth + 1, lines)
 
     def get_all_window_titles_string(self) -> str:
         """
@@ -127,13 +315,8 @@ class WindowService:
         """
         titles = []
         try:
-            root = self.get_root_control()
-            for window in root.GetChildren():
-                try:
-                    name = window.Name
-                    if name:
-                        titles.append(name)
-                except: pass
+            self._refresh()
+            titles = [entry.title for entry in self.registry.windows(include_excluded=True) if entry.title]
         except Exception:
             titles.append("Error listing windows")
         return "\n".join([f"- {t}" for t in titles])
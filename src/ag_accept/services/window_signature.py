@@ -0,0 +1,142 @@
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from ag_accept.services.tree_scanner import ScanResult
+from ag_accept.services.ui_backend import window_key
+
+
+@dataclass(frozen=True)
+class WindowSignature:
+    """
+    Cheap fingerprint of a window: a handful of COM reads instead of a deep scan.
+    """
+    title: str
+    rect: Optional[Tuple[int, int, int, int]]
+    child_count: int
+    runtime_ids: Tuple[Tuple[Any, ...], ...]
+
+
+def _runtime_id(control: Any) -> Any:
+    try:
+        return tuple(control.GetRuntimeId())
+    except:
+        return None
+
+
+def _children(control: Any) -> List[Any]:
+    try:
+        return control.GetChildren()
+    except:
+        return []
+
+
+def compute_window_signature(window: Any, levels: int = 2) -> WindowSignature:
+    """
+    Builds a signature from the title, bounding rect, top-level child count and the
+    runtime IDs of the first 'levels' levels below the window.
+    """
+    try:
+        title = window.Name
+    except:
+        title = ""
+    try:
+        r = window.BoundingRectangle
+        rect = (r.left, r.top, r.right, r.bottom)
+    except:
+        rect = None
+
+    top_children = _children(window)
+    level_ids = []
+    frontier = top_children
+    for level in range(levels):
+        level_ids.append(tuple(_runtime_id(c) for c in frontier))
+        if level + 1 < levels:
+            frontier = [grandchild for c in frontier for grandchild in _children(c)]
+
+    return WindowSignature(title, rect, len(top_children), tuple(level_ids))
+
+
+class WindowSignatureCache:
+    """
+    Remembers the signature and last scan result per window so unchanged windows can
+    skip the deep scan. A window is always rescanned when its last scan found a button,
+    and at least every 'force_rescan_ticks' ticks.
+    """
+
+    def __init__(self, levels: int = 2, force_rescan_ticks: int = 10):
+        self.levels = levels
+        self.force_rescan_ticks = force_rescan_ticks
+        # key -> (signature, last result without live references, whether it found a button)
+        self.entries: Dict[Any, Tuple[WindowSignature, ScanResult, bool]] = {}
+        self.skipped: Dict[Any, int] = {}
+        self.current: Dict[Any, WindowSignature] = {}
+
+        self.ticks = 0
+        self.tick_hits = 0
+        self.tick_misses = 0
+        self.total_hits = 0
+        self.total_misses = 0
+
+    def begin_tick(self) -> None:
+        self.ticks += 1
+        self.tick_hits = 0
+        self.tick_misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.total_hits + self.total_misses
+        return self.total_hits / total if total else 0.0
+
+    def summary(self) -> str:
+        return (f"Signature cache: tick {self.tick_hits} hit / {self.tick_misses} miss, "
+                f"overall {self.hit_rate:.0%} of {self.total_hits + self.total_misses}")
+
+    def check(self, window: Any) -> Optional[ScanResult]:
+        """
+        Returns the previous scan result if the window is unchanged and may skip the deep scan,
+        or None if it must be scanned (call 'update' afterwards).
+        """
+        key = window_key(window)
+        signature = compute_window_signature(window, self.levels)
+        self.current[key] = signature
+
+        entry = self.entries.get(key)
+        skipped = self.skipped.get(key, 0)
+        if (entry is not None and entry[0] == signature and not entry[2]
+                and skipped < self.force_rescan_ticks):
+            self.skipped[key] = skipped + 1
+            self.tick_hits += 1
+            self.total_hits += 1
+            return entry[1]
+
+        self.tick_misses += 1
+        self.total_misses += 1
+        return None
+
+    def update(self, window: Any, result: ScanResult) -> None:
+        key = window_key(window)
+        signature = self.current.pop(key, None)
+        if signature is None:
+            signature = compute_window_signature(window, self.levels)
+        # Keep only what the skip decision needs, not live COM references
+        summary = ScanResult(result.context_matched, None, 0, result.context_pattern, result.button_pattern)
+        self.entries[key] = (signature, summary, result.button is not None)
+        self.skipped[key] = 0
+
+    def retain(self, keys: Iterable[Any]) -> None:
+        """
+        Drops entries for windows that are no longer present.
+        """
+        keep = set(keys)
+        for key in [k for k in self.entries if k not in keep]:
+            self.evict(key)
+
+    def evict(self, key: Any) -> None:
+        self.entries.pop(key, None)
+        self.skipped.pop(key, None)
+        self.current.pop(key, None)
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.skipped.clear()
+        self.current.clear()
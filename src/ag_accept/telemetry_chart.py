@@ -0,0 +1,169 @@
+from typing import Any, Callable, List, Optional
+
+BACKGROUND = "#2b2b2b"
+
+
+class RingBuffer:
+    """
+    Fixed-size circular buffer of floats; appending never shifts or reallocates.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.data = [0.0] * capacity
+        self.head = 0  # next write position
+        self.size = 0
+
+    def append(self, value: float) -> None:
+        self.data[self.head] = value
+        self.head = (self.head + 1) % self.capacity
+        if self.size < self.capacity:
+            self.size += 1
+
+    def values(self) -> List[float]:
+        """Oldest to newest."""
+        if self.size < self.capacity:
+            return self.data[:self.size]
+        return self.data[self.head:] + self.data[:self.head]
+
+    def last(self) -> Optional[float]:
+        return self.data[(self.head - 1) % self.capacity] if self.size else None
+
+    def __len__(self) -> int:
+        return self.size
+
+
+class AdaptiveInterval:
+    """
+    Refresh period that stretches while the plotted value stays flat and snaps back on change.
+    """
+
+    def __init__(self, base_ms: int = 1000, max_ms: int = 5000, factor: float = 2.0):
+        self.base_ms = base_ms
+        self.max_ms = max_ms
+        self.factor = factor
+        self.current_ms = base_ms
+
+    def next(self, changed: bool) -> int:
+        if changed:
+            self.current_ms = self.base_ms
+        else:
+            self.current_ms = min(self.max_ms, int(self.current_ms * self.factor))
+        return self.current_ms
+
+
+class TelemetryChart:
+    """
+    Line chart of a sampled value for the Telemetry tab.
+    - matplotlib is only imported and the figure only built on the first 'show'
+    - each refresh blits just the line over a cached background; the full figure is redrawn
+      (via draw_idle) only when the y-range or the widget size changes
+    - no timer runs while the chart is hidden
+    """
+
+    def __init__(self, root: Any, parent: Any, sample: Callable[[], float], title: str = "",
+                 capacity: int = 60, interval: Optional[AdaptiveInterval] = None):
+        self.root = root
+        self.parent = parent
+        self.sample = sample
+        self.title = title
+        self.buffer = RingBuffer(capacity)
+        self.interval = interval or AdaptiveInterval()
+        self.visible = False
+        self.after_id = None
+        self.fig = None
+        self.ax = None
+        self.line = None
+        self.canvas = None
+        self.background = None
+        self.y_max = 12.0
+        self.xs = list(range(capacity))
+
+    @property
+    def built(self) -> bool:
+        return self.canvas is not None
+
+    def build(self) -> None:
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+        self.fig = Figure(figsize=(5, 4), layout="tight")
+        self.ax = self.fig.add_subplot(111)
+        self.ax.set_title(self.title)
+        self.ax.set_facecolor(BACKGROUND)
+        self.fig.patch.set_facecolor(BACKGROUND)
+        self.ax.tick_params(colors='white')
+        self.ax.xaxis.label.set_color('white')
+        self.ax.yaxis.label.set_color('white')
+        self.ax.title.set_color('white')
+        for spine in self.ax.spines.values():
+            spine.set_color('white')
+        self.ax.set_xlim(0, self.buffer.capacity - 1)
+        self.ax.set_ylim(0, self.y_max)
+
+        # Animated artists are left out of normal draws so they can be blitted on their own
+        self.line, = self.ax.plot([], [], 'c-', animated=True)
+
+        self.canvas = FigureCanvasTkAgg(self.fig, master=self.parent)
+        self.canvas.mpl_connect("draw_event", self.on_draw)
+
+        tk_widget = self.canvas.get_tk_widget()
+        tk_widget.configure(background=BACKGROUND, highlightthickness=0)
+        tk_widget.pack(fill="both", expand=True, padx=10, pady=10)
+        tk_widget.bind("<Configure>", self.on_resize)
+        self.canvas.draw_idle()
+
+    def on_draw(self, event: Any) -> None:
+        # A full draw just happened (first paint, resize, rescale): cache it and put the line back
+        self.background = self.canvas.copy_from_bbox(self.fig.bbox)
+        self.ax.draw_artist(self.line)
+
+    def on_resize(self, event: Any) -> None:
+        # Force background again in case draw resets it
+        self.canvas.get_tk_widget().configure(background=BACKGROUND)
+        # Subtract a small buffer (4px) to avoid rounding errors causing scroll/crop
+        w, h = event.width - 4, event.height - 4
+        dpi = self.fig.get_dpi()
+        if w > 1 and h > 1:
+            self.fig.set_size_inches(w / dpi, h / dpi)
+            self.background = None
+            self.canvas.draw_idle()
+
+    def show(self) -> None:
+        if self.visible:
+            return
+        if not self.built:
+            self.build()
+        self.visible = True
+        self.interval.current_ms = self.interval.base_ms
+        self.refresh()
+
+    def hide(self) -> None:
+        self.visible = False
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+
+    def refresh(self) -> None:
+        self.after_id = None
+        if not self.visible:
+            return
+
+        previous = self.buffer.last()
+        value = float(self.sample())
+        self.buffer.append(value)
+
+        values = self.buffer.values()
+        self.line.set_data(self.xs[:len(values)], values)
+        if value > self.y_max:
+            # New scale: one full redraw, after which blitting resumes
+            self.y_max = value * 1.2
+            self.ax.set_ylim(0, self.y_max)
+            self.background = None
+            self.canvas.draw_idle()
+        elif self.background is not None:
+            self.canvas.restore_region(self.background)
+            self.ax.draw_artist(self.line)
+            self.canvas.blit(self.fig.bbox)
+
+        self.after_id = self.root.after(self.interval.next(value != previous), self.refresh)
@@ -2,31 +2,51 @@ import tkinter as tk
 from tkinter import ttk
 import threading
 import time
+from collections import deque
 import customtkinter as ctk
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.figure import Figure
-import matplotlib.pyplot as plt
 
 from injector import inject
 from ag_accept.services.config_service import ConfigService
 from ag_accept.services.automation_service import AutomationService
-from ag_accept.automation import (
-    STATE_IDLE, STATE_SEARCHING_WINDOW, STATE_WINDOW_FOUND,
-    STATE_CHECKING_CONTEXT, STATE_CONTEXT_MATCHED, STATE_CONTEXT_FAILED,
-    STATE_SEARCHING_BUTTON, STATE_BUTTON_FOUND, STATE_BUTTON_FAILED,
-    STATE_ACTION_SUCCESS, STATE_ACTION_FAILED
+from ag_accept.services.log_queue import LogQueue
+from ag_accept.services.state_channel import (
+    StateChannel, STATUS_IDLE, STATUS_WORKING, STATUS_OK, STATUS_FAILED
 )
 
+# Colors: Grey -> Idle/Pending, Yellow -> Searching/Working, Green -> Success, Red -> Fail
+STATUS_COLORS = {
+    STATUS_IDLE: "#555555",
+    STATUS_WORKING: "#FFD700",
+    STATUS_OK: "#32CD32",
+    STATUS_FAILED: "#FF4500",
+}
+STATE_FRAME_MS = 33
+
+LOG_MAX_ROWS = 100
+LOG_QUEUE_SIZE = 1000
+LOG_DRAIN_BATCH = 200
+LOG_DRAIN_INTERVAL_MS = 100
+
 class VisualStateManager:
-    def __init__(self, root, parent_frame):
+    def __init__(self, root, parent_frame, show_summary=True):
         self.root = root
+        self.channel = StateChannel()
+        self.version = -1
+        self.applied = {}
+        # Set while a frame is scheduled, so a burst of states costs one canvas update
+        self.frame_pending = False
+        self.frame_lock = threading.Lock()
         self.canvas = tk.Canvas(parent_frame, height=80, bg="#2b2b2b", highlightthickness=0)
         self.canvas.pack(fill="x", padx=5, pady=5)
         
         self.nodes = {}
         self.links = {}
+        self.summary_text = None
         
         self.setup_pipeline()
+        if show_summary:
+            self.summary_text = self.canvas.create_text(420, 40, text="", fill="gray", font=("Arial", 9), anchor="w")
+        self.render()
         
     def setup_pipeline(self):
         # Define nodes: (x, y, label)
@@ -65,53 +85,32 @@ class VisualStateManager:
 
     def reset(self):
         for key in self.nodes:
-            self.set_color(key, "#555555")
+            self.set_color(key, STATUS_COLORS[STATUS_IDLE])
+        self.applied = {}
 
     def update_state(self, state):
-        # Update UI in main thread
-        if threading.current_thread() is not threading.main_thread():
-            self.root.after(0, lambda: self.update_state(state))
-            return
-            
-        # Logic to map state to visual colors
-        # Colors: Grey (#555555) -> Idle/Pending
-        #         Yellow (#FFD700) -> Searching/Working
-        #         Green (#32CD32) -> Success
-        #         Red (#FF4500) -> Fail
-        
-        if state == STATE_IDLE or state == STATE_SEARCHING_WINDOW:
-            self.reset()
-            if state == STATE_SEARCHING_WINDOW:
-                self.set_color("window", "#FFD700") # Yellow
-                
-        elif state == STATE_WINDOW_FOUND:
-            self.set_color("window", "#32CD32") # Green
-            
-        elif state == STATE_CHECKING_CONTEXT:
-            self.set_color("context", "#FFD700")
-
-        elif state == STATE_CONTEXT_MATCHED:
-            self.set_color("context", "#32CD32")
-            
-        elif state == STATE_CONTEXT_FAILED:
-            self.set_color("context", "#FF4500") # Red
-            self.set_color("button", "#555555") # Reset downstream
-            
-        elif state == STATE_SEARCHING_BUTTON:
-            self.set_color("button", "#FFD700")
-            
-        elif state == STATE_BUTTON_FOUND:
-            self.set_color("button", "#32CD32")
-            
-        elif state == STATE_BUTTON_FAILED:
-            self.set_color("button", "#FF4500")
-            
-        elif state == STATE_ACTION_SUCCESS:
-            self.set_color("action", "#32CD32")
-            # Flash effect or something?
-            
-        elif state == STATE_ACTION_FAILED:
-            self.set_color("action", "#FF4500")
+        # Callable from any thread; the canvas catches up on the next frame
+        self.channel.push(state)
+        with self.frame_lock:
+            if self.frame_pending:
+                return
+            self.frame_pending = True
+        self.root.after(STATE_FRAME_MS, self.render)
+
+    def render(self):
+        # At most one canvas update per frame, and only for nodes whose status changed.
+        # Nothing is rescheduled here: the next 'update_state' schedules the next frame.
+        with self.frame_lock:
+            self.frame_pending = False
+        update = self.channel.poll(self.version)
+        if update:
+            self.version, statuses, last_tick = update
+            for key, status in statuses.items():
+                if self.applied.get(key) != status:
+                    self.set_color(key, STATUS_COLORS[status])
+                    self.applied[key] = status
+            if self.summary_text is not None and last_tick:
+                self.canvas.itemconfig(self.summary_text, text=f"Last tick:\n{last_tick}")
 
 
 
@@ -129,20 +128,24 @@ class AutoAccepterUI:
         self.root.geometry(f"{width}x{height}")
         self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         
+        self.log_queue = LogQueue(LOG_QUEUE_SIZE)
+        self.log_rows = deque()
+
         self.setup_ui()
+        self.drain_logs()
         self.log(f"Config loaded from: {config_service.get_config_path()}")
-        self.start_telemetry_loop()
 
     def setup_ui(self):
         # Create Tabview
-        self.tabview = ctk.CTkTabview(self.root)
+        self.tabview = ctk.CTkTabview(self.root, command=self.on_tab_change)
         self.tabview.pack(fill="both", expand=True, padx=10, pady=10)
         
         self.tab_dashboard = self.tabview.add("Dashboard")
         self.tab_telemetry = self.tabview.add("Telemetry")
         
         self.setup_dashboard(self.tab_dashboard)
-        self.setup_telemetry(self.tab_telemetry)
+        # The Telemetry tab is filled in the first time it is opened
+        self.telemetry_chart = None
 
     def setup_state_viz(self, parent):
         viz_frame = ctk.CTkFrame(parent)
@@ -228,114 +231,53 @@ class AutoAccepterUI:
 
 
     def setup_telemetry(self, parent):
-        # Matplotlib Graph
-        self.fig = Figure(figsize=(5, 4), layout="tight")
-        self.ax = self.fig.add_subplot(111)
-        self.ax.set_title("Automation Performance (Events/min)")
-        self.ax.set_facecolor('#2b2b2b')
-        self.fig.patch.set_facecolor('#2b2b2b')
-        self.ax.tick_params(colors='white')
-        self.ax.xaxis.label.set_color('white')
-        self.ax.yaxis.label.set_color('white')
-        self.ax.title.set_color('white')
-        self.ax.spines['bottom'].set_color('white')
-        self.ax.spines['top'].set_color('white') 
-        self.ax.spines['right'].set_color('white')
-        self.ax.spines['left'].set_color('white')
-
-        # Mock data buffers
-        self.x_data = []
-        self.y_data = []
-        self.line, = self.ax.plot(self.x_data, self.y_data, 'c-') # Cyan line
-
-        # Remove internal margins
-        # self.fig.tight_layout() # using constrained_layout=True instead
-
-        self.canvas = FigureCanvasTkAgg(self.fig, master=parent)
-        self.canvas.draw()
-        
-        # Use pack for better fill and centering
-        tk_widget = self.canvas.get_tk_widget()
-        tk_widget.configure(background='#2b2b2b', highlightthickness=0)
-        tk_widget.pack(fill="both", expand=True, padx=10, pady=10)
-        
-        # Bind to configure event to fix initial layout issues
-        tk_widget.bind("<Configure>", self.on_telemetry_resize)
-
-    def on_telemetry_resize(self, event):
-        # Force background again in case draw resets it
-        self.canvas.get_tk_widget().configure(background='#2b2b2b')
-        self.fig.patch.set_facecolor('#2b2b2b')
-        
-        # Calculate new dimensions in inches
-        # Subtract a small buffer (4px) to avoid rounding errors causing scroll/crop
-        w, h = event.width - 4, event.height - 4
-        dpi = self.fig.get_dpi()
-        
-        # Ensure we don't set invalid sizes
-        if w > 1 and h > 1:
-            self.fig.set_size_inches(w / dpi, h / dpi)
-            self.canvas.draw_idle()
-        
-    def start_telemetry_loop(self):
-        # Update graph every second (mock for now, or hook to service stats)
-        # In a real scenario, AutomationService would track 'actions per minute'
-        self.update_telemetry()
-        
-    def update_telemetry(self):
-        # Simple mock or basic stat: count total logs?
-        # Ideally, we ask automation_service for stats
-        # For now, let's just plot 'random' or stable activity if running
-        
-        # TODO: Implement real stats in AutomationService
-        # For demo, we just tick x
-        import random
-        
-        if len(self.x_data) > 20:
-            self.x_data.pop(0)
-            self.y_data.pop(0)
-            
-        self.x_data.append(time.strftime("%M:%S"))
-        # Mock value: 0 if stopped, random if running
-        val = 0
-        if self.start_btn.cget("state") == "disabled": # Running
-            val = random.randint(1, 10)
-        self.y_data.append(val)
-        
-        self.line.set_data(range(len(self.y_data)), self.y_data)
-        self.ax.set_xlim(0, max(20, len(self.y_data)))
-        self.ax.set_ylim(0, 12)
-        
-        # Redraw
-        self.canvas.draw()
-        
-        # Schedule next update
-        self.root.after(1000, self.update_telemetry)
+        from ag_accept.telemetry_chart import TelemetryChart
+
+        # Rolling stats from AutomationService.get_metrics()
+        self.telemetry_label = ctk.CTkLabel(parent, text="", anchor="w", justify="left", wraplength=560)
+        self.telemetry_label.pack(side="bottom", fill="x", padx=10, pady=(0, 10))
+
+        # The matplotlib figure is built the first time the tab is opened
+        self.telemetry_chart = TelemetryChart(
+            self.root, parent, self.sample_telemetry,
+            title="Automation Performance (Accepts/min)", capacity=21,
+        )
+
+    def sample_telemetry(self):
+        snapshot = self.automation_service.get_metrics()
+        self.telemetry_label.configure(text=snapshot.summary())
+        return snapshot.accepts_per_minute
+
+    def on_tab_change(self):
+        # Chart refreshes only run while its tab is showing
+        if self.tabview.get() == "Telemetry":
+            if self.telemetry_chart is None:
+                self.setup_telemetry(self.tab_telemetry)
+            self.telemetry_chart.show()
+        elif self.telemetry_chart is not None:
+            self.telemetry_chart.hide()
 
     def log(self, message):
-        if threading.current_thread() is not threading.main_thread():
-            self.root.after(0, lambda: self.log(message))
-            return
-            
-        timestamp = time.strftime("%H:%M:%S")
-        status = "INFO"
-        tag = "normal"
-        
-        msg_lower = message.lower()
-        if "success" in msg_lower:
-            status = "SUCCESS"
-            tag = "success"
-        elif "error" in msg_lower or "fail" in msg_lower:
-            status = "ERROR"
-            tag = "error"
-        elif "checking" in msg_lower or "skipping" in msg_lower:
-            status = "CHECK"
-            tag = "muted"
-        
-        self.log_tree.insert("", 0, values=(timestamp, status, message), tags=(tag,))
-        # Limit logs
-        if len(self.log_tree.get_children()) > 100:
-             self.log_tree.delete(self.log_tree.get_children()[-1])
+        # Safe from any thread; rows are added by drain_logs on the UI thread
+        self.log_queue.push(message)
+
+    def drain_logs(self):
+        records, dropped = self.log_queue.drain(LOG_DRAIN_BATCH)
+        if dropped:
+            self.add_log_row(time.strftime("%H:%M:%S"), "DROPPED", f"{dropped} log messages dropped (queue full)", "error")
+        # Anything beyond the row limit would be trimmed right away
+        for record in records[-LOG_MAX_ROWS:]:
+            self.add_log_row(record.timestamp, record.status, record.message, record.tag)
+
+        excess = len(self.log_rows) - LOG_MAX_ROWS
+        if excess > 0:
+            self.log_tree.delete(*[self.log_rows.popleft() for _ in range(excess)])
+
+        self.root.after(LOG_DRAIN_INTERVAL_MS, self.drain_logs)
+
+    def add_log_row(self, timestamp, status, message, tag):
+        # Newest on top; log_rows holds item ids oldest first
+        self.log_rows.append(self.log_tree.insert("", 0, values=(timestamp, status, message), tags=(tag,)))
 
 
     def start_monitoring(self):
@@ -387,6 +329,7 @@ class AutoAccepterUI:
 
     def on_close(self):
         self.stop_monitoring()
+        self.automation_service.shutdown()
         self.config_service.save()
         self.root.destroy()
         import sys
@@ -8,12 +8,14 @@ import os
 # Add src to path so we can import modules
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
 
-from ag_accept.di_module import AppModule
 from ag_accept.services.window_service import WindowService
 from ag_accept.services.text_query_service import TextQueryService
 from ag_accept.services.scheduler_service import SchedulerService
 from ag_accept.services.debug_service import DebugService
 from ag_accept.services.config_service import ConfigService
+from ag_accept.services.event_service import WindowEventService
+from ag_accept.services.memory_backend import MemoryBackend
+from ag_accept.services.ui_backend import UiBackend
 
 @pytest.fixture
 def mock_window_service():
@@ -25,12 +27,19 @@ def mock_text_service():
 
 @pytest.fixture
 def mock_scheduler_service():
-    return MagicMock(spec=SchedulerService)
+    scheduler = MagicMock(spec=SchedulerService)
+    # Behave like a loop that idles until stopped
+    scheduler.run.side_effect = lambda task, stop_event, wait=None: stop_event.wait()
+    return scheduler
 
 @pytest.fixture
 def mock_debug_service():
     return MagicMock(spec=DebugService)
 
+@pytest.fixture
+def mock_event_service():
+    return MagicMock(spec=WindowEventService)
+
 @pytest.fixture
 def mock_config_service(tmp_path):
     # Create a real but temporary config service, or mock it?
@@ -41,10 +50,11 @@ def mock_config_service(tmp_path):
     service.config_path = os.path.join(str(tmp_path), "test_config.json")
     # Reset config to defaults
     service.config = service.default_config.copy()
+    service.config["journal_dir"] = os.path.join(str(tmp_path), "journal")
     return service
 
 @pytest.fixture
-def injector(mock_window_service, mock_text_service, mock_scheduler_service, mock_debug_service, mock_config_service):
+def injector(mock_window_service, mock_text_service, mock_scheduler_service, mock_debug_service, mock_config_service, mock_event_service):
     # Custom injector that binds mocks
     def configure_mocks(binder):
         binder.bind(WindowService, to=mock_window_service)
@@ -52,5 +62,7 @@ def injector(mock_window_service, mock_text_service, mock_scheduler_service, moc
         binder.bind(SchedulerService, to=mock_scheduler_service)
         binder.bind(DebugService, to=mock_debug_service)
         binder.bind(ConfigService, to=mock_config_service)
+        binder.bind(WindowEventService, to=mock_event_service)
+        binder.bind(UiBackend, to=MemoryBackend())
         
     return Injector([configure_mocks])
@@ -0,0 +1,129 @@
+from typing import Any, List, Optional
+from unittest.mock import MagicMock
+
+from ag_accept.services.memory_backend import MemoryBackend
+from ag_accept.services.tree_scanner import NodeInfo
+from ag_accept.services.window_service import WindowRegistry, WindowService
+
+
+class FakeRect:
+    def __init__(self, left: int, top: int, right: int, bottom: int):
+        self.left, self.top, self.right, self.bottom = left, top, right, bottom
+
+
+class FakeControl:
+    """
+    Minimal stand-in for a uiautomation Control, used to build fake window trees.
+    Counts property reads so tests can reason about scan cost.
+    """
+    reads = 0
+    fetches = 0
+    next_runtime_id = 1
+
+    def __init__(self, name: str = "", control_type: str = "PaneControl", children: Optional[List["FakeControl"]] = None,
+                 automation_id: str = "", is_offscreen: bool = False):
+        self._name = name
+        self._control_type = control_type
+        self._children = children or []
+        self.AutomationId = automation_id
+        self.IsOffscreen = is_offscreen
+        self.BoundingRectangle = FakeRect(0, 0, 800, 600)
+        self.invoked = 0
+        self.runtime_id = (42, FakeControl.next_runtime_id)
+        FakeControl.next_runtime_id += 1
+
+    @property
+    def Name(self) -> str:
+        FakeControl.reads += 1
+        return self._name
+
+    @property
+    def ControlTypeName(self) -> str:
+        FakeControl.reads += 1
+        return self._control_type
+
+    def GetChildren(self) -> List["FakeControl"]:
+        FakeControl.reads += 1
+        return list(self._children)
+
+    def GetRuntimeId(self) -> List[int]:
+        FakeControl.reads += 1
+        return list(self.runtime_id)
+
+    def Invoke(self) -> None:
+        self.invoked += 1
+
+
+def button(name: str, **kwargs: Any) -> FakeControl:
+    return FakeControl(name, "ButtonControl", **kwargs)
+
+
+def text(name: str) -> FakeControl:
+    return FakeControl(name, "TextControl")
+
+
+def prompt_window(title: str = "Antigravity", context: str = "Run command?", accept: str = "Accept", filler: int = 3) -> FakeControl:
+    """
+    Builds a small window tree with some filler panes and a prompt dialog at the end.
+    """
+    panes = [FakeControl(f"Pane {i}", children=[text(f"Line {i}")]) for i in range(filler)]
+    dialog = FakeControl("", "GroupControl", children=[text(context), button("Reject"), button(accept)])
+    return FakeControl(title, "WindowControl", children=panes + [dialog])
+
+
+def fake_prefetch(root: FakeControl, max_depth: int = 25) -> NodeInfo:
+    """
+    Bulk prefetch for fake trees: one counted fetch, no per-property reads.
+    """
+    FakeControl.fetches += 1
+
+    def to_node(control: FakeControl, depth: int) -> NodeInfo:
+        node = NodeInfo(control._name, control._control_type, control.AutomationId, control.IsOffscreen, control=control)
+        if depth < max_depth:
+            node.children = [to_node(c, depth + 1) for c in control._children]
+        return node
+
+    return to_node(root, 0)
+
+
+def fake_list_windows(root: FakeControl) -> list:
+    """
+    Top-level listing for fake desktops, like one cached UIA query: no counted reads.
+    """
+    return [(tuple(w.runtime_id), w._name, (lambda w: lambda: w)(w)) for w in root._children]
+
+
+class FakeDesktopBackend(MemoryBackend):
+    """
+    Memory backend whose top-level windows are the fake 'windows' (a list that tests may mutate),
+    so an action executor can look them up again by key.
+    """
+
+    def __init__(self, windows: List[FakeControl]):
+        super().__init__()
+        self.windows = windows
+
+    def list_top_level(self, root: Any) -> list:
+        return [(tuple(w.runtime_id), w._name, (lambda w: lambda: w)(w)) for w in self.windows]
+
+
+def registry_window_service(windows: List[FakeControl]) -> MagicMock:
+    """
+    Mocked WindowService whose window listing goes through a real WindowRegistry over 'windows'.
+    The list can be mutated between ticks to simulate windows opening and closing.
+    """
+    desktop = FakeControl("Desktop", children=windows)
+    desktop._children = windows
+    registry = WindowRegistry(lambda: desktop, lister=fake_list_windows)
+    service = MagicMock(spec=WindowService)
+    service.registry = registry
+
+    def refresh_windows(exclude_titles=[]):
+        registry.set_exclusions(exclude_titles)
+        return registry.refresh()
+
+    service.refresh_windows.side_effect = refresh_windows
+    service.find_windows.side_effect = registry.find
+    service.find_windows_matching.side_effect = lambda title_parts: WindowService.find_windows_matching(service, title_parts)
+    service.is_excluded.return_value = False
+    return service
@@ -0,0 +1,84 @@
+from unittest.mock import MagicMock
+
+from ag_accept.automation import act_on_scan, process_window, TICK_ACCEPTED, TICK_ACTIVE
+from ag_accept.services.action_cache import ActionCache
+from ag_accept.services.memory_backend import MemoryBackend, MemoryControl, build_prompt_dialog
+from ag_accept.services.metrics_service import MetricsRegistry, COUNTER_DUPLICATES_SUPPRESSED
+from ag_accept.services.text_query_service import TextQueryService
+from ag_accept.services.tree_scanner import WalkerTreeScanner
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entries_expire_after_ttl_and_lru_is_bounded():
+    clock = FakeClock()
+    cache = ActionCache(ttl=5.0, max_entries=2, clock=clock)
+    cache.remember("a")
+    cache.remember("b")
+    assert cache.is_recent("a")  # refreshes "a", so "b" is now the oldest
+    cache.remember("c")
+    assert not cache.is_recent("b") and len(cache) == 2
+
+    clock.now += 5.0
+    assert not cache.is_recent("a") and len(cache) == 1
+
+
+def test_from_config_keeps_previous_cache_with_same_settings():
+    cache = ActionCache.from_config({})
+    cache.remember("a")
+    assert ActionCache.from_config({"action_cooldown": 5.0}, cache) is cache
+    assert ActionCache.from_config({"action_cooldown": 2.0}, cache) is not cache
+    assert ActionCache.from_config({"action_cooldown": 0}) is None
+
+
+def make_window(backend):
+    window = MemoryControl(backend, "Antigravity", "WindowControl", native_handle=backend.next_handle())
+    # The prompt stays up after Accept, like an app that is slow to close it
+    window.add(build_prompt_dialog(backend, dismiss_on_accept=False))
+    backend.root.add(window)
+    return window, next(c for c in window.walk() if c._name == "Accept")
+
+
+def test_repeat_press_is_suppressed_within_cooldown():
+    backend = MemoryBackend()
+    window, accept = make_window(backend)
+    service = TextQueryService(WalkerTreeScanner(), backend=backend)
+    window_service = MagicMock()
+    metrics = MetricsRegistry()
+    clock = FakeClock()
+    cache = ActionCache(ttl=5.0, clock=clock)
+
+    def tick():
+        return process_window(window, service, window_service, lambda msg: None, None, ["Run command?"], ["Accept"],
+                              backend=backend, metrics=metrics, action_cache=cache)
+
+    assert tick() == TICK_ACCEPTED
+    assert tick() == TICK_ACTIVE
+    assert accept.invoked == 1
+    assert metrics.snapshot().totals[COUNTER_DUPLICATES_SUPPRESSED] == 1
+
+    clock.now += 5.0
+    assert tick() == TICK_ACCEPTED
+    assert accept.invoked == 2
+
+
+def test_entry_is_dropped_once_the_button_is_gone():
+    backend = MemoryBackend()
+    window, accept = make_window(backend)
+    service = TextQueryService(WalkerTreeScanner(), backend=backend)
+    cache = ActionCache(ttl=5.0, clock=FakeClock())
+    key = cache.key(window, accept)
+    cache.remember(key)
+
+    scan = service.scan_window(window, ["Run command?"], ["Accept"])
+    accept.remove()
+    outcome = act_on_scan(window, scan, MagicMock(), lambda msg: None, None, backend, action_cache=cache)
+
+    assert outcome == TICK_ACTIVE and accept.invoked == 0
+    assert not cache.is_recent(key)
@@ -0,0 +1,182 @@
+import threading
+import time
+from unittest.mock import MagicMock
+
+from ag_accept.automation import perform_action, process_window, TICK_ACCEPTED, TICK_ACTIVE
+from ag_accept.services.action_cache import ActionCache
+from ag_accept.services.action_executor import ActionExecutor, ActionRequest
+from ag_accept.services.memory_backend import MemoryBackend, MemoryControl, build_prompt_dialog, generate_window
+from ag_accept.services.metrics_service import MetricsRegistry, COUNTER_ACCEPTS, COUNTER_ACTIONS_DROPPED, COUNTER_ACTIONS_TIMED_OUT, COUNTER_DUPLICATES_SUPPRESSED
+from ag_accept.services.text_query_service import TextQueryService
+from ag_accept.services.tree_scanner import WalkerTreeScanner
+from ag_accept.services.window_service import WindowService
+from ag_accept.services.ui_backend import window_key
+
+
+def request(key):
+    return ActionRequest(None, key, str(key))
+
+
+def test_hung_action_times_out_and_the_next_one_still_runs():
+    release = threading.Event()
+    done = []
+
+    def perform(req):
+        if req.key == "hung":
+            release.wait(5)
+        done.append(req.key)
+
+    metrics = MetricsRegistry()
+    executor = ActionExecutor(perform, MemoryBackend(), timeout=0.2, metrics=metrics)
+    executor.start()
+    assert executor.submit(request("hung"))
+    assert executor.submit(request("next"))
+
+    deadline = time.monotonic() + 3
+    while "next" not in done and time.monotonic() < deadline:
+        time.sleep(0.01)
+    release.set()
+    executor.stop()
+
+    assert "next" in done
+    assert executor.timed_out == 1
+    assert metrics.snapshot().totals[COUNTER_ACTIONS_TIMED_OUT] == 1
+
+
+def test_duplicate_and_overflowing_requests_are_refused():
+    metrics = MetricsRegistry()
+    executor = ActionExecutor(lambda req: None, MemoryBackend(), queue_size=2, metrics=metrics)  # not started: nothing is taken off the queue
+
+    assert executor.submit(request("a"))
+    assert not executor.submit(request("a"))
+    assert executor.submit(request("b"))
+    assert not executor.submit(request("c"))
+
+    assert executor.is_pending("a") and not executor.is_pending("c")
+    assert metrics.snapshot().totals[COUNTER_ACTIONS_DROPPED] == 1
+
+
+def test_stale_requests_are_dropped():
+    done = []
+    executor = ActionExecutor(lambda req: done.append(req.key), MemoryBackend(), timeout=1.0)  # stale after 2 s
+    executor.start()
+    executor.submit(ActionRequest(None, "old", "old", created_at=time.monotonic() - 10))
+    executor.submit(request("new"))
+    executor.stop()
+
+    assert done == ["new"] and executor.dropped == 1
+
+
+def test_queued_action_finds_the_button_again_and_presses_it():
+    backend = MemoryBackend()
+    window = generate_window(backend, max_nodes=300)
+    backend.root.add(window)
+    accept = next(c for c in window.walk() if c._name == "Accept")
+    text_service = TextQueryService(WalkerTreeScanner(), backend=backend)
+    window_service = MagicMock()
+    metrics = MetricsRegistry()
+    executor = ActionExecutor(lambda req: perform_action(req, text_service, window_service, lambda msg: None, None, backend, metrics), backend)
+
+    # Not started yet, so the scan is long gone by the time the action runs
+    outcome = process_window(window, text_service, window_service, lambda msg: None, None, ["Run command?"], ["Accept"],
+                             backend=backend, metrics=metrics, executor=executor)
+    assert outcome == TICK_ACCEPTED and accept.invoked == 0
+
+    executor.start()
+    executor.stop()
+    assert accept.invoked == 1
+    assert metrics.snapshot().totals[COUNTER_ACCEPTS] == 1
+
+
+def test_button_in_cooldown_is_not_queued_again():
+    backend = MemoryBackend()
+    window = MemoryControl(backend, "Antigravity", "WindowControl", native_handle=backend.next_handle())
+    # The prompt stays up after Accept, like an app that is slow to close it
+    window.add(build_prompt_dialog(backend, dismiss_on_accept=False))
+    backend.root.add(window)
+    accept = next(c for c in window.walk() if c._name == "Accept")
+    text_service = TextQueryService(WalkerTreeScanner(), backend=backend)
+    metrics = MetricsRegistry()
+    cache = ActionCache(ttl=60.0)
+    executor = ActionExecutor(lambda req: perform_action(req, text_service, MagicMock(), lambda msg: None, None, backend, metrics, action_cache=cache), backend)
+    executor.start()
+
+    def tick():
+        return process_window(window, text_service, MagicMock(), lambda msg: None, None, ["Run command?"], ["Accept"],
+                              backend=backend, metrics=metrics, action_cache=cache, executor=executor)
+
+    assert tick() == TICK_ACCEPTED
+    executor.stop()
+    assert tick() == TICK_ACTIVE
+    assert executor.completed == 1 and accept.invoked == 1
+    assert metrics.snapshot().totals[COUNTER_DUPLICATES_SUPPRESSED] == 1
+
+
+class HangingBackend(MemoryBackend):
+    """Invoke blocks on the first window's button until released."""
+
+    def __init__(self):
+        super().__init__()
+        self.hung_window = None
+        self.release = threading.Event()
+        self.hanging = threading.Event()
+
+    def invoke(self, control):
+        if self.hung_window is not None and control in list(self.hung_window.walk()):
+            self.hanging.set()
+            self.release.wait(5)
+        super().invoke(control)
+
+
+def test_overlapping_workers_each_restore_their_own_focus():
+    backend = HangingBackend()
+    first, second = generate_window(backend, "Antigravity A", max_nodes=100), generate_window(backend, "Antigravity B", max_nodes=100, seed=3)
+    user = MemoryControl(backend, "Editor", "WindowControl", native_handle=backend.next_handle())
+    backend.root.add(first, second, user)
+    backend.hung_window = first
+    backend.focused = user
+    second_accept = next(c for c in second.walk() if c._name == "Accept")
+    text_service = TextQueryService(WalkerTreeScanner(), backend=backend)
+    window_service = WindowService(WalkerTreeScanner(), backend=backend)
+    executor = ActionExecutor(lambda req: perform_action(req, text_service, window_service, lambda msg: None, None, backend,
+                                                         focus_free=False), backend, timeout=0.2)
+    executor.start()
+
+    for window in (first, second):
+        key = window_key(window)
+        executor.submit(ActionRequest(key, (key, "Accept"), "Accept"))
+    assert backend.hanging.wait(2)
+    # The first action times out; a fresh worker presses the second window's button meanwhile
+    deadline = time.monotonic() + 3
+    while not second_accept.invoked and time.monotonic() < deadline:
+        time.sleep(0.01)
+    backend.release.set()
+    executor.stop()
+
+    assert executor.timed_out == 1 and second_accept.invoked == 1
+    assert backend.focused is user
+
+
+def test_perform_action_skips_a_button_that_is_gone():
+    backend = MemoryBackend()
+    window = generate_window(backend, max_nodes=300)
+    backend.root.add(window)
+    text_service = TextQueryService(WalkerTreeScanner(), backend=backend)
+    next(c for c in window.walk() if c._name == "Accept").remove()
+
+    outcome = perform_action(ActionRequest(window_key(window), "k", "Accept"), text_service, MagicMock(), lambda msg: None, None, backend)
+    assert outcome == TICK_ACTIVE
+
+    # The window itself is gone too
+    window.remove()
+    outcome = perform_action(ActionRequest(window_key(window), "k", "Accept"), text_service, MagicMock(), lambda msg: None, None, backend)
+    assert outcome == TICK_ACTIVE
+
+
+def test_window_is_looked_up_again_by_key():
+    backend = MemoryBackend()
+    window = generate_window(backend, max_nodes=50, prompt=False)
+    backend.root.add(generate_window(backend, "Other", max_nodes=50, prompt=False), window)
+
+    assert backend.window_from_key(window_key(window)) is window
+    assert backend.window_from_key(12345) is None
@@ -0,0 +1,65 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../benchmarks')))
+
+import bench_scanning
+import bench_startup
+from common import compare, gate
+
+
+def results(**cases):
+    return {"cases": cases}
+
+
+def test_compare_flags_only_slowdowns_beyond_threshold():
+    baseline = results(a={"tick_seconds": 0.100, "property_reads": 1000}, b={"tick_seconds": 0.100})
+    current = results(a={"tick_seconds": 0.120, "property_reads": 1500}, b={"tick_seconds": 0.200}, c={"tick_seconds": 9.0})
+
+    regressions = compare(current, baseline, threshold=0.25)
+
+    assert {(r.case, r.metric) for r in regressions} == {("a", "property_reads"), ("b", "tick_seconds")}
+
+
+def test_compare_ignores_sub_millisecond_noise():
+    baseline = results(a={"tick_seconds": 0.00001})
+    current = results(a={"tick_seconds": 0.0005})
+    assert compare(current, baseline) == []
+
+
+def test_gate_writes_missing_baseline_then_checks(tmp_path):
+    path = str(tmp_path / "baseline.json")
+    assert gate(results(a={"tick_seconds": 0.1}), path, 0.25) == 0
+    assert json.load(open(path))["cases"]["a"]["tick_seconds"] == 0.1
+    assert gate(results(a={"tick_seconds": 0.5}), path, 0.25) == 1
+    assert gate(results(a={"tick_seconds": 0.11}), path, 0.25) == 0
+
+
+def test_gate_on_counts_ignores_wall_time(tmp_path):
+    path = str(tmp_path / "baseline.json")
+    metrics = ["property_reads"]
+    assert gate(results(a={"tick_seconds": 0.1, "property_reads": 100}), path, 0.25, metrics=metrics) == 0
+    assert json.load(open(path))["cases"]["a"] == {"property_reads": 100}
+    assert gate(results(a={"tick_seconds": 9.0, "property_reads": 100}), path, 0.25, metrics=metrics) == 0
+    assert gate(results(a={"tick_seconds": 0.1, "property_reads": 200}), path, 0.25, metrics=metrics) == 1
+
+
+def test_small_run_covers_every_path():
+    cases = bench_scanning.run([200], [1, 3], repeat=1)
+    names = {key.split("/")[0] for key in cases}
+    assert names == {"scan_window", "has_text_recursive", "find_button_with_text", "dump_texts", "get_window_structure", "find_window_by_title"}
+    assert cases["dump_texts/200n/3w"]["child_listings"] > cases["dump_texts/200n/1w"]["child_listings"]
+    # Discovery after the first refresh is one bulk listing, no per-window reads
+    assert cases["find_window_by_title/3w"]["property_reads"] == 0
+
+
+def test_startup_headless_case():
+    cases = bench_startup.run(repeat=1, only=["headless"])
+    assert cases["headless"]["startup_seconds"] > 0
+    assert cases["headless"]["peak_rss_mb"] > 0
+
+
+def test_import_seconds_reads_importtime():
+    assert bench_startup.import_seconds("ag_accept.main") > 0
+    assert bench_startup.import_seconds("ag_accept.no_such_module") is None
@@ -0,0 +1,76 @@
+from unittest.mock import MagicMock
+
+from ag_accept.automation import process_window
+from ag_accept.services.button_location_cache import ButtonLocationCache
+from ag_accept.services.scheduler_service import TICK_ACCEPTED
+from ag_accept.services.text_query_service import TextQueryService
+from ag_accept.services.tree_scanner import WalkerTreeScanner, PrefetchTreeScanner
+from fakes import FakeControl, button, prompt_window, fake_prefetch
+
+
+def test_scan_records_button_location():
+    window = prompt_window(filler=3)
+
+    for scanner in (WalkerTreeScanner(), PrefetchTreeScanner(prefetch=fake_prefetch)):
+        location = scanner.scan(window, ["Run command?"], ["Accept"]).button_location
+        assert location.path == (3, 2)
+        assert location.ancestors == ("",)
+
+
+def test_probe_hits_remembered_location():
+    window = prompt_window()
+    cache = ButtonLocationCache()
+    result = WalkerTreeScanner().scan(window, [], ["Accept"])
+    cache.remember(window, result.button_location)
+
+    found = cache.probe(window, ["Accept"])
+
+    assert found == (result.button, "Accept")
+    assert cache.hits == 1
+
+
+def test_probe_misses_when_tree_moved():
+    window = prompt_window()
+    cache = ButtonLocationCache()
+    cache.remember(window, WalkerTreeScanner().scan(window, [], ["Accept"]).button_location)
+
+    # A new pane shifts the dialog to another index
+    window._children.insert(0, FakeControl("Banner"))
+
+    assert cache.probe(window, ["Accept"]) is None
+    assert cache.misses == 1
+
+
+def test_probe_checks_automation_id():
+    window = FakeControl("Antigravity", children=[button("Accept", automation_id="a1")])
+    cache = ButtonLocationCache()
+    cache.remember(window, WalkerTreeScanner().scan(window, [], ["Accept"]).button_location)
+
+    window._children[0] = button("Accept", automation_id="other")
+
+    assert cache.probe(window, ["Accept"]) is None
+
+
+def test_process_window_uses_probe_before_full_scan():
+    window = prompt_window(filler=30)
+    cache = ButtonLocationCache()
+    text_service = TextQueryService(WalkerTreeScanner())
+    args = (window, text_service, MagicMock(), lambda msg: None, None, [], ["Accept"])
+
+    assert process_window(*args, location_cache=cache) == TICK_ACCEPTED
+
+    FakeControl.reads = 0
+    assert process_window(*args, location_cache=cache) == TICK_ACCEPTED
+    assert cache.hits == 1
+    # Probe plus action, far fewer than walking 60+ filler nodes
+    assert FakeControl.reads < 20
+
+
+def test_retain_evicts_closed_windows():
+    window = prompt_window()
+    cache = ButtonLocationCache()
+    cache.remember(window, WalkerTreeScanner().scan(window, [], ["Accept"]).button_location)
+
+    cache.retain([])
+
+    assert cache.probe(window, ["Accept"]) is None
@@ -0,0 +1,43 @@
+import os
+import threading
+from unittest.mock import MagicMock
+
+from ag_accept.automation import AgentManagerStrategy
+from ag_accept.services.config_service import ConfigService
+from ag_accept.services.memory_backend import MemoryBackend, generate_window
+from ag_accept.services.scheduler_service import SchedulerService
+from ag_accept.services.text_query_service import TextQueryService
+from ag_accept.services.tree_scanner import WalkerTreeScanner
+from ag_accept.services.window_service import WindowService
+
+
+def test_new_button_texts_apply_at_next_tick_without_restart(tmp_path):
+    backend = MemoryBackend()
+    window = generate_window(backend, max_nodes=200, accept_text="Allow")
+    backend.root.add(window)
+    allow = next(c for c in window.walk() if c._name == "Allow")
+
+    config = ConfigService()
+    config.config_path = os.path.join(str(tmp_path), "config.json")
+    # Inline actions, so each tick's press is visible as soon as the tick returns
+    config.config = dict(config.default_config, async_actions=False)
+
+    strategy = AgentManagerStrategy(WindowService(WalkerTreeScanner(), backend=backend), TextQueryService(WalkerTreeScanner(), backend=backend),
+                                    MagicMock(), MagicMock(), SchedulerService(), backend)
+    invoked_per_tick = []
+    stop_event = threading.Event()
+
+    def run(task, stop, wait=None):
+        task()
+        invoked_per_tick.append(allow.invoked)
+        config.set("search_texts_agent_manager", ["Allow"])
+        task()
+        invoked_per_tick.append(allow.invoked)
+        stop_event.set()
+
+    strategy.scheduler.run = run
+    logs = []
+    strategy.run(stop_event, threading.Event(), config, logs.append)
+
+    assert invoked_per_tick == [0, 1]
+    assert any(msg.startswith("Config reloaded") for msg in logs)
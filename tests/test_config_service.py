@@ -48,3 +48,100 @@ def test_typed_accessors(tmp_path):
     
     service.interval = 10.0
     assert service.get("interval") == 10.0
+
+
+def make_service(tmp_path):
+    service = ConfigService()
+    service.config_path = os.path.join(str(tmp_path), "config.json")
+    service.config = service.default_config.copy()
+    return service
+
+
+def test_snapshot_is_validated_and_immutable(tmp_path):
+    service = make_service(tmp_path)
+    service.config = {**service.default_config, "interval": "2", "scan_order": "random", "search_texts_agent_manager": ["Allow "]}
+
+    snapshot = service.snapshot()
+    assert snapshot.interval == 2.0
+    assert snapshot.get("scan_order") == "dfs"
+    assert any(error.startswith("scan_order") for error in snapshot.errors)
+    assert snapshot.search_matcher.patterns == ["Allow"]
+    with pytest.raises(Exception):
+        snapshot.values["interval"] = 3.0
+
+
+def test_non_string_texts_are_dropped(tmp_path):
+    service = make_service(tmp_path)
+    service.config = {**service.default_config, "search_texts_agent_manager": ["Allow", 3, None, {"a": 1}],
+                      "context_text_agent_manager": [["Run command?"]]}
+
+    snapshot = service.snapshot()
+    assert snapshot.get("search_texts_agent_manager") == ("Allow",)
+    assert snapshot.search_matcher.patterns == ["Allow"]
+    assert snapshot.get("context_text_agent_manager") == ()
+    assert sum(error.startswith("search_texts_agent_manager[") for error in snapshot.errors) == 3
+
+
+def test_set_publishes_new_snapshot_without_saving(tmp_path):
+    service = make_service(tmp_path)
+    service.save()
+    before = service.snapshot()
+
+    service.set("interval", 3.0)
+    service.set("interval", 4.0)
+
+    after = service.snapshot()
+    assert after.version > before.version and after.interval == 4.0
+    assert before.interval == 1.0
+    with open(service.config_path) as f:
+        assert json.load(f)["interval"] == 1.0
+    service.save()
+    with open(service.config_path) as f:
+        assert json.load(f)["interval"] == 4.0
+    assert not os.path.exists(service.config_path + ".tmp")
+
+
+def test_external_edit_is_picked_up(tmp_path):
+    service = make_service(tmp_path)
+    service.save()
+    assert not service.check_for_changes()
+
+    with open(service.config_path, "w") as f:
+        json.dump({"target_window_title": "Cursor"}, f)
+    os.utime(service.config_path, (0, 0))
+
+    assert service.check_for_changes()
+    assert service.snapshot().target_window_title == "Cursor"
+
+
+def test_invalid_edit_keeps_last_good_config(tmp_path):
+    service = make_service(tmp_path)
+    with open(service.config_path, "w") as f:
+        json.dump({"target_window_title": "Cursor"}, f)
+    os.utime(service.config_path, (0, 0))
+    assert service.check_for_changes()
+
+    with open(service.config_path, "w") as f:
+        f.write('{"target_window_title": "Cur')
+    os.utime(service.config_path, (10, 10))
+    before = service.snapshot()
+
+    service.check_for_changes()
+    assert service.snapshot() is before
+    assert before.target_window_title == "Cursor"
+    # The broken file is not retried until it changes again
+    assert not service.check_for_changes()
+
+
+def test_runtime_override_is_not_saved(tmp_path):
+    service = make_service(tmp_path)
+    service.set("interval", 2.0)
+    service.set("interval", 0.5, persist=False)
+
+    assert service.get("interval") == 0.5 and service.snapshot().interval == 0.5
+    service.save()
+    with open(service.config_path) as f:
+        assert json.load(f)["interval"] == 2.0
+    # Still applies after config.json is reloaded
+    service.reload()
+    assert service.snapshot().interval == 0.5
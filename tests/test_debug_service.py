@@ -0,0 +1,69 @@
+import gzip
+import os
+
+from ag_accept.services.debug_service import DebugService
+from ag_accept.services.memory_backend import MemoryBackend, generate_window
+
+
+def make_service(tmp_path, **config):
+    service = DebugService()
+    service.configure_from({"snapshot_dir": str(tmp_path), **config})
+    return service
+
+
+def capture(service, *args, **kwargs):
+    path = service.capture_snapshot(*args, **kwargs)
+    service.capture_thread.join()
+    return path
+
+
+def test_snapshot_streams_structure_and_text_in_one_walk(tmp_path):
+    backend = MemoryBackend()
+    window = generate_window(backend, max_nodes=200)
+    backend.root.add(window)
+    service = make_service(tmp_path)
+    backend.reset_stats()
+
+    path = capture(service, "HEADER", window, backend)
+
+    content = open(path, encoding="utf-8").read()
+    assert content.startswith("HEADER\n\nTARGET STRUCTURE:\n- [WindowControl] 'Antigravity'")
+    assert "TEXT DUMP:\n" in content and "Run command? [TextControl]" in content
+    assert backend.stats["children"] == sum(1 for _ in window.walk())
+    assert service.last_path == path
+
+
+def test_node_cap_and_compression(tmp_path):
+    backend = MemoryBackend()
+    window = generate_window(backend, max_nodes=500)
+    backend.root.add(window)
+    service = make_service(tmp_path, snapshot_max_nodes=50, snapshot_compress=True)
+
+    path = capture(service, "HEADER", window, backend)
+
+    assert path.endswith(".txt.gz")
+    lines = gzip.open(path, "rt", encoding="utf-8").read().split("TEXT DUMP:")[0].splitlines()
+    assert sum(1 for line in lines if line.lstrip().startswith("- [")) == 50
+    assert "... stopped after 50 nodes" in lines
+
+
+def test_retention_keeps_newest(tmp_path):
+    service = make_service(tmp_path, snapshot_keep=2)
+    paths = [capture(service, f"snapshot {i}", backend=MemoryBackend()) for i in range(4)]
+    assert sorted(os.listdir(str(tmp_path))) == sorted(os.path.basename(p) for p in paths[-2:])
+
+
+def test_window_that_is_gone_is_noted(tmp_path):
+    backend = MemoryBackend()
+    window = generate_window(backend, max_nodes=50)
+    service = make_service(tmp_path)
+
+    # Not a top-level window (any more): nothing to walk
+    path = capture(service, "HEADER", window, backend)
+    assert "<Window is gone>" in open(path, encoding="utf-8").read()
+
+
+def test_clearing_snapshot_dir_restores_default(tmp_path):
+    service = make_service(tmp_path)
+    service.configure_from({"snapshot_dir": ""})
+    assert service.snapshot_dir == DebugService().snapshot_dir != str(tmp_path)
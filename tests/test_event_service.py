@@ -0,0 +1,80 @@
+import threading
+import time
+from unittest.mock import MagicMock
+
+from ag_accept.automation import IdeStrategy
+from ag_accept.services.event_service import (
+    WindowEventService, InProcessEventSource, EVENT_WINDOW_OPENED, EVENT_STRUCTURE_CHANGED
+)
+from ag_accept.services.scheduler_service import SchedulerService
+from ag_accept.services.text_query_service import TextQueryService
+from ag_accept.services.tree_scanner import WalkerTreeScanner
+from fakes import FakeControl, FakeDesktopBackend, prompt_window, registry_window_service
+
+
+def make_service():
+    source = InProcessEventSource()
+    service = WindowEventService(source=source, debounce=0)
+    service.start()
+    return service, source
+
+
+def test_events_are_coalesced_per_window():
+    service, source = make_service()
+    window = FakeControl("Antigravity")
+    other = FakeControl("Other")
+
+    source.emit(EVENT_WINDOW_OPENED, window)
+    source.emit(EVENT_STRUCTURE_CHANGED, window)
+    source.emit(EVENT_STRUCTURE_CHANGED, other)
+
+    windows = service.wait_for_windows(1.0, threading.Event())
+    assert windows == [window, other]
+
+
+def test_timeout_requests_safety_poll():
+    service, _ = make_service()
+    assert service.wait_for_windows(0.01, threading.Event()) is None
+
+
+def test_stop_event_ends_wait():
+    service, _ = make_service()
+    stop_event = threading.Event()
+    stop_event.set()
+    assert service.wait_for_windows(5.0, stop_event) == []
+
+
+def test_events_after_stop_are_ignored():
+    service, source = make_service()
+    service.stop()
+    source.emit(EVENT_WINDOW_OPENED, FakeControl("Antigravity"))
+    assert service.wait_for_windows(0.01, threading.Event()) is None
+
+
+def test_ide_strategy_scans_only_notified_windows():
+    service, source = make_service()
+    window_service = registry_window_service([])
+    desktop = []
+    strategy = IdeStrategy(window_service, TextQueryService(WalkerTreeScanner()), MagicMock(), service, SchedulerService(), FakeDesktopBackend(desktop))
+
+    # No post-accept burst, so any extra full scan would come from polling
+    config = {"detection_mode": "event", "safety_poll_interval": 60.0, "burst_intervals": []}
+    stop_event = threading.Event()
+    thread = threading.Thread(target=strategy.run, args=(stop_event, threading.Event(), config, lambda msg: None))
+    thread.start()
+    try:
+        # Initial full scan found nothing; now a prompt shows up
+        window = prompt_window()
+        desktop.append(window)
+        accept = window._children[-1]._children[-1]
+        deadline = time.monotonic() + 2.0
+        while not accept.invoked and time.monotonic() < deadline:
+            source.emit(EVENT_WINDOW_OPENED, window)
+            time.sleep(0.02)
+        assert accept.invoked
+        # Only the initial safety scan enumerated windows
+        assert window_service.refresh_windows.call_count == 1
+    finally:
+        stop_event.set()
+        thread.join(2.0)
+    assert not thread.is_alive()
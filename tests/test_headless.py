@@ -0,0 +1,39 @@
+import os
+import subprocess
+import sys
+import threading
+
+from ag_accept.headless import run_headless
+from ag_accept.main import parse_args
+from ag_accept.services.config_service import ConfigService
+
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), '../src'))
+
+
+def test_headless_runs_until_stopped(injector, tmp_path):
+    log_file = str(tmp_path / "ag-accept.log")
+    stop = threading.Event()
+    threading.Timer(0.2, stop.set).start()
+
+    assert run_headless("AgentManager", 0.5, log_file, injector=injector, stop=stop) == 0
+
+    lines = open(log_file, encoding="utf-8").read().splitlines()
+    assert "Started headless (Mode: AgentManager, Interval: 0.5s)" in lines[1]
+    assert lines[-1].endswith("Stopped.")
+    # The --interval override stays out of the values written back to config.json
+    assert injector.get(ConfigService).config["interval"] != 0.5
+
+
+def test_headless_entry_point_loads_no_gui_modules():
+    code = (
+        "import sys; import ag_accept.main, ag_accept.headless; "
+        "print(sorted({'tkinter', 'customtkinter', 'matplotlib'} & set(sys.modules)))"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                         env={**os.environ, "PYTHONPATH": SRC}, check=True).stdout
+    assert out.strip() == "[]"
+
+
+def test_parse_args():
+    args = parse_args(["--headless", "--mode", "IDE", "--log-file", "out.log"])
+    assert args.headless and args.mode == "IDE" and args.log_file == "out.log"
@@ -0,0 +1,62 @@
+import os
+
+from ag_accept.automation import process_window
+from ag_accept.services.journal_service import Journal, read_journal, rotated_files, EVENT_ACTION, EVENT_MATCH
+from ag_accept.services.memory_backend import MemoryBackend, generate_window
+from ag_accept.services.text_query_service import TextQueryService
+from ag_accept.services.tree_scanner import WalkerTreeScanner
+from ag_accept.services.window_service import WindowService
+
+
+def test_records_round_trip(tmp_path):
+    journal = Journal(str(tmp_path))
+    journal.start()
+    journal.record("tick", strategy="IDE", outcome="idle", seconds=0.01)
+    journal.record("action", window="Antigravity", method="Invoke", success=True)
+    journal.close()
+
+    records = list(read_journal(str(tmp_path)))
+    assert [r["kind"] for r in records] == ["tick", "action"]
+    assert records[1]["method"] == "Invoke"
+    assert all("ts" in r for r in records)
+
+
+def test_rotates_by_size_compresses_and_keeps_newest(tmp_path):
+    journal = Journal(str(tmp_path), max_bytes=200, compress=True, keep=2)
+    journal.start()
+    for i in range(40):
+        journal.record("tick", n=i, padding="x" * 40)
+    journal.close()
+
+    rotated = rotated_files(str(tmp_path))
+    assert len(rotated) == 2
+    assert all(path.endswith(".jsonl.gz") for path in rotated)
+    numbers = [r["n"] for r in read_journal(str(tmp_path))]
+    # Older rotations were pruned, but what is left is in order and ends with the last record
+    assert numbers == sorted(numbers) and numbers[-1] == 39
+
+
+def test_full_queue_drops_instead_of_blocking(tmp_path):
+    journal = Journal(str(tmp_path), queue_size=2)
+    for i in range(5):
+        journal.record("tick", n=i)
+    assert journal.dropped == 3
+    assert not os.path.exists(journal.path)
+
+
+def test_process_window_journals_match_and_action(tmp_path):
+    backend = MemoryBackend()
+    window = generate_window(backend, max_nodes=300)
+    journal = Journal(str(tmp_path))
+    journal.start()
+
+    process_window(window, TextQueryService(WalkerTreeScanner(), backend=backend),
+                   WindowService(WalkerTreeScanner(), backend=backend), lambda msg: None, None,
+                   ["Run command?"], ["Accept"], backend=backend, journal=journal)
+    journal.close()
+
+    match, action = list(read_journal(journal.path))
+    assert match["kind"] == EVENT_MATCH and match["button"] and match["nodes"] > 0
+    assert action["kind"] == EVENT_ACTION
+    assert (action["window"], action["button"], action["method"], action["success"]) == ("Antigravity", "Accept", "Invoke", True)
+    assert not action["focused"] and [step for step, seconds in action["steps"]] == ["Invoke"]
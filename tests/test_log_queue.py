@@ -0,0 +1,53 @@
+import threading
+
+from ag_accept.services.log_queue import LogQueue
+
+
+def test_records_are_classified():
+    queue = LogQueue()
+    queue.push("Action success: Invoke")
+    queue.push("Checking window")
+    queue.push("Error: boom")
+    queue.push("Started")
+    records, dropped = queue.drain()
+    assert [(r.status, r.tag) for r in records] == [
+        ("SUCCESS", "success"), ("CHECK", "muted"), ("ERROR", "error"), ("INFO", "normal")
+    ]
+    assert dropped == 0
+
+
+def test_overflow_drops_oldest_and_counts():
+    queue = LogQueue(maxsize=3)
+    for i in range(5):
+        queue.push(f"msg {i}")
+    records, dropped = queue.drain()
+    assert [r.message for r in records] == ["msg 2", "msg 3", "msg 4"]
+    assert dropped == 2
+    assert queue.drain() == ([], 0)
+    assert queue.dropped == 2
+
+
+def test_drain_in_batches():
+    queue = LogQueue()
+    for i in range(5):
+        queue.push(f"msg {i}")
+    first, _ = queue.drain(2)
+    rest, _ = queue.drain(10)
+    assert [r.message for r in first + rest] == [f"msg {i}" for i in range(5)]
+
+
+def test_concurrent_producers():
+    queue = LogQueue(maxsize=100)
+
+    def work():
+        for i in range(1000):
+            queue.push("x")
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    records, dropped = queue.drain()
+    assert len(records) == 100
+    assert dropped == 3900
@@ -0,0 +1,85 @@
+import time
+
+import pytest
+from ag_accept.automation import process_window, TICK_ACCEPTED
+from ag_accept.services.memory_backend import MemoryBackend, generate_desktop, generate_window
+from ag_accept.services.text_query_service import TextQueryService
+from ag_accept.services.tree_scanner import PrefetchTreeScanner, WalkerTreeScanner
+from ag_accept.services.window_service import WindowService
+
+
+def count_nodes(control):
+    return sum(1 for _ in control.walk())
+
+
+def test_generator_respects_node_cap_and_injects_prompt():
+    backend = MemoryBackend()
+    window = generate_window(backend, depth=10, fan_out=6, max_nodes=500)
+    assert count_nodes(window) <= 500
+    names = [c._name for c in window.walk()]
+    assert names.count("Run command?") == 1
+    assert names.count("Accept") == 1
+
+
+def test_generator_is_deterministic_per_seed():
+    a = [c._name for c in generate_window(MemoryBackend(), seed=3).walk()]
+    b = [c._name for c in generate_window(MemoryBackend(), seed=3).walk()]
+    assert a == b
+
+
+def test_desktop_layout():
+    backend = MemoryBackend()
+    generate_desktop(backend, windows=3, nodes_per_window=200, prompt_windows=1, other_windows=2)
+    titles = [w._name for w in backend.root.children]
+    assert len([t for t in titles if t.startswith("Antigravity")]) == 3
+    assert len(titles) == 5
+
+
+@pytest.mark.parametrize("prefetch", [False, True], ids=["walker", "prefetch"])
+def test_scanners_find_prompt_in_synthetic_tree(prefetch):
+    backend = MemoryBackend()
+    window = generate_window(backend, depth=8, fan_out=5, max_nodes=2000)
+    scanner = PrefetchTreeScanner(prefetch=backend.prefetch_subtree) if prefetch else WalkerTreeScanner()
+    service = TextQueryService(scanner, backend=backend)
+
+    result = service.scan_window(window, ["Run command?"], ["Accept"])
+
+    assert result.context_matched
+    assert result.button is not None and result.button._name == "Accept"
+    if prefetch:
+        assert backend.stats["bulk"] == 1 and backend.stats["children"] == 0
+    else:
+        assert backend.stats["property"] > 0
+
+
+def test_find_button_with_text_uses_backend():
+    backend = MemoryBackend()
+    window = generate_window(backend, max_nodes=300)
+    service = TextQueryService(WalkerTreeScanner(), backend=backend)
+    assert service.find_button_with_text(window, ["Accept"])._name == "Accept"
+    assert service.find_button_with_text(window, ["Missing"]) is None
+
+
+def test_latency_is_simulated_per_call():
+    backend = MemoryBackend(latency=0.001)
+    window = generate_window(backend, max_nodes=50, prompt=False)
+    start = time.perf_counter()
+    TextQueryService(WalkerTreeScanner(), backend=backend).scan_window(window, ["Run command?"], ["Accept"])
+    assert time.perf_counter() - start >= backend.calls * 0.001
+
+
+def test_process_window_accepts_and_dialog_closes():
+    backend = MemoryBackend()
+    generate_desktop(backend, windows=2, nodes_per_window=300, prompt_windows=1)
+    window_service = WindowService(WalkerTreeScanner(), backend=backend)
+    text_service = TextQueryService(WalkerTreeScanner(), backend=backend)
+    window = window_service.find_window_by_title("project 0")
+    backend.focused = other = window_service.find_window_by_title("project 1")
+
+    outcome = process_window(window, text_service, window_service, lambda msg: None, None,
+                             ["Run command?"], ["Accept"], backend=backend)
+
+    assert outcome == TICK_ACCEPTED
+    assert not text_service.has_text_recursive(window, ["Run command?"])
+    # Invoke needed no focus, so the user's focus never moved
+    assert backend.focused is other
@@ -0,0 +1,149 @@
+import threading
+
+from ag_accept.automation import process_window
+from ag_accept.services.memory_backend import MemoryBackend, generate_window
+from ag_accept.services.metrics_service import (
+    MetricsRegistry, COUNTER_ACCEPTS, COUNTER_FAILED_INVOKE, COUNTER_FAILED_CLICK, COUNTER_NODES_VISITED,
+    COUNTER_TICKS, COUNTER_WINDOWS_SCANNED, COUNTER_FOCUS_FREE, STAGE_ACTION, STAGE_CONTEXT, STAGE_FOCUS
+)
+from ag_accept.services.text_query_service import TextQueryService
+from ag_accept.services.tree_scanner import WalkerTreeScanner
+from ag_accept.services.window_service import WindowService
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_counters_roll_out_of_the_window():
+    clock = FakeClock()
+    metrics = MetricsRegistry(slots=6, slot_seconds=10.0, clock=clock)
+    metrics.inc(COUNTER_ACCEPTS, 3)
+    clock.now = 30.0
+    metrics.inc(COUNTER_ACCEPTS)
+
+    snapshot = metrics.snapshot()
+    assert snapshot.totals[COUNTER_ACCEPTS] == 4
+    assert snapshot.recent[COUNTER_ACCEPTS] == 4
+
+    clock.now = 65.0
+    snapshot = metrics.snapshot()
+    assert snapshot.totals[COUNTER_ACCEPTS] == 4
+    assert snapshot.recent[COUNTER_ACCEPTS] == 1
+    assert snapshot.accepts_per_minute == 1 * 60.0 / snapshot.window_seconds
+
+
+def test_slots_are_reused_not_grown():
+    clock = FakeClock()
+    metrics = MetricsRegistry(slots=4, slot_seconds=1.0, clock=clock)
+    for second in range(100):
+        clock.now = float(second)
+        metrics.inc(COUNTER_TICKS)
+    shard = metrics._shards[0]
+    assert len(shard.slot_counts) == 4
+    assert metrics.snapshot().recent[COUNTER_TICKS] == 4
+
+
+def test_latency_percentiles():
+    metrics = MetricsRegistry()
+    for _ in range(90):
+        metrics.observe(STAGE_CONTEXT, 0.004)
+    for _ in range(10):
+        metrics.observe(STAGE_CONTEXT, 0.3)
+
+    latency = metrics.snapshot().latency[STAGE_CONTEXT]
+    assert latency.count == 100
+    assert latency.p50 == 0.005
+    assert latency.p95 == 0.5
+
+
+def test_concurrent_writers_do_not_lose_updates():
+    metrics = MetricsRegistry()
+
+    def work():
+        for _ in range(10000):
+            metrics.inc(COUNTER_NODES_VISITED)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert metrics.snapshot().totals[COUNTER_NODES_VISITED] == 40000
+
+
+def test_shards_of_ended_threads_are_reused():
+    metrics = MetricsRegistry()
+    for _ in range(500):
+        thread = threading.Thread(target=metrics.inc, args=(COUNTER_TICKS,))
+        thread.start()
+        thread.join()
+    metrics.inc(COUNTER_TICKS)
+
+    assert len(metrics._shards) <= 3
+    assert metrics.snapshot().totals[COUNTER_TICKS] == 501
+
+
+def test_reset_starts_from_zero():
+    metrics = MetricsRegistry()
+    metrics.inc(COUNTER_TICKS)
+    metrics.reset()
+    metrics.inc(COUNTER_TICKS)
+    assert metrics.snapshot().totals[COUNTER_TICKS] == 1
+
+
+def run_process_window(window, backend, metrics):
+    window_service = WindowService(WalkerTreeScanner(), backend=backend)
+    text_service = TextQueryService(WalkerTreeScanner(), backend=backend)
+    return process_window(window, text_service, window_service, lambda msg: None, None,
+                          ["Run command?"], ["Accept"], backend=backend, metrics=metrics)
+
+
+def test_process_window_reports_scan_and_accept():
+    backend = MemoryBackend()
+    window = generate_window(backend, max_nodes=300)
+    metrics = MetricsRegistry()
+
+    run_process_window(window, backend, metrics)
+
+    snapshot = metrics.snapshot()
+    assert snapshot.totals[COUNTER_WINDOWS_SCANNED] == 1
+    assert snapshot.totals[COUNTER_NODES_VISITED] > 0
+    assert snapshot.totals[COUNTER_ACCEPTS] == 1
+    assert snapshot.latency[STAGE_CONTEXT].count == 1
+    assert snapshot.latency[STAGE_ACTION].count == 1
+    assert snapshot.failures == {"Invoke": 0, "Click": 0, "SendKeys": 0}
+
+
+def test_fallback_failures_are_counted_by_kind():
+    backend = MemoryBackend()
+    window = generate_window(backend, max_nodes=300)
+    accept = next(c for c in window.walk() if c._name == "Accept")
+    accept.supports_invoke = False
+    metrics = MetricsRegistry()
+
+    run_process_window(window, backend, metrics)
+
+    snapshot = metrics.snapshot()
+    assert snapshot.totals[COUNTER_FAILED_INVOKE] == 1
+    assert snapshot.totals[COUNTER_FAILED_CLICK] == 0
+    assert accept.clicked == 1
+    assert snapshot.totals[COUNTER_ACCEPTS] == 1
+
+
+def test_focus_is_only_taken_when_invoke_fails():
+    backend = MemoryBackend()
+    metrics = MetricsRegistry()
+    run_process_window(generate_window(backend, max_nodes=300), backend, metrics)
+    assert metrics.snapshot().totals[COUNTER_FOCUS_FREE] == 1
+    assert metrics.snapshot().latency[STAGE_FOCUS].count == 0
+
+    window = generate_window(backend, max_nodes=300)
+    next(c for c in window.walk() if c._name == "Accept").supports_invoke = False
+    run_process_window(window, backend, metrics)
+    assert metrics.snapshot().totals[COUNTER_FOCUS_FREE] == 1
+    assert metrics.snapshot().latency[STAGE_FOCUS].count == 1
@@ -0,0 +1,84 @@
+import threading
+import time
+from unittest.mock import MagicMock
+
+from ag_accept.automation import IdeStrategy
+from ag_accept.services.scheduler_service import SchedulerService
+from ag_accept.services.text_query_service import TextQueryService
+from ag_accept.services.tree_scanner import WalkerTreeScanner
+from fakes import FakeControl, FakeDesktopBackend, prompt_window, registry_window_service
+
+
+class SlowControl(FakeControl):
+    """Fake control whose child listing takes a while, like a deep cross-process window."""
+
+    def GetChildren(self):
+        time.sleep(0.01)
+        return super().GetChildren()
+
+
+def slow_window(title):
+    window = prompt_window(title=title, filler=5)
+    slow = SlowControl(title, "WindowControl", children=window._children)
+    return slow, window._children[-1]._children[-1]
+
+
+def run_one_tick(strategy, config):
+    stop_event = threading.Event()
+    strategy.scheduler.run = lambda task, stop, wait=None: (task(), stop_event.set())
+    strategy.run(stop_event, threading.Event(), config, lambda msg: None)
+
+
+class LaneBackend(FakeDesktopBackend):
+    """Records how many actions were in flight whenever one starts."""
+
+    def __init__(self, windows):
+        super().__init__(windows)
+        self.active = 0
+        self.overlaps = []
+
+    def invoke(self, control):
+        self.active += 1
+        self.overlaps.append(self.active)
+        time.sleep(0.005)
+        try:
+            super().invoke(control)
+        finally:
+            self.active -= 1
+
+
+def make_strategy(windows):
+    window_service = registry_window_service(windows)
+    backend = LaneBackend(windows)
+    strategy = IdeStrategy(window_service, TextQueryService(WalkerTreeScanner()), MagicMock(), MagicMock(), SchedulerService(), backend)
+    return strategy, backend.overlaps
+
+
+def test_parallel_mode_accepts_every_window_with_single_action_lane():
+    pairs = [slow_window(f"Antigravity {i}") for i in range(4)]
+    strategy, overlaps = make_strategy([w for w, _ in pairs])
+
+    run_one_tick(strategy, {"parallel_workers": 4})
+
+    assert all(accept.invoked == 1 for _, accept in pairs)
+    # Actions never overlapped
+    assert overlaps and max(overlaps) == 1
+    assert set(strategy.scan_latencies) == {f"Antigravity {i}" for i in range(4)}
+    assert all(seconds > 0 and nodes > 0 for seconds, nodes in strategy.scan_latencies.values())
+
+
+def test_parallel_scans_overlap():
+    pairs = [slow_window(f"Antigravity {i}") for i in range(4)]
+    sequential, _ = make_strategy([w for w, _ in pairs])
+    start = time.perf_counter()
+    # Inline actions, so only the scanning differs between the two runs
+    run_one_tick(sequential, {"parallel_workers": 1, "async_actions": False})
+    sequential_time = time.perf_counter() - start
+
+    pairs = [slow_window(f"Antigravity {i}") for i in range(4)]
+    parallel, _ = make_strategy([w for w, _ in pairs])
+    start = time.perf_counter()
+    run_one_tick(parallel, {"parallel_workers": 4, "async_actions": False})
+    parallel_time = time.perf_counter() - start
+
+    assert parallel_time < sequential_time
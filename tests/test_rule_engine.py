@@ -0,0 +1,157 @@
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+from ag_accept.automation import AgentManagerStrategy, IdeStrategy, process_window, TICK_ACCEPTED
+from ag_accept.services.config_service import ConfigSnapshot
+from ag_accept.services.memory_backend import MemoryBackend, generate_desktop, generate_window
+from ag_accept.services.rule_engine import Rule, RuleGroup, RuleSet, ACTION_KEYS
+from ag_accept.services.scheduler_service import SchedulerService
+from ag_accept.services.text_query_service import TextQueryService
+from ag_accept.services.tree_scanner import PrefetchTreeScanner, WalkerTreeScanner
+from ag_accept.services.window_service import WindowService
+
+
+def rule(name, title="Antigravity", context=("Run command?",), buttons=("Accept",), **kwargs):
+    return Rule(name, title, tuple(buttons), tuple(context), **kwargs)
+
+
+def test_rule_parsing_and_config_validation():
+    parsed = Rule.from_mapping({"title": "Cursor", "buttons": ["Run ", ""], "priority": "2"}, 0)
+    assert parsed == Rule("rule 1", "Cursor", ("Run",), priority=2)
+    with pytest.raises(ValueError):
+        Rule.from_mapping({"title": "Cursor", "buttons": []})
+    with pytest.raises(ValueError):
+        Rule.from_mapping({"title": "Cursor", "buttons": ["Run"], "action": "shout"})
+
+    snapshot = ConfigSnapshot.from_mapping({"rules": [{"title": "Cursor", "buttons": ["Run"]}, {"buttons": ["Accept"]}]})
+    assert [r.title for r in snapshot.rules.rules] == ["Cursor"]
+    assert snapshot.errors == ("rules[1]: 'title' is required",)
+    assert not ConfigSnapshot.from_mapping({}).rules
+
+
+def test_rule_set_groups_by_title_and_shares_groups():
+    rules = RuleSet([rule("a", title="Antigravity"), rule("b", title="Cursor"), rule("c", title="gravity")])
+    group = rules.for_window("Antigravity - project")
+    assert [r.name for r in group.rules] == ["a", "c"]
+    assert rules.for_window("Antigravity - other") is group
+    assert rules.for_window("Notepad") is None
+    assert rules.matches_title("Cursor - x") and not rules.matches_title("Notepad")
+
+
+def test_rule_set_shares_one_group_across_threads(monkeypatch):
+    import ag_accept.services.rule_engine as rule_engine
+
+    class SlowGroup(RuleGroup):
+        def __init__(self, *args):
+            time.sleep(0.01)  # widen the window in which a second thread could compile the same group
+            super().__init__(*args)
+
+    monkeypatch.setattr(rule_engine, "RuleGroup", SlowGroup)
+    rules = RuleSet([rule("a", title="Antigravity")])
+    start = threading.Barrier(8)
+    groups = []
+
+    def lookup(i):
+        start.wait()
+        groups.append(rules.for_window(f"Antigravity - {i}"))
+
+    threads = [threading.Thread(target=lookup, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(groups) == 8 and len({id(g) for g in groups}) == 1
+
+
+@pytest.mark.parametrize("prefetch", [False, True], ids=["walker", "prefetch"])
+def test_many_rules_cost_one_walk(prefetch):
+    backend = MemoryBackend()
+    window = generate_window(backend, max_nodes=1500)
+    scanner = PrefetchTreeScanner(prefetch=backend.prefetch_subtree) if prefetch else WalkerTreeScanner()
+    service = TextQueryService(scanner, backend=backend)
+
+    single = service.scan_window(window, ["Run command?"], ["Accept"])
+    rules = [rule(f"other {i}", context=(f"Missing {i}",), buttons=(f"Nope {i}",)) for i in range(50)]
+    group = RuleGroup(rules + [rule("accept")], {})
+    backend.reset_stats()
+    scan = service.scan_window(window, group.context_matcher, group.button_matcher, until=group.is_done)
+
+    match = group.select(scan)
+    assert match.rule.name == "accept" and match.button._name == "Accept"
+    # Equal priorities: the walk ends at the first satisfied rule, like the single-rule scan
+    assert scan.nodes_visited == single.nodes_visited
+    if prefetch:
+        assert backend.stats["bulk"] == 1
+
+
+def test_higher_priority_rule_wins_and_needs_its_context():
+    backend = MemoryBackend()
+    window = generate_window(backend, max_nodes=300)
+    service = TextQueryService(WalkerTreeScanner(), backend=backend)
+    group = RuleGroup([
+        rule("reject", buttons=("Reject",), priority=0),
+        rule("accept", priority=5),
+        rule("unrelated", context=("Missing",), buttons=("Reject",), priority=9),
+    ], {})
+
+    scan = service.scan_window(window, group.context_matcher, group.button_matcher, until=group.is_done)
+
+    assert group.select(scan).rule.name == "accept"
+
+
+def test_keys_rule_sends_its_keys_instead_of_invoking():
+    backend = MemoryBackend()
+    window = generate_window(backend, max_nodes=200)
+    accept = next(c for c in window.walk() if c._name == "Accept")
+    service = TextQueryService(WalkerTreeScanner(), backend=backend)
+    window_service = MagicMock()
+    group = RuleGroup([rule("enter", action=ACTION_KEYS, keys="{Enter}")], {})
+    logs = []
+
+    outcome = process_window(window, service, window_service, logs.append, None, [], [], backend=backend, rules=group)
+
+    assert outcome == TICK_ACCEPTED
+    assert accept.invoked == 0 and window.keys_sent == ["{Enter}"]
+    assert "Found button: 'Accept' in 'Antigravity' (rule 'enter')" in logs
+
+
+def test_ide_strategy_applies_rules_to_each_window_title():
+    backend = MemoryBackend()
+    generate_desktop(backend, windows=1, nodes_per_window=300)
+    backend.root.add(generate_window(backend, "Cursor", max_nodes=300, context_text="Allow tool?", accept_text="Allow", seed=7))
+    buttons = {w._name: next(c for c in w.walk() if c._name in ("Accept", "Allow")) for w in backend.root.children}
+    config = {"rules": [
+        {"name": "antigravity", "title": "Antigravity", "context": ["Run command?"], "buttons": ["Accept"]},
+        {"name": "cursor", "title": "Cursor", "context": ["Allow tool?"], "buttons": ["Allow"]},
+    ]}
+
+    strategy = IdeStrategy(WindowService(WalkerTreeScanner(), backend=backend), TextQueryService(WalkerTreeScanner(), backend=backend),
+                           MagicMock(), MagicMock(), SchedulerService(), backend)
+    stop_event = threading.Event()
+
+    def run(task, stop, wait=None):
+        task()
+        stop_event.set()
+
+    strategy.scheduler.run = run
+    strategy.run(stop_event, threading.Event(), config, lambda msg: None)
+
+    assert buttons["Antigravity"].invoked == 1
+    assert buttons["Cursor"].invoked == 1
+
+
+def test_agent_manager_warns_about_rules_for_other_windows():
+    strategy = AgentManagerStrategy(MagicMock(), MagicMock(), MagicMock(), MagicMock(), SchedulerService(), MemoryBackend())
+    strategy.scheduler.run = lambda task, stop, wait=None: None
+    config = {"target_window_title": "Antigravity", "rules": [
+        {"name": "project", "title": "Antigravity - project", "buttons": ["Accept"]},
+        {"name": "cursor", "title": "Cursor", "buttons": ["Allow"]},
+    ]}
+    logs = []
+
+    strategy.run(threading.Event(), threading.Event(), config, logs.append)
+
+    warnings = [msg for msg in logs if msg.startswith("Rule ")]
+    assert len(warnings) == 1 and "'cursor'" in warnings[0]
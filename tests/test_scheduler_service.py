@@ -0,0 +1,92 @@
+import random
+import threading
+
+from ag_accept.services.scheduler_service import (
+    SchedulerService, VirtualClock, TICK_IDLE, TICK_ACTIVE, TICK_ACCEPTED, combine_outcomes
+)
+
+
+def make_scheduler(**kwargs):
+    scheduler = SchedulerService(clock=VirtualClock(), rng=random.Random(0))
+    settings = dict(interval=1.0, min_interval=0.1, max_interval=8.0, backoff_factor=2.0,
+                    burst_intervals=[0.2, 0.5], jitter=0.0)
+    settings.update(kwargs)
+    scheduler.configure(**settings)
+    return scheduler
+
+
+def run_outcomes(scheduler, outcomes):
+    stop_event = threading.Event()
+    queue = list(outcomes)
+
+    def task():
+        outcome = queue.pop(0)
+        if not queue:
+            stop_event.set()
+        return outcome
+
+    scheduler.run(task, stop_event)
+    return scheduler.clock.waits
+
+
+def test_idle_backs_off_to_ceiling():
+    waits = run_outcomes(make_scheduler(), [TICK_IDLE] * 6)
+    assert waits == [1.0, 2.0, 4.0, 8.0, 8.0]
+
+
+def test_long_idle_stays_at_ceiling():
+    scheduler = make_scheduler(max_interval=5.0, backoff_factor=1.5)
+    waits = run_outcomes(scheduler, [TICK_IDLE] * 5000)
+    assert waits[-1] == 5.0
+    assert scheduler.idle_streak < 10
+
+
+def test_activity_resets_backoff():
+    waits = run_outcomes(make_scheduler(), [TICK_IDLE, TICK_IDLE, TICK_ACTIVE, TICK_IDLE, TICK_IDLE])
+    assert waits == [1.0, 2.0, 1.0, 1.0]
+
+
+def test_accept_starts_burst():
+    waits = run_outcomes(make_scheduler(), [TICK_ACCEPTED, TICK_ACTIVE, TICK_ACTIVE, TICK_ACTIVE, TICK_ACTIVE])
+    assert waits == [0.2, 0.5, 1.0, 1.0]
+
+
+def test_burst_respects_min_interval():
+    waits = run_outcomes(make_scheduler(min_interval=0.3), [TICK_ACCEPTED, TICK_ACTIVE])
+    assert waits == [0.3]
+
+
+def test_jitter_stays_within_bounds():
+    scheduler = make_scheduler(jitter=0.5, max_interval=1.2)
+    delays = [scheduler.next_delay(TICK_ACTIVE) for _ in range(200)]
+    assert min(delays) >= 0.5 - 1e-9
+    assert max(delays) <= 1.2
+    assert len(set(delays)) > 1
+
+
+def test_task_errors_do_not_stop_loop():
+    scheduler = make_scheduler()
+    stop_event = threading.Event()
+    calls = []
+
+    def task():
+        calls.append(1)
+        if len(calls) == 3:
+            stop_event.set()
+        raise RuntimeError("boom")
+
+    scheduler.run(task, stop_event)
+    assert len(calls) == 3
+
+
+def test_configure_from_config():
+    scheduler = SchedulerService(clock=VirtualClock())
+    scheduler.configure_from({"interval": 2.0, "interval_max": 3.0, "interval_jitter": 0.0})
+    assert scheduler.interval == 2.0
+    assert scheduler.max_interval == 3.0
+
+
+def test_combine_outcomes():
+    assert combine_outcomes([]) == TICK_IDLE
+    assert combine_outcomes([TICK_IDLE, TICK_ACTIVE]) == TICK_ACTIVE
+    assert combine_outcomes([TICK_ACTIVE, TICK_ACCEPTED, TICK_IDLE]) == TICK_ACCEPTED
@@ -0,0 +1,49 @@
+import threading
+
+from ag_accept.services.states import (
+    STATE_SEARCHING_WINDOW, STATE_WINDOW_FOUND, STATE_CHECKING_CONTEXT, STATE_CONTEXT_MATCHED,
+    STATE_CONTEXT_FAILED, STATE_SEARCHING_BUTTON, STATE_BUTTON_FOUND, STATE_ACTION_SUCCESS
+)
+from ag_accept.services.state_channel import StateChannel, TickSummary
+
+
+def test_keeps_latest_status_per_node():
+    channel = StateChannel()
+    for state in (STATE_SEARCHING_WINDOW, STATE_WINDOW_FOUND, STATE_CHECKING_CONTEXT, STATE_CONTEXT_MATCHED,
+                  STATE_SEARCHING_BUTTON, STATE_BUTTON_FOUND, STATE_ACTION_SUCCESS):
+        channel(state)
+
+    version, statuses, last_tick = channel.poll()
+    assert statuses == {"window": "ok", "context": "ok", "button": "ok", "action": "ok"}
+    assert last_tick is None
+    assert channel.poll(version) is None
+
+
+def test_new_tick_resets_nodes_and_summarizes_previous():
+    channel = StateChannel()
+    for state in (STATE_SEARCHING_WINDOW, STATE_WINDOW_FOUND, STATE_CHECKING_CONTEXT, STATE_CONTEXT_FAILED):
+        channel(state)
+    channel(STATE_SEARCHING_WINDOW)
+
+    _, statuses, last_tick = channel.poll()
+    assert statuses == {"window": "working", "context": "idle", "button": "idle", "action": "idle"}
+    assert last_tick == TickSummary("context", "failed")
+    assert str(last_tick) == "Context failed"
+
+
+def test_pushes_from_threads_coalesce():
+    channel = StateChannel()
+
+    def work():
+        for _ in range(1000):
+            channel(STATE_CHECKING_CONTEXT)
+            channel(STATE_CONTEXT_MATCHED)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    version, statuses, _ = channel.poll()
+    assert version == 8000
+    assert statuses["context"] == "ok"
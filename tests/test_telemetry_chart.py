@@ -0,0 +1,18 @@
+from ag_accept.telemetry_chart import AdaptiveInterval, RingBuffer
+
+
+def test_ring_buffer_keeps_newest_in_order():
+    buffer = RingBuffer(3)
+    assert buffer.values() == [] and buffer.last() is None
+    for value in range(5):
+        buffer.append(float(value))
+    assert buffer.values() == [2.0, 3.0, 4.0]
+    assert buffer.last() == 4.0
+    assert len(buffer) == 3
+    assert len(buffer.data) == 3
+
+
+def test_adaptive_interval_backs_off_while_flat():
+    interval = AdaptiveInterval(base_ms=1000, max_ms=5000)
+    assert [interval.next(False) for _ in range(4)] == [2000, 4000, 5000, 5000]
+    assert interval.next(True) == 1000
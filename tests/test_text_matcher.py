@@ -0,0 +1,59 @@
+from ag_accept.services.text_matcher import TextMatcher, TextMatch, as_matcher
+
+
+def test_search_reports_pattern():
+    matcher = TextMatcher(["Accept", "Run command?"])
+    assert matcher.search("Do you want to Run command?") == "Run command?"
+    assert matcher.search("Accept all") == "Accept"
+    assert matcher.search("Reject") is None
+
+
+def test_search_prefers_leftmost_then_longest():
+    matcher = TextMatcher(["Run", "Run command?", "command"])
+    assert matcher.search("Run command?") == "Run command?"
+
+
+def test_find_all_overlapping():
+    matcher = TextMatcher(["he", "she", "hers", "his"])
+    hits = matcher.find_all("ushers")
+    assert hits == [TextMatch("she", 1, 4), TextMatch("he", 2, 4), TextMatch("hers", 2, 6)]
+
+
+def test_matched_patterns_in_config_order():
+    matcher = TextMatcher(["Accept", "Run command?"])
+    assert matcher.matched_patterns("Run command? Accept") == ["Accept", "Run command?"]
+
+
+def test_case_insensitive():
+    matcher = TextMatcher(["Accept"], case_insensitive=True)
+    assert matcher.search("ACCEPT ALL") == "Accept"
+    assert matcher.find_all("accept") == [TextMatch("Accept", 0, 6)]
+    assert not TextMatcher(["Accept"]).matches("ACCEPT")
+
+
+def test_whole_word():
+    matcher = TextMatcher(["Accept", "Run command?"], whole_word=True)
+    assert matcher.matches("Accept")
+    assert matcher.matches("Accept all")
+    assert not matcher.matches("Accepted")
+    assert not matcher.matches("Unaccept")
+    assert matcher.matches("Run command?Yes")  # '?' edge needs no boundary
+    assert matcher.find_all("Accepted") == []
+
+
+def test_empty_patterns_are_ignored():
+    matcher = TextMatcher(["", "Accept"])
+    assert matcher.patterns == ["Accept"]
+    assert not TextMatcher([""])
+    assert TextMatcher([]).search("anything") is None
+
+
+def test_from_config():
+    matcher = TextMatcher.from_config({"match_case_insensitive": True}, ["Accept"])
+    assert matcher.case_insensitive and not matcher.whole_word
+
+
+def test_as_matcher_passes_through():
+    matcher = TextMatcher(["Accept"])
+    assert as_matcher(matcher) is matcher
+    assert as_matcher(["Accept"]).patterns == ["Accept"]
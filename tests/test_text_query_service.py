@@ -0,0 +1,201 @@
+import time
+
+import pytest
+from ag_accept.services.text_query_service import TextQueryService
+from ag_accept.services.text_matcher import TextMatcher
+from ag_accept.services.tree_scanner import (
+    BUDGET_NODES, BUDGET_TIME, ORDER_BEST_FIRST, ORDER_BREADTH_FIRST, ORDER_DEPTH_FIRST,
+    PrefetchTreeScanner, ScanBudget, WalkerTreeScanner
+)
+from fakes import FakeControl, button, text, prompt_window, fake_prefetch
+
+
+@pytest.fixture(params=["walker", "prefetch"])
+def service(request):
+    if request.param == "walker":
+        return TextQueryService(WalkerTreeScanner())
+    return TextQueryService(PrefetchTreeScanner(prefetch=fake_prefetch))
+
+
+def test_scan_finds_context_and_button(service):
+    window = prompt_window()
+
+    result = service.scan_window(window, ["Run command?"], ["Accept"])
+
+    assert result.context_matched
+    assert result.button is not None
+    assert result.button.Name == "Accept"
+    assert result.nodes_visited > 0
+    assert (result.context_pattern, result.button_pattern) == ("Run command?", "Accept")
+
+
+def test_scan_with_compiled_matchers(service):
+    window = prompt_window(context="run COMMAND?", accept="ACCEPT")
+    context = TextMatcher(["Run command?"], case_insensitive=True)
+    buttons = TextMatcher(["Accept"], case_insensitive=True)
+
+    result = service.scan_window(window, context, buttons)
+
+    assert result.context_matched
+    assert result.button.Name == "ACCEPT"
+
+
+def test_scan_context_missing(service):
+    window = prompt_window(context="Something else")
+
+    result = service.scan_window(window, ["Run command?"], ["Accept"])
+
+    assert not result.context_matched
+    # Button is still reported; the caller decides what to do without context
+    assert result.button is not None
+
+
+def test_scan_empty_context_counts_as_matched(service):
+    window = FakeControl("Antigravity", "WindowControl", children=[button("Accept")])
+
+    result = service.scan_window(window, [], ["Accept"])
+
+    assert result.context_matched
+    assert result.button is not None
+
+
+def test_scan_ignores_root_and_non_buttons(service):
+    window = FakeControl("Accept", "ButtonControl", children=[text("Accept all")])
+
+    result = service.scan_window(window, [], ["Accept"])
+
+    assert result.button is None
+
+
+def test_scan_visits_each_node_once(service):
+    window = prompt_window(context="nope")
+
+    result = service.scan_window(window, ["Run command?"], ["Missing"])
+
+    # window + 3 panes + 3 lines + dialog + 3 dialog children
+    assert result.nodes_visited == 11
+
+
+def test_scan_respects_max_depth(service):
+    window = FakeControl("root", children=[FakeControl("a", children=[button("Accept")])])
+
+    assert service.scan_window(window, [], ["Accept"], max_depth=1).button is None
+    assert service.scan_window(window, [], ["Accept"], max_depth=2).button is not None
+
+
+def test_prefetch_reads_once_then_matches_in_process():
+    window = prompt_window(filler=20)
+    scanner = PrefetchTreeScanner(prefetch=fake_prefetch)
+
+    FakeControl.reads = 0
+    FakeControl.fetches = 0
+    result = scanner.scan(window, ["Run command?"], ["Accept"])
+
+    assert FakeControl.fetches == 1
+    assert FakeControl.reads == 0
+    assert result.button.Name == "Accept"
+
+
+def test_prefetch_falls_back_to_walker_on_error():
+    def broken_prefetch(root, max_depth):
+        raise OSError("COM error")
+
+    scanner = PrefetchTreeScanner(prefetch=broken_prefetch)
+    result = scanner.scan(prompt_window(), ["Run command?"], ["Accept"])
+
+    assert result.context_matched
+    assert result.button is not None
+
+
+def test_tree_larger_than_budget_is_walked_instead_of_prefetched():
+    window = wide_window()
+    scanner = PrefetchTreeScanner(prefetch=fake_prefetch)
+    budget = ScanBudget(max_nodes=40)
+
+    FakeControl.fetches = 0
+    scanner.scan(window, ["Run command?"], ["Accept"], budget=budget)
+    result = scanner.scan(window, ["Run command?"], ["Accept"], budget=budget)
+    assert FakeControl.fetches == 1
+    assert result.partial and result.nodes_visited == 40
+
+    # A complete walk shows the tree fits again, so the next scan prefetches
+    window._children = window._children[-3:]
+    assert not scanner.scan(window, ["Missing"], ["Accept"], budget=budget).partial
+    scanner.scan(window, ["Run command?"], ["Accept"], budget=budget)
+    assert FakeControl.fetches == 2
+
+
+def test_snapshot_captures_properties():
+    window = FakeControl("Antigravity", "WindowControl", children=[button("Accept", automation_id="ok", is_offscreen=True)])
+
+    node = WalkerTreeScanner().snapshot(window)
+
+    assert node.name == "Antigravity"
+    child = node.children[0]
+    assert (child.name, child.control_type, child.automation_id, child.is_offscreen) == ("Accept", "ButtonControl", "ok", True)
+    assert child.control is window._children[0]
+
+
+def wide_window(panes=50):
+    """Many filler panes before the prompt dialog."""
+    return prompt_window(filler=panes)
+
+
+def test_node_budget_returns_partial_result(service):
+    result = service.scan_window(wide_window(), ["Run command?"], ["Accept"], budget=ScanBudget(max_nodes=10))
+    assert result.partial and result.exhausted == BUDGET_NODES
+    assert result.nodes_visited == 10
+    assert result.button is None
+    assert service.budget_exhaustions[BUDGET_NODES] == 1
+
+
+def test_budget_not_exhausted_when_tree_fits(service):
+    result = service.scan_window(prompt_window(), ["Run command?"], ["Accept"], budget=ScanBudget(max_nodes=1000, time_limit=10.0))
+    assert not result.partial
+    assert result.button is not None
+    assert service.budget_exhaustions[BUDGET_NODES] == 0
+
+
+def test_time_budget_stops_slow_walk():
+    class SlowControl(FakeControl):
+        def GetChildren(self):
+            time.sleep(0.002)
+            return super().GetChildren()
+
+    panes = [SlowControl(f"Pane {i}", children=[SlowControl(f"Line {i}")]) for i in range(200)]
+    window = SlowControl("Antigravity", "WindowControl", children=panes)
+    service = TextQueryService(WalkerTreeScanner())
+    result = service.scan_window(window, ["Run command?"], ["Accept"], budget=ScanBudget(time_limit=0.05))
+    assert result.exhausted == BUDGET_TIME
+    assert result.nodes_visited < 401
+    assert service.budget_exhaustions[BUDGET_TIME] == 1
+
+
+@pytest.mark.parametrize("order", [ORDER_DEPTH_FIRST, ORDER_BREADTH_FIRST, ORDER_BEST_FIRST])
+def test_every_order_finds_button_and_location(service, order):
+    result = service.scan_window(prompt_window(), ["Run command?"], ["Accept"], budget=ScanBudget(order=order))
+    assert result.context_matched
+    assert result.button is not None and result.button.Name == "Accept"
+    assert result.button_location.path == (3, 2)
+
+
+def test_best_first_explores_around_context_hit(service):
+    # The prompt text is shallow, its buttons sit deeper than a wide layer of filler lines
+    dialog = FakeControl("Prompt", "GroupControl", children=[
+        text("Run command?"),
+        FakeControl("", children=[FakeControl("", children=[button("Accept")])]),
+    ])
+    lines = [FakeControl(f"Pane {i}", children=[text(f"Line {i}") for _ in range(5)]) for i in range(30)]
+    window = FakeControl("Antigravity", "WindowControl", children=[dialog] + lines)
+
+    bfs = service.scan_window(window, ["Run command?"], ["Accept"], budget=ScanBudget(order=ORDER_BREADTH_FIRST))
+    best = service.scan_window(window, ["Run command?"], ["Accept"], budget=ScanBudget(order=ORDER_BEST_FIRST))
+    assert bfs.button is not None and best.button is not None
+    assert best.nodes_visited < bfs.nodes_visited
+
+
+def test_has_text_recursive_with_budget():
+    service = TextQueryService(WalkerTreeScanner())
+    window = wide_window()
+    assert service.has_text_recursive(window, ["Run command?"], budget=ScanBudget(max_nodes=1000))
+    assert not service.has_text_recursive(window, ["Run command?"], budget=ScanBudget(max_nodes=5))
@@ -0,0 +1,89 @@
+from ag_accept.services.tree_scanner import WalkerTreeScanner
+from ag_accept.services.window_service import WindowRegistry, WindowService
+from fakes import FakeControl, fake_list_windows
+
+
+def make_registry(titles):
+    windows = [FakeControl(t, "WindowControl") for t in titles]
+    desktop = FakeControl("Desktop", children=windows)
+    return WindowRegistry(lambda: desktop, lister=fake_list_windows), desktop
+
+
+def test_refresh_reports_added_removed_and_renamed():
+    registry, desktop = make_registry(["Antigravity", "Notepad"])
+    diff = registry.refresh()
+    assert [e.title for e in diff.added] == ["Antigravity", "Notepad"]
+    assert not diff.removed and not diff.renamed
+
+    assert not registry.refresh()
+
+    notepad = desktop._children.pop()
+    desktop._children[0]._name = "Antigravity - project"
+    desktop._children.append(FakeControl("Terminal", "WindowControl"))
+    diff = registry.refresh()
+    assert [e.title for e in diff.added] == ["Terminal"]
+    assert [e.window for e in diff.removed] == [notepad]
+    assert [e.title for e in diff.renamed] == ["Antigravity - project"]
+
+
+def test_find_keeps_fragment_index_current():
+    registry, desktop = make_registry(["Antigravity A", "Notepad", "Antigravity B"])
+    registry.refresh()
+    assert [e.title for e in registry.find("Antigravity")] == ["Antigravity A", "Antigravity B"]
+
+    desktop._children[1]._name = "Antigravity C"
+    desktop._children.pop(0)
+    registry.refresh()
+    assert [e.title for e in registry.find("Antigravity")] == ["Antigravity C", "Antigravity B"]
+
+
+def test_exclusions_are_classified_once_and_reclassified_on_change():
+    registry, desktop = make_registry(["Antigravity", "Antigravity Monitor"])
+    registry.set_exclusions(["antigravity monitor"])
+    registry.refresh()
+    assert [e.title for e in registry.find("Antigravity")] == ["Antigravity"]
+    assert len(registry.find("Antigravity", include_excluded=True)) == 2
+
+    registry.set_exclusions([])
+    assert len(registry.find("Antigravity")) == 2
+
+
+def test_unchanged_windows_are_not_reread():
+    registry, desktop = make_registry([f"Window {i}" for i in range(20)])
+    registry.refresh()
+    entries = {e.key: e for e in registry.windows()}
+    FakeControl.reads = 0
+    registry.refresh()
+    # No per-window reads or control creation for windows that did not change
+    assert all(registry.get(key) is entry for key, entry in entries.items())
+    assert FakeControl.reads == 0
+
+
+def test_find_window_by_title_prefers_exact_match():
+    registry, _ = make_registry(["Antigravity - a.py", "Antigravity"])
+    service = WindowService(scanner=WalkerTreeScanner())
+    service.registry = registry
+    assert service.find_window_by_title("Antigravity").Name == "Antigravity"
+    assert service.find_window_by_title("a.py").Name == "Antigravity - a.py"
+    assert service.find_window_by_title("Missing") is None
+
+
+def test_lookups_do_not_consume_the_refresh_diff():
+    registry, desktop = make_registry(["Antigravity", "Notepad"])
+    service = WindowService(scanner=WalkerTreeScanner())
+    service.registry = registry
+    service.refresh_windows()
+
+    desktop._children.append(FakeControl("Antigravity - new", "WindowControl"))
+    assert "- Antigravity - new" in service.get_all_window_titles_string()
+    desktop._children.append(FakeControl("Short-lived", "WindowControl"))
+    assert service.find_window_by_title("Short-lived") is not None
+    notepad = desktop._children.pop(1)
+    desktop._children.pop()
+    service.get_all_windows()
+
+    # The lookups enumerated the desktop themselves; their changes still reach refresh_windows
+    diff = service.refresh_windows()
+    assert [e.title for e in diff.added] == ["Antigravity - new"]
+    assert [e.window for e in diff.removed] == [notepad]
+    assert not service.refresh_windows()
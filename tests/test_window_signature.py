@@ -0,0 +1,66 @@
+from ag_accept.services.tree_scanner import ScanResult
+from ag_accept.services.window_signature import WindowSignatureCache, compute_window_signature
+from fakes import FakeRect, button, prompt_window
+
+
+def test_signature_changes_with_tree():
+    window = prompt_window(filler=2)
+    before = compute_window_signature(window)
+
+    assert compute_window_signature(window) == before
+
+    window._children[0]._children.append(button("New"))
+    assert compute_window_signature(window) != before
+
+
+def test_signature_ignores_deep_levels():
+    window = prompt_window(filler=2)
+    before = compute_window_signature(window, levels=2)
+
+    window._children[0]._children[0]._children.append(button("Deep"))
+    assert compute_window_signature(window, levels=2) == before
+
+
+def test_signature_tracks_rect_and_title():
+    window = prompt_window()
+    before = compute_window_signature(window)
+    window.BoundingRectangle = FakeRect(10, 10, 800, 600)
+    assert compute_window_signature(window) != before
+
+
+def test_unchanged_window_skips_until_forced_rescan():
+    cache = WindowSignatureCache(force_rescan_ticks=2)
+    window = prompt_window()
+
+    assert cache.check(window) is None
+    cache.update(window, ScanResult(context_matched=False))
+
+    cache.begin_tick()
+    assert cache.check(window) is not None
+    assert cache.check(window) is not None
+    # Forced rescan after two skips
+    assert cache.check(window) is None
+    assert (cache.total_hits, cache.total_misses) == (2, 2)
+    assert cache.hit_rate == 0.5
+
+
+def test_button_result_is_never_skipped():
+    cache = WindowSignatureCache()
+    window = prompt_window()
+
+    cache.check(window)
+    cache.update(window, ScanResult(context_matched=True, button=object()))
+
+    assert cache.check(window) is None
+
+
+def test_retain_evicts_closed_windows():
+    cache = WindowSignatureCache()
+    window = prompt_window()
+    cache.check(window)
+    cache.update(window, ScanResult())
+
+    cache.retain([])
+
+    assert cache.entries == {}
+    assert cache.check(window) is None